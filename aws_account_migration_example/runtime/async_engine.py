@@ -0,0 +1,141 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Iterator, List, Optional, Set
+
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+
+# account workflows in flight, most of them wait on a free executor thread
+DEFAULT_ASYNC_CONCURRENCY = 256
+DEFAULT_EXECUTOR_WORKERS = 16
+
+
+class AsyncMigrationEngine:
+    source: SourceAwsOrganization
+    target: TargetAwsOrganization
+    concurrency: int
+    workers: int
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self.source = kwargs["source"]
+        self.target = kwargs["target"]
+        self.concurrency = kwargs.get("concurrency") or DEFAULT_ASYNC_CONCURRENCY
+        self.workers = kwargs.get("workers") or DEFAULT_EXECUTOR_WORKERS
+        self.logger = logging.getLogger("async_engine")
+        self.logger.setLevel(logging.INFO)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def _call(self, function, *args):
+        # boto3 is blocking, every call runs on the bounded executor
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(function, *args)
+        )
+
+    async def migrate_account(self, account: dict) -> Optional[str]:
+        # prompts cannot be answered from executor threads, so every step is quiet
+        try:
+            invitation = await self._call(self.target.send_invitation, account, True)
+            if invitation is None:
+                return None
+            account_id = await self._call(
+                self.source.accept_invitation, invitation, True
+            )
+            if account_id is not None:
+                await self._call(self.target.move_account_when_ready, account_id, True)
+            return account_id
+        except Exception as error:
+            # recorded before the other workflows are canceled so it is reported with the other modes
+            self.source.failures[account["Id"]] = error
+            raise
+
+    async def _next_account(self, accounts: Iterator[dict]) -> Optional[dict]:
+        # child accounts are paginated lazily, fetching a page blocks too
+        return await self._call(next, accounts, None)
+
+    async def _migrate_child_accounts(self) -> List[str]:
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: Set[asyncio.Task] = set()
+        failures: List[BaseException] = []
+        migrated_ids: List[str] = []
+
+        async def migrate(account: dict):
+            try:
+                account_id = await self.migrate_account(account)
+                if account_id is not None:
+                    migrated_ids.append(account_id)
+            finally:
+                slots.release()
+
+        def done(task: asyncio.Task):
+            tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                failures.append(task.exception())
+
+        try:
+            accounts = iter(self.source.child_accounts)
+            # stop scheduling new workflows as soon as one fails
+            while not failures:
+                await slots.acquire()
+                account = await self._next_account(accounts)
+                if account is None:
+                    slots.release()
+                    break
+                task = asyncio.create_task(migrate(account))
+                tasks.add(task)
+                task.add_done_callback(done)
+            if tasks:
+                await asyncio.wait(set(tasks), return_when=asyncio.FIRST_EXCEPTION)
+            if failures:
+                raise failures[0]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return migrated_ids
+
+    async def run(self) -> List[str]:
+        self.logger.info(
+            f"Migrating accounts from {self.source.account_details()} with {self.concurrency} concurrent workflows on {self.workers} threads"
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            migrated_ids = await self._migrate_child_accounts()
+            # the management account can only leave once every child account has left the organization
+            if self.source.includes_management_account:
+                account_id = await self.migrate_account(self.source.root_account)
+                if account_id is not None:
+                    migrated_ids.append(account_id)
+            return migrated_ids
+        except asyncio.CancelledError:
+            self.logger.warning(
+                "Migration canceled, calls already sent finish in the background and are recorded in the journal"
+            )
+            raise
+        finally:
+            # running calls cannot be interrupted, queued ones are dropped
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def migrate(self) -> List[str]:
+        return asyncio.run(self.run())
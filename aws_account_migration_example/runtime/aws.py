@@ -13,41 +13,201 @@
 #  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 #  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
 import boto3
-from boto3.session import Session
 from botocore.config import Config
 
+from aws_account_migration_example.runtime.metrics import Metrics, shared_metrics
+from aws_account_migration_example.runtime.rate_limiter import (
+    DEFAULT_MAX_ATTEMPTS,
+    AdaptiveRateLimiter,
+    shared_rate_limiter,
+)
+
+ACCEPT_INVITATION_ROLE_NAME = "AwsAccountMigrationAcceptInvitationRole"
+DEFAULT_ACCOUNT_CACHE_SIZE = 256
+# assumed role credentials are refreshed this long before they expire
+CREDENTIALS_REFRESH_MARGIN = timedelta(minutes=5)
+# largest page size accepted by the AWS Organizations list operations
+MAX_PAGE_SIZE = 20
+# botocore default, raised to the number of workers that share a client
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+# boto3 sessions are not thread safe, clients of every account are created from the same session
+_client_lock = threading.Lock()
+
+
+def compact_account(account: dict) -> dict:
+    return {
+        "Id": account["Id"],
+        "Name": account.get("Name"),
+        "Email": account.get("Email"),
+    }
+
+
+def compact_handshake(handshake: dict) -> dict:
+    return {
+        "Id": handshake["Id"],
+        "State": handshake["State"],
+        "Parties": [
+            {"Id": party["Id"], "Type": party["Type"]} for party in handshake["Parties"]
+        ],
+    }
+
+
+class AccountScopedCache:
+    # the clients of the most recently used accounts are kept, the much smaller credentials of every
+    # account are kept until they expire so an evicted account is not assumed again
+    max_size: int
+    refresh_margin: timedelta
+
+    def __init__(self, **kwargs):
+        self.max_size = kwargs.get("max_size", DEFAULT_ACCOUNT_CACHE_SIZE)
+        self.refresh_margin = kwargs.get("refresh_margin", CREDENTIALS_REFRESH_MARGIN)
+        self._entries: OrderedDict[str, Tuple[datetime, "Aws"]] = OrderedDict()
+        self._credentials: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _is_expiring(self, expiration: datetime) -> bool:
+        return expiration - self.refresh_margin <= datetime.now(timezone.utc)
+
+    def get(self, account_id: str) -> Optional["Aws"]:
+        with self._lock:
+            entry = self._entries.get(account_id)
+            if entry is None:
+                return None
+            expiration, aws = entry
+            if self._is_expiring(expiration):
+                del self._entries[account_id]
+                return None
+            self._entries.move_to_end(account_id)
+            return aws
+
+    def credentials(self, account_id: str) -> Optional[dict]:
+        with self._lock:
+            credentials = self._credentials.get(account_id)
+            if credentials is None:
+                return None
+            if self._is_expiring(credentials["Expiration"]):
+                del self._credentials[account_id]
+                return None
+            return credentials
+
+    def put(self, account_id: str, credentials: dict, aws: "Aws"):
+        with self._lock:
+            self._credentials[account_id] = credentials
+            self._entries[account_id] = (credentials["Expiration"], aws)
+            self._entries.move_to_end(account_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, account_id: str):
+        with self._lock:
+            self._entries.pop(account_id, None)
+            self._credentials.pop(account_id, None)
+
+    def __len__(self):
+        return len(self._entries)
+
 
 class Aws:
     def __init__(self, **kwargs):
         self.session = (
             kwargs["session"] if "session" in kwargs else boto3.session.Session()
         )
-        default_config = Config(retries={"max_attempts": 3, "mode": "standard"})
+        self.account_cache = (
+            kwargs["account_cache"]
+            if "account_cache" in kwargs
+            else AccountScopedCache()
+        )
+        self.rate_limiter: AdaptiveRateLimiter = (
+            kwargs["rate_limiter"]
+            if "rate_limiter" in kwargs
+            else shared_rate_limiter()
+        )
+        self.metrics: Metrics = (
+            kwargs["metrics"] if "metrics" in kwargs else shared_metrics()
+        )
+        self.max_attempts = kwargs.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+        self.max_pool_connections = kwargs.get(
+            "max_pool_connections", DEFAULT_MAX_POOL_CONNECTIONS
+        )
+        # assumed role credentials of an account scoped instance, None for the credentials of the session
+        self.credentials: Optional[dict] = kwargs.get("credentials")
         self.organizations = (
             kwargs["organizations"]
             if "organizations" in kwargs
-            else self.session.client("organizations", config=default_config)
+            else self._client("organizations")
         )
         self.list_accounts = self.organizations.get_paginator("list_accounts")
         self.list_handshakes_for_organization = self.organizations.get_paginator(
             "list_handshakes_for_organization"
         )
-        self.sts = (
-            kwargs["sts"]
-            if "sts" in kwargs
-            else self.session.client("sts", config=default_config)
+        self.list_accounts_for_parent = self.organizations.get_paginator(
+            "list_accounts_for_parent"
         )
+        self.list_organizational_units_for_parent = self.organizations.get_paginator(
+            "list_organizational_units_for_parent"
+        )
+        self._sts = kwargs.get("sts")
+        self._iam = kwargs.get("iam")
 
-    def account_scoped_instance(self, source):
-        response = self.sts.assume_role(
-            RoleArn=f"arn:aws:iam::{source['Id']}:role/AwsAccountMigrationAcceptInvitationRole",
-            RoleSessionName="aws-account-migration-example",
+    @property
+    def sts(self):
+        # account scoped instances never assume roles themselves
+        if self._sts is None:
+            self._sts = self._client("sts")
+        return self._sts
+
+    @property
+    def iam(self):
+        # only the pre-flight check of the source accounts uses IAM
+        if self._iam is None:
+            self._iam = self._client("iam")
+        return self._iam
+
+    def _client(self, service_name: str):
+        # throttling is retried by botocore, every attempt waits on the shared rate limiter first
+        config = Config(
+            retries={"max_attempts": self.max_attempts, "mode": "standard"},
+            max_pool_connections=self.max_pool_connections,
         )
-        credentials = response["Credentials"]
-        session = Session(
-            aws_access_key_id=credentials["AccessKeyId"],
-            aws_secret_access_key=credentials["SecretAccessKey"],
-            aws_session_token=credentials["SessionToken"],
+        credentials = {}
+        if self.credentials is not None:
+            credentials = {
+                "aws_access_key_id": self.credentials["AccessKeyId"],
+                "aws_secret_access_key": self.credentials["SecretAccessKey"],
+                "aws_session_token": self.credentials["SessionToken"],
+            }
+        # the service models and endpoint data loaded by the session are reused by every client
+        with _client_lock:
+            client = self.session.client(service_name, config=config, **credentials)
+        self.rate_limiter.register(client)
+        self.metrics.register(client)
+        return client
+
+    def account_scoped_instance(self, source):
+        account_scoped_aws = self.account_cache.get(source["Id"])
+        if account_scoped_aws is not None:
+            return account_scoped_aws
+        # the clients of an account may have been evicted while its credentials are still valid
+        credentials = self.account_cache.credentials(source["Id"])
+        if credentials is None:
+            credentials = self.sts.assume_role(
+                RoleArn=f"arn:aws:iam::{source['Id']}:role/{ACCEPT_INVITATION_ROLE_NAME}",
+                RoleSessionName="aws-account-migration-example",
+            )["Credentials"]
+        account_scoped_aws = Aws(
+            session=self.session,
+            credentials=credentials,
+            account_cache=self.account_cache,
+            rate_limiter=self.rate_limiter,
+            metrics=self.metrics,
+            max_attempts=self.max_attempts,
+            max_pool_connections=self.max_pool_connections,
         )
-        return Aws(session=session)
+        self.account_cache.put(source["Id"], credentials, account_scoped_aws)
+        return account_scoped_aws
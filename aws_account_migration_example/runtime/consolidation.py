@@ -0,0 +1,74 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+
+
+class ConsolidationRun:
+    # migrates several source organizations into one target at the same time, the target organization
+    # object with its invitations, OU tree and readiness poller is shared and so is the rate limiter,
+    # while every source runs on its own thread and its failures stay with it
+    sources: List[SourceAwsOrganization]
+    target: TargetAwsOrganization
+    migrate: Callable[[SourceAwsOrganization], bool]
+    errors: Dict[str, Exception]
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self.sources = kwargs["sources"]
+        self.target = kwargs["target"]
+        self.migrate = kwargs["migrate"]
+        self.errors = {}
+        self.logger = logging.getLogger("consolidation")
+        self.logger.setLevel(logging.INFO)
+
+    def _migrate(self, source: SourceAwsOrganization) -> bool:
+        try:
+            is_complete = self.migrate(source)
+        except Exception as error:
+            self.logger.error(
+                f"Migrating organization {source.profile} failed: {error}"
+            )
+            self.errors[source.profile] = error
+            return False
+        return is_complete and not source.failures
+
+    def run(self) -> bool:
+        self.logger.info(
+            f"Migrating {len(self.sources)} organizations into {self.target.account_details()}"
+        )
+        with ThreadPoolExecutor(
+            max_workers=len(self.sources), thread_name_prefix="source"
+        ) as executor:
+            completed = list(executor.map(self._migrate, self.sources))
+        for source, is_complete in zip(self.sources, completed):
+            if is_complete:
+                self.logger.info(f"Organization {source.profile} migrated")
+            elif source.profile in self.errors:
+                self.logger.error(
+                    f"Organization {source.profile} stopped: {self.errors[source.profile]}"
+                )
+            else:
+                self.logger.error(
+                    f"Organization {source.profile} has {len(source.failures)} accounts that still need work"
+                )
+        return all(completed)
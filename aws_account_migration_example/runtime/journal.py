@@ -0,0 +1,220 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional
+
+DEFAULT_JOURNAL_PATH = "aws-account-migration-journal.sqlite"
+
+INVITED = "invited"
+REMOVED = "removed"
+ACCEPTED = "accepted"
+MOVED = "moved"
+STATES = [INVITED, REMOVED, ACCEPTED, MOVED]
+COLUMNS = "account_id, state, handshake_id, organization_id, target_organization_id, destination_id"
+
+
+class MigrationJournal:
+    path: str
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS accounts (
+                    account_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    handshake_id TEXT,
+                    updated_at TEXT NOT NULL
+                )
+                """)
+            columns = [
+                row[1]
+                for row in self._connection.execute("PRAGMA table_info(accounts)")
+            ]
+            # journals written before several source organizations could be migrated in one run
+            if "organization_id" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE accounts ADD COLUMN organization_id TEXT"
+                )
+            # journals written before entries were scoped to the target organization
+            if "target_organization_id" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE accounts ADD COLUMN target_organization_id TEXT"
+                )
+            # journals written before mirrored destinations were recorded
+            if "destination_id" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE accounts ADD COLUMN destination_id TEXT"
+                )
+
+    def record(
+        self,
+        account_id: str,
+        state: str,
+        handshake_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        target_organization_id: Optional[str] = None,
+        destination_id: Optional[str] = None,
+    ):
+        if state not in STATES:
+            raise ValueError(f"Unknown journal state {state}")
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                f"SELECT {COLUMNS} FROM accounts WHERE account_id = ?", (account_id,)
+            ).fetchone()
+            # an entry of an earlier migration between other organizations is started over
+            if row is not None and _in_scope(
+                _entry(row), organization_id, target_organization_id
+            ):
+                entry = _entry(row)
+                handshake_id = handshake_id or entry["HandshakeId"]
+                organization_id = organization_id or entry["OrganizationId"]
+                target_organization_id = (
+                    target_organization_id or entry["TargetOrganizationId"]
+                )
+                destination_id = destination_id or entry["DestinationId"]
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO accounts ({COLUMNS}, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    account_id,
+                    state,
+                    handshake_id,
+                    organization_id,
+                    target_organization_id,
+                    destination_id,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def forget(self, account_id: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM accounts WHERE account_id = ?", (account_id,)
+            )
+
+    def entry(
+        self,
+        account_id: str,
+        organization_id: Optional[str] = None,
+        target_organization_id: Optional[str] = None,
+    ) -> Optional[dict]:
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {COLUMNS} FROM accounts WHERE account_id = ?",
+                (account_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        entry = _entry(row)
+        if not _in_scope(entry, organization_id, target_organization_id):
+            return None
+        return entry
+
+    def state(
+        self,
+        account_id: str,
+        organization_id: Optional[str] = None,
+        target_organization_id: Optional[str] = None,
+    ) -> Optional[str]:
+        entry = self.entry(account_id, organization_id, target_organization_id)
+        return entry["State"] if entry is not None else None
+
+    def has_reached(
+        self,
+        account_id: str,
+        state: str,
+        organization_id: Optional[str] = None,
+        target_organization_id: Optional[str] = None,
+    ) -> bool:
+        current = self.state(account_id, organization_id, target_organization_id)
+        return current is not None and STATES.index(current) >= STATES.index(state)
+
+    def pending(
+        self,
+        organization_id: Optional[str] = None,
+        target_organization_id: Optional[str] = None,
+    ) -> List[dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {COLUMNS} FROM accounts WHERE state != ? ORDER BY updated_at",
+                (MOVED,),
+            ).fetchall()
+        return _in_scope_entries(rows, organization_id, target_organization_id)
+
+    def reached(
+        self,
+        state: str,
+        organization_id: Optional[str] = None,
+        target_organization_id: Optional[str] = None,
+    ) -> List[dict]:
+        states = STATES[STATES.index(state) :]
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {COLUMNS} FROM accounts WHERE state IN ({', '.join('?' for _ in states)}) ORDER BY updated_at",
+                states,
+            ).fetchall()
+        return _in_scope_entries(rows, organization_id, target_organization_id)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _entry(row: tuple) -> dict:
+    # OrganizationId is the source organization the account left, unknown until it was removed, and
+    # TargetOrganizationId the organization it was invited to and DestinationId the mirrored OU it is moved to
+    return {
+        "AccountId": row[0],
+        "State": row[1],
+        "HandshakeId": row[2],
+        "OrganizationId": row[3],
+        "TargetOrganizationId": row[4],
+        "DestinationId": row[5],
+    }
+
+
+def _in_scope(
+    entry: dict, organization_id: Optional[str], target_organization_id: Optional[str]
+) -> bool:
+    # entries only belong to the migration between the same source and target organizations, an
+    # organization that is not known yet, or not asked for, matches any
+    return (
+        organization_id is None
+        or entry["OrganizationId"] is None
+        or entry["OrganizationId"] == organization_id
+    ) and (
+        target_organization_id is None
+        or entry["TargetOrganizationId"] is None
+        or entry["TargetOrganizationId"] == target_organization_id
+    )
+
+
+def _in_scope_entries(
+    rows: List[tuple],
+    organization_id: Optional[str],
+    target_organization_id: Optional[str],
+) -> List[dict]:
+    entries = [_entry(row) for row in rows]
+    return [
+        entry
+        for entry in entries
+        if _in_scope(entry, organization_id, target_organization_id)
+    ]
@@ -0,0 +1,56 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import threading
+from typing import Generic, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+class LazySequence(Generic[T]):
+    # pulls items from the underlying iterable only as far as any consumer has read and replays
+    # them for later consumers, so a paginated listing is fetched once and work can start on the first page
+    def __init__(self, iterable: Iterable[T]):
+        self._source = iter(iterable)
+        self._items: List[T] = []
+        self._exhausted = False
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[T]:
+        index = 0
+        while True:
+            with self._lock:
+                if index < len(self._items):
+                    item = self._items[index]
+                elif self._exhausted:
+                    return
+                else:
+                    try:
+                        item = next(self._source)
+                    except StopIteration:
+                        self._exhausted = True
+                        return
+                    self._items.append(item)
+            index += 1
+            yield item
+
+    def __len__(self) -> int:
+        for _ in self:
+            pass
+        return len(self._items)
+
+    @property
+    def is_exhausted(self) -> bool:
+        return self._exhausted
@@ -0,0 +1,130 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import csv
+import json
+import re
+from typing import Dict, Iterator, List, Optional, Set
+
+from aws_account_migration_example.runtime.organization_tree import OrganizationTree
+
+ACCOUNT_ID_PATTERN = re.compile(r"^\d{12}$")
+TRUE_VALUES = {"y", "yes", "t", "true", "on", "1"}
+FALSE_VALUES = {"", "n", "no", "f", "false", "off", "0"}
+
+
+class ManifestRow:
+    line: int
+    account_id: str
+    destination_ou: Optional[str]
+    skip: bool
+    error: Optional[str]
+
+    def __init__(self, line: int, values: dict, error: Optional[str] = None):
+        self.line = line
+        self.error = error
+        self.account_id = str(values.get("account_id") or "").strip()
+        self.destination_ou = str(values.get("destination_ou") or "").strip() or None
+        skip = values.get("skip")
+        if isinstance(skip, bool):
+            self.skip = skip
+        elif str(skip or "").strip().lower() in TRUE_VALUES:
+            self.skip = True
+        elif str(skip or "").strip().lower() in FALSE_VALUES:
+            self.skip = False
+        else:
+            self.skip = False
+            self.error = f"invalid skip value {skip}"
+
+
+class Manifest:
+    # rows are read from disk on every pass so manifests with thousands of accounts are never held in memory
+    path: str
+    destinations: Dict[str, str]
+
+    def __init__(self, path: str):
+        self.path = path
+        self.destinations = {}
+
+    def rows(self) -> Iterator[ManifestRow]:
+        with open(self.path, newline="") as file:
+            if self.path.endswith(".jsonl"):
+                for line, text in enumerate(file, start=1):
+                    if text.strip():
+                        yield self._json_row(line, text)
+            else:
+                for line, values in enumerate(csv.DictReader(file), start=2):
+                    yield ManifestRow(line, values)
+
+    @staticmethod
+    def _json_row(line: int, text: str) -> ManifestRow:
+        # rows that can not be read are skipped and reported by validate
+        try:
+            values = json.loads(text)
+        except json.JSONDecodeError as error:
+            return ManifestRow(line, {"skip": True}, f"invalid JSON: {error.msg}")
+        if not isinstance(values, dict):
+            return ManifestRow(line, {"skip": True}, "row is not a JSON object")
+        return ManifestRow(line, values)
+
+    def accounts(self) -> Iterator[dict]:
+        for row in self.rows():
+            if not row.skip:
+                yield {"Id": row.account_id}
+
+    def validate(
+        self,
+        account_ids: Set[str],
+        management_account_id: str,
+        target_tree: OrganizationTree,
+    ) -> List[str]:
+        errors = []
+        seen = set()
+        self.destinations = {}
+        for row in self.rows():
+            if row.error is not None:
+                errors.append(f"{self.path}:{row.line} {row.error}")
+                if not row.account_id:
+                    continue
+            if not ACCOUNT_ID_PATTERN.match(row.account_id):
+                errors.append(
+                    f"{self.path}:{row.line} invalid account ID {row.account_id}"
+                )
+                continue
+            if row.account_id in seen:
+                errors.append(
+                    f"{self.path}:{row.line} duplicate account {row.account_id}"
+                )
+                continue
+            seen.add(row.account_id)
+            if row.skip:
+                continue
+            if row.account_id == management_account_id:
+                errors.append(
+                    f"{self.path}:{row.line} the management account {row.account_id} cannot be migrated from a manifest"
+                )
+            elif row.account_id not in account_ids:
+                errors.append(
+                    f"{self.path}:{row.line} account {row.account_id} is not in the source organization"
+                )
+            if row.destination_ou is not None:
+                try:
+                    target_tree.find(row.destination_ou)
+                    self.destinations[row.account_id] = row.destination_ou
+                except ValueError:
+                    errors.append(
+                        f"{self.path}:{row.line} destination OU {row.destination_ou} does not exist in the target organization"
+                    )
+        return errors
@@ -0,0 +1,231 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_PREFIX = "aws_account_migration"
+
+
+class OperationMetrics:
+    calls: int
+    retries: int
+    latency_seconds: float
+    latency_buckets: List[int]
+    errors: Dict[str, int]
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.latency_seconds = 0.0
+        # the last bucket counts calls slower than the largest bound
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.errors = {}
+
+    def observe(self, latency: float, retries: int, error_code: Optional[str]):
+        self.calls += 1
+        self.retries += retries
+        self.latency_seconds += latency
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if error_code is not None:
+            self.errors[error_code] = self.errors.get(error_code, 0) + 1
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "errors": dict(sorted(self.errors.items())),
+            "latency_seconds": round(self.latency_seconds, 3),
+            "latency_histogram": {
+                **{
+                    str(bound): count
+                    for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets)
+                },
+                "+Inf": self.latency_buckets[-1],
+            },
+        }
+
+
+class Metrics:
+    # records every call made by the clients it is registered on, keyed by service and operation
+    def __init__(self):
+        self._operations: Dict[Tuple[str, str], OperationMetrics] = {}
+        self._phases: Dict[str, float] = {}
+        self._operator_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def register(self, client):
+        events = client.meta.events
+        events.register("before-call", self._before_call)
+        events.register("after-call", self._after_call)
+        events.register("after-call-error", self._after_call_error)
+
+    def _before_call(self, context: dict, **kwargs):
+        context["metrics_start"] = time.perf_counter()
+
+    def _after_call(self, event_name: str, context: dict, parsed: dict, **kwargs):
+        metadata = parsed.get("ResponseMetadata", {})
+        self._observe(
+            event_name,
+            context,
+            metadata.get("RetryAttempts", 0),
+            parsed.get("Error", {}).get("Code"),
+        )
+
+    def _after_call_error(self, event_name: str, context: dict, exception, **kwargs):
+        self._observe(event_name, context, 0, type(exception).__name__)
+
+    def _observe(
+        self, event_name: str, context: dict, retries: int, error_code: Optional[str]
+    ):
+        start = context.get("metrics_start")
+        if start is None:
+            return
+        latency = time.perf_counter() - start
+        _, service, operation = event_name.split(".", 2)
+        with self._lock:
+            metrics = self._operations.get((service, operation))
+            if metrics is None:
+                metrics = OperationMetrics()
+                self._operations[(service, operation)] = metrics
+            metrics.observe(latency, retries, error_code)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases[name] = (
+                    self._phases.get(name, 0.0) + time.perf_counter() - start
+                )
+
+    @contextmanager
+    def operator(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._operator_seconds += time.perf_counter() - start
+
+    def latency_seconds(self) -> float:
+        with self._lock:
+            return sum(metrics.latency_seconds for metrics in self._operations.values())
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "phases": {
+                    name: round(seconds, 3) for name, seconds in self._phases.items()
+                },
+                "operator_seconds": round(self._operator_seconds, 3),
+                "operations": {
+                    f"{service}.{operation}": metrics.as_dict()
+                    for (service, operation), metrics in sorted(
+                        self._operations.items()
+                    )
+                },
+            }
+
+    def write_json(self, path: str, extra: Optional[dict] = None):
+        _write_atomically(
+            path, json.dumps({**self.report(), **(extra or {})}, indent=2)
+        )
+
+    def write_prometheus(self, path: str):
+        lines = []
+        with self._lock:
+            operations = sorted(self._operations.items())
+            phases = dict(self._phases)
+            operator_seconds = self._operator_seconds
+
+        def metric(name: str, metric_type: str, description: str):
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {metric_type}")
+
+        metric("api_calls_total", "counter", "AWS API calls per operation")
+        for (service, operation), metrics in operations:
+            lines.append(
+                f'{PROMETHEUS_PREFIX}_api_calls_total{{service="{service}",operation="{operation}"}} {metrics.calls}'
+            )
+        metric("api_retries_total", "counter", "Retry attempts per operation")
+        for (service, operation), metrics in operations:
+            lines.append(
+                f'{PROMETHEUS_PREFIX}_api_retries_total{{service="{service}",operation="{operation}"}} {metrics.retries}'
+            )
+        metric("api_errors_total", "counter", "Failed AWS API calls per error code")
+        for (service, operation), metrics in operations:
+            for code, count in sorted(metrics.errors.items()):
+                lines.append(
+                    f'{PROMETHEUS_PREFIX}_api_errors_total{{service="{service}",operation="{operation}",code="{code}"}} {count}'
+                )
+        metric(
+            "api_latency_seconds", "histogram", "AWS API call latency including retries"
+        )
+        for (service, operation), metrics in operations:
+            labels = f'service="{service}",operation="{operation}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, metrics.latency_buckets):
+                cumulative += count
+                lines.append(
+                    f'{PROMETHEUS_PREFIX}_api_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'{PROMETHEUS_PREFIX}_api_latency_seconds_bucket{{{labels},le="+Inf"}} {metrics.calls}'
+            )
+            lines.append(
+                f"{PROMETHEUS_PREFIX}_api_latency_seconds_sum{{{labels}}} {metrics.latency_seconds}"
+            )
+            lines.append(
+                f"{PROMETHEUS_PREFIX}_api_latency_seconds_count{{{labels}}} {metrics.calls}"
+            )
+        metric(
+            "phase_seconds", "gauge", "Wall clock time spent in each migration phase"
+        )
+        for name, seconds in phases.items():
+            lines.append(
+                f'{PROMETHEUS_PREFIX}_phase_seconds{{phase="{name}"}} {seconds}'
+            )
+        metric("operator_seconds", "gauge", "Time spent waiting on operator prompts")
+        lines.append(f"{PROMETHEUS_PREFIX}_operator_seconds {operator_seconds}")
+        _write_atomically(path, "\n".join(lines) + "\n")
+
+
+def _write_atomically(path: str, content: str):
+    # textfile collectors must never read a partially written file
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as file:
+        file.write(content)
+    os.replace(temporary_path, path)
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def shared_metrics() -> Metrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
@@ -14,23 +14,160 @@
 #  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import argparse
+import atexit
 import logging
 import sys
-from distutils.util import strtobool
-
-from prompt_toolkit import prompt
+from typing import List, Optional
 
+from aws_account_migration_example.runtime.async_engine import (
+    DEFAULT_ASYNC_CONCURRENCY,
+    AsyncMigrationEngine,
+)
+from aws_account_migration_example.runtime.aws import DEFAULT_MAX_POOL_CONNECTIONS
+from aws_account_migration_example.runtime.consolidation import ConsolidationRun
+from aws_account_migration_example.runtime.journal import (
+    DEFAULT_JOURNAL_PATH,
+    MigrationJournal,
+)
+from aws_account_migration_example.runtime.manifest import Manifest
+from aws_account_migration_example.runtime.metrics import Metrics, shared_metrics
 from aws_account_migration_example.runtime.model import (
     SourceAwsOrganization,
     TargetAwsOrganization,
 )
-from aws_account_migration_example.runtime.validator import yes_no_validator
+from aws_account_migration_example.runtime.pipeline import (
+    DEFAULT_PIPELINE_WORKERS,
+    MigrationPipeline,
+)
+from aws_account_migration_example.runtime.plan import MigrationPlan
+from aws_account_migration_example.runtime.preflight import (
+    DEFAULT_PREFLIGHT_WORKERS,
+    PreflightCheck,
+)
+from aws_account_migration_example.runtime.progress import (
+    DEFAULT_PROGRESS_INTERVAL,
+    MigrationProgress,
+)
+from aws_account_migration_example.runtime.prompts import confirm
+from aws_account_migration_example.runtime.rate_limiter import (
+    DEFAULT_INVITE_RATE,
+    DEFAULT_MAX_ATTEMPTS,
+    DEFAULT_OPERATION_RATE,
+    AdaptiveRateLimiter,
+    configure_rate_limiter,
+    parse_operation_rates,
+)
+from aws_account_migration_example.runtime.readiness import (
+    DEFAULT_READINESS_INTERVAL,
+    DEFAULT_READINESS_TIMEOUT,
+)
+from aws_account_migration_example.runtime.retry import (
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BACKOFF,
+)
+from aws_account_migration_example.runtime.snapshot import (
+    DEFAULT_SNAPSHOT_PATH,
+    DEFAULT_SNAPSHOT_TTL,
+    SnapshotCache,
+)
+from aws_account_migration_example.runtime.verify import (
+    DEFAULT_VERIFY_WORKERS,
+    PlacementVerifier,
+    expected_placements,
+)
+from aws_account_migration_example.runtime.waves import (
+    DEFAULT_CANARY_SIZE,
+    DEFAULT_ERROR_THRESHOLD,
+    DEFAULT_ERROR_WINDOW,
+    DEFAULT_MAX_WAVE_SIZE,
+    DEFAULT_WAVE_GROWTH,
+    DEFAULT_WAVE_WORKERS,
+    WaveScheduler,
+)
 
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 logger = logging.getLogger("main")
 logger.setLevel("INFO")
 
 
+def export_metrics(
+    metrics: Metrics,
+    rate_limiter: AdaptiveRateLimiter,
+    json_path: Optional[str],
+    prometheus_path: Optional[str],
+):
+    report = metrics.report()
+    for phase, seconds in report["phases"].items():
+        logger.info(f"Phase {phase}: {seconds}s")
+    logger.info(f"Waiting on operator prompts: {report['operator_seconds']}s")
+    if json_path is not None:
+        metrics.write_json(json_path, {"rate_limiter": rate_limiter.statistics()})
+        logger.info(f"Metrics written to {json_path}")
+    if prometheus_path is not None:
+        metrics.write_prometheus(prometheus_path)
+        logger.info(f"Metrics written to {prometheus_path}")
+
+
+def expected_accounts(sources: List[SourceAwsOrganization]) -> Optional[int]:
+    # only known once the listings of the source accounts have been read to the end
+    if not all(source.child_accounts.is_exhausted for source in sources):
+        return None
+    return sum(
+        len(source.child_accounts) + (1 if source.includes_management_account else 0)
+        for source in sources
+    )
+
+
+def migrate_source(
+    source: SourceAwsOrganization,
+    target: TargetAwsOrganization,
+    args: argparse.Namespace,
+    metrics: Metrics,
+) -> bool:
+    if args.is_waves:
+        with metrics.phase("waves"):
+            return WaveScheduler(
+                source=source,
+                target=target,
+                is_quiet=args.is_quiet,
+                canary_size=args.canary_size,
+                growth=args.wave_growth,
+                max_wave_size=args.max_wave_size,
+                workers=args.wave_workers,
+                error_window=args.error_window,
+                error_threshold=args.error_threshold,
+            ).run()
+    if args.is_async:
+        with metrics.phase("pipeline"):
+            try:
+                AsyncMigrationEngine(
+                    source=source,
+                    target=target,
+                    concurrency=args.concurrency,
+                    workers=args.workers,
+                ).migrate()
+            except Exception as error:
+                # the failing account is in source.failures and reported with the others
+                logger.error(f"Migration stopped after a failure: {error}")
+                return False
+    elif args.is_pipeline:
+        with metrics.phase("pipeline"):
+            MigrationPipeline(
+                source=source,
+                target=target,
+                is_quiet=args.is_quiet,
+                workers=args.workers,
+            ).run()
+    else:
+        with metrics.phase("invite"):
+            invitations = target.invite(source, args.is_quiet, args.invite_workers)
+        with metrics.phase("accept"):
+            accepted_ids = source.accept(invitations, args.is_quiet)
+        with metrics.phase("move"):
+            target.move_accounts(accepted_ids, args.is_quiet)
+    return True
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="Aws Account Migration Example",
@@ -40,9 +177,11 @@ def main():
     parser.add_argument(
         "-s",
         "--source-organization-profile",
-        dest="source",
+        dest="sources",
+        metavar="SOURCE",
+        nargs="+",
         required=True,
-        help="This is the profile name that has Admin access to the management account of the SOURCE AWS organization that accounts will be migrated out of to the target",
+        help="This is the profile name that has Admin access to the management account of the SOURCE AWS organization that accounts will be migrated out of to the target. Several profiles migrate their organizations into the target at the same time, which requires --quiet",
     )
     parser.add_argument(
         "-t",
@@ -58,12 +197,50 @@ def main():
         required=False,
         help="Migrate a specific account from the SOURCE AWS organization to the TARGET AWS organization",
     )
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        dest="manifest",
+        required=False,
+        help="CSV or JSONL (.jsonl) file listing the accounts to migrate with the columns account_id, destination_ou and skip. destination_ou overrides --ou for that account",
+    )
+    parser.add_argument(
+        "--source-ou",
+        dest="source_organizational_units",
+        action="append",
+        metavar="OU_ID",
+        required=False,
+        help="Only migrate accounts in this OU, or any OU below it, of the SOURCE AWS organization. Can be specified multiple times",
+    )
+    parser.add_argument(
+        "--include",
+        dest="include",
+        action="append",
+        metavar="PATTERN",
+        required=False,
+        help="Only migrate accounts whose ID, name or source OU path (e.g. /Workloads/*) matches this pattern. Can be specified multiple times",
+    )
+    parser.add_argument(
+        "--exclude",
+        dest="exclude",
+        action="append",
+        metavar="PATTERN",
+        required=False,
+        help="Do not migrate accounts whose ID, name or source OU path matches this pattern. Can be specified multiple times",
+    )
     parser.add_argument(
         "--ou",
         dest="organizational_unit",
         required=False,
         help="The destination OU in the TARGET AWS organization, if not specified account will land in the root of the TARGET Aws organization",
     )
+    parser.add_argument(
+        "--mirror-ous",
+        dest="is_mirror",
+        action="store_true",
+        required=False,
+        help="Recreate the OU hierarchy of the SOURCE AWS organization in the TARGET AWS organization, below --ou if specified, and move every account to its matching OU",
+    )
     parser.add_argument(
         "-q",
         "--quiet",
@@ -72,26 +249,500 @@ def main():
         required=False,
         help="Do not prompt for confirmation",
     )
+    parser.add_argument(
+        "--journal",
+        dest="journal",
+        default=DEFAULT_JOURNAL_PATH,
+        required=False,
+        help=f"SQLite file recording the migration state of every account, defaults to {DEFAULT_JOURNAL_PATH}",
+    )
+    parser.add_argument(
+        "--snapshot-cache",
+        dest="snapshot_cache",
+        default=DEFAULT_SNAPSHOT_PATH,
+        required=False,
+        help=f"SQLite file caching organization details, accounts, OUs and open invitations between runs, defaults to {DEFAULT_SNAPSHOT_PATH}",
+    )
+    parser.add_argument(
+        "--snapshot-ttl",
+        dest="snapshot_ttl",
+        type=float,
+        default=DEFAULT_SNAPSHOT_TTL,
+        required=False,
+        help=f"Seconds a cached snapshot is used before it is fetched again, 0 disables the cache, defaults to {DEFAULT_SNAPSHOT_TTL}",
+    )
+    parser.add_argument(
+        "--refresh-snapshot",
+        dest="is_refresh_snapshot",
+        action="store_true",
+        required=False,
+        help="Discard the cached snapshots of the SOURCE and TARGET profiles before starting",
+    )
+    parser.add_argument(
+        "--resume",
+        dest="is_resume",
+        action="store_true",
+        required=False,
+        help="Resume an interrupted migration, steps already recorded in the journal are skipped",
+    )
+    parser.add_argument(
+        "--invite-workers",
+        dest="invite_workers",
+        type=int,
+        default=1,
+        required=False,
+        help="Number of invitations to send concurrently, only applies with --quiet",
+    )
+    parser.add_argument(
+        "--pipeline",
+        dest="is_pipeline",
+        action="store_true",
+        required=False,
+        help="Move each account through invite, accept and move as soon as its previous step finishes instead of running each step for all accounts",
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        type=int,
+        default=DEFAULT_PIPELINE_WORKERS,
+        required=False,
+        help=f"Number of accounts migrated concurrently in --pipeline mode, only applies with --quiet, defaults to {DEFAULT_PIPELINE_WORKERS}",
+    )
+    parser.add_argument(
+        "--async",
+        dest="is_async",
+        action="store_true",
+        required=False,
+        help="Run the pipeline as asyncio tasks, API calls run on --workers threads. Requires --quiet",
+    )
+    parser.add_argument(
+        "--concurrency",
+        dest="concurrency",
+        type=int,
+        default=DEFAULT_ASYNC_CONCURRENCY,
+        required=False,
+        help=f"Number of account migrations in flight with --async, defaults to {DEFAULT_ASYNC_CONCURRENCY}",
+    )
+    parser.add_argument(
+        "--plan",
+        dest="is_plan",
+        action="store_true",
+        required=False,
+        help="Show every step of the migration as a table that can be edited and approved once, then migrate the approved accounts concurrently with --workers without further prompts",
+    )
+    parser.add_argument(
+        "--preflight",
+        dest="is_preflight",
+        action="store_true",
+        required=False,
+        help="Assume the accept invitation role and check that it can accept handshakes in every selected source account before anything is changed, stop if any account fails",
+    )
+    parser.add_argument(
+        "--preflight-workers",
+        dest="preflight_workers",
+        type=int,
+        default=DEFAULT_PREFLIGHT_WORKERS,
+        required=False,
+        help=f"Number of source accounts checked concurrently by --preflight, defaults to {DEFAULT_PREFLIGHT_WORKERS}",
+    )
+    parser.add_argument(
+        "--preflight-report",
+        dest="preflight_report",
+        required=False,
+        help="Write the result of every --preflight check to this CSV file",
+    )
+    parser.add_argument(
+        "--verify",
+        dest="is_verify",
+        action="store_true",
+        required=False,
+        help="Do not migrate, check that every account of --manifest, of the journal or of the SOURCE organizations is in its destination OU of the TARGET organization and report the accounts that are not",
+    )
+    parser.add_argument(
+        "--fix",
+        dest="is_fix",
+        action="store_true",
+        required=False,
+        help="Move the misplaced accounts found by --verify to their destination OU",
+    )
+    parser.add_argument(
+        "--verify-workers",
+        dest="verify_workers",
+        type=int,
+        default=DEFAULT_VERIFY_WORKERS,
+        required=False,
+        help=f"Number of TARGET OUs listed concurrently by --verify, defaults to {DEFAULT_VERIFY_WORKERS}",
+    )
+    parser.add_argument(
+        "--verify-report",
+        dest="verify_report",
+        required=False,
+        help="Write the accounts found by --verify that are not in their destination OU to this CSV file",
+    )
+    parser.add_argument(
+        "--waves",
+        dest="is_waves",
+        action="store_true",
+        required=False,
+        help="Migrate a canary wave of accounts first, then waves of growing size, and stop when too many accounts fail",
+    )
+    parser.add_argument(
+        "--canary-size",
+        dest="canary_size",
+        type=int,
+        default=DEFAULT_CANARY_SIZE,
+        required=False,
+        help=f"Number of accounts in the first wave, any failure in it stops the migration, defaults to {DEFAULT_CANARY_SIZE}",
+    )
+    parser.add_argument(
+        "--wave-growth",
+        dest="wave_growth",
+        type=float,
+        default=DEFAULT_WAVE_GROWTH,
+        required=False,
+        help=f"Factor each wave is larger than the previous one, defaults to {DEFAULT_WAVE_GROWTH}",
+    )
+    parser.add_argument(
+        "--max-wave-size",
+        dest="max_wave_size",
+        type=int,
+        default=DEFAULT_MAX_WAVE_SIZE,
+        required=False,
+        help=f"Maximum number of accounts in one wave, defaults to {DEFAULT_MAX_WAVE_SIZE}",
+    )
+    parser.add_argument(
+        "--wave-workers",
+        dest="wave_workers",
+        type=int,
+        nargs="+",
+        default=DEFAULT_WAVE_WORKERS,
+        required=False,
+        help=f"Number of accounts migrated concurrently in each wave, the last value applies to every later wave. Only applies with --quiet, defaults to {' '.join(str(workers) for workers in DEFAULT_WAVE_WORKERS)}",
+    )
+    parser.add_argument(
+        "--error-window",
+        dest="error_window",
+        type=int,
+        default=DEFAULT_ERROR_WINDOW,
+        required=False,
+        help=f"Number of most recent accounts the error rate of --waves is computed over, defaults to {DEFAULT_ERROR_WINDOW}",
+    )
+    parser.add_argument(
+        "--error-threshold",
+        dest="error_threshold",
+        type=float,
+        default=DEFAULT_ERROR_THRESHOLD,
+        required=False,
+        help=f"Error rate above which --waves stops starting accounts, defaults to {DEFAULT_ERROR_THRESHOLD}",
+    )
+    parser.add_argument(
+        "--readiness-interval",
+        dest="readiness_interval",
+        type=float,
+        default=DEFAULT_READINESS_INTERVAL,
+        required=False,
+        help=f"Seconds between checks of the TARGET root OU for accepted accounts that are ready to be moved, defaults to {DEFAULT_READINESS_INTERVAL}",
+    )
+    parser.add_argument(
+        "--readiness-timeout",
+        dest="readiness_timeout",
+        type=float,
+        default=DEFAULT_READINESS_TIMEOUT,
+        required=False,
+        help=f"Maximum number of seconds to wait for an accepted account to join the TARGET organization, defaults to {DEFAULT_READINESS_TIMEOUT}",
+    )
+    parser.add_argument(
+        "--retry-attempts",
+        dest="retry_attempts",
+        type=int,
+        default=DEFAULT_RETRY_ATTEMPTS,
+        required=False,
+        help=f"Number of times an account that failed to migrate is retried after the other accounts, defaults to {DEFAULT_RETRY_ATTEMPTS}",
+    )
+    parser.add_argument(
+        "--retry-backoff",
+        dest="retry_backoff",
+        type=float,
+        default=DEFAULT_RETRY_BACKOFF,
+        required=False,
+        help=f"Seconds before the first retry of a failed account, doubled for every further retry, defaults to {DEFAULT_RETRY_BACKOFF}",
+    )
+    parser.add_argument(
+        "--invite-rate",
+        dest="invite_rate",
+        type=float,
+        default=DEFAULT_INVITE_RATE,
+        required=False,
+        help=f"Maximum number of invitations sent per second, defaults to {DEFAULT_INVITE_RATE}",
+    )
+    parser.add_argument(
+        "--api-rate",
+        dest="api_rates",
+        action="append",
+        metavar="OPERATION=RATE",
+        required=False,
+        help=f"Maximum number of calls per second for an AWS Organizations or STS operation, e.g. AcceptHandshake=5. Can be specified multiple times, operations without a rate default to {DEFAULT_OPERATION_RATE}",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        dest="max_attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        required=False,
+        help=f"Maximum number of attempts for a throttled or failed API call, defaults to {DEFAULT_MAX_ATTEMPTS}",
+    )
+    parser.add_argument(
+        "--progress",
+        dest="is_progress",
+        action="store_true",
+        required=False,
+        help="Report the number of accounts in each step, the throughput, the ETA and the time spent waiting on the rate limiter and in API calls. Shown as a live line on a terminal, written as JSON lines to stderr otherwise",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        dest="progress_interval",
+        type=float,
+        default=DEFAULT_PROGRESS_INTERVAL,
+        required=False,
+        help=f"Seconds between two JSON progress lines, defaults to {DEFAULT_PROGRESS_INTERVAL}",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        dest="metrics_json",
+        required=False,
+        help="Write per API call counts, latency histograms, retries, error codes and per phase timings to this JSON file on exit",
+    )
+    parser.add_argument(
+        "--metrics-prometheus",
+        dest="metrics_prometheus",
+        required=False,
+        help="Write the same metrics to this file in the Prometheus textfile collector format on exit",
+    )
 
     args = parser.parse_args()
-    source = SourceAwsOrganization(profile_name=args.source, account=args.account)
-    target = TargetAwsOrganization(
-        profile_name=args.target, organizational_unit=args.organizational_unit
+    if args.manifest is not None and args.account is not None:
+        parser.error("--manifest and --account cannot be used together")
+    if args.is_async and not args.is_quiet:
+        parser.error("--async cannot prompt for confirmation, use it with --quiet")
+    if args.is_fix and not args.is_verify:
+        parser.error("--fix can only be used with --verify")
+    if args.is_verify and args.is_mirror:
+        parser.error(
+            "--verify cannot work out mirrored OUs of accounts that left the source organization"
+        )
+    if len(args.sources) > 1:
+        if not args.is_quiet:
+            parser.error(
+                "Several source organizations cannot prompt for confirmation, use them with --quiet"
+            )
+        for option, value in [
+            ("--account", args.account),
+            ("--manifest", args.manifest),
+            ("--source-ou", args.source_organizational_units),
+            ("--plan", args.is_plan),
+        ]:
+            if value:
+                parser.error(
+                    f"{option} can only be used with a single source organization"
+                )
+    try:
+        rates = parse_operation_rates(args.api_rates)
+    except ValueError as error:
+        parser.error(str(error))
+    rate_limiter = configure_rate_limiter(
+        rates={"InviteAccountToOrganization": args.invite_rate, **rates}
     )
-
-    if not args.is_quiet:
-        confirm = prompt(
-            f"Migrating accounts from {source.account_details()} to {target.account_details()}. Proceed? (Y/N): ",
-            default="N",
-            validator=yes_no_validator,
+    metrics = shared_metrics()
+    # written on every exit so aborted and failed runs can be analysed too
+    atexit.register(
+        export_metrics,
+        metrics,
+        rate_limiter,
+        args.metrics_json,
+        args.metrics_prometheus,
+    )
+    journal = MigrationJournal(args.journal)
+    snapshots = None
+    if args.snapshot_ttl > 0:
+        snapshots = SnapshotCache(args.snapshot_cache, args.snapshot_ttl)
+        if args.is_refresh_snapshot:
+            for profile in args.sources:
+                snapshots.invalidate(profile=profile)
+            snapshots.invalidate(profile=args.target)
+    progress = None
+    if args.is_progress:
+        progress = MigrationProgress(
+            rate_limiter=rate_limiter,
+            metrics=metrics,
+            interval=args.progress_interval,
+            total=lambda: expected_accounts(sources),
+        )
+    # every worker of every source organization can have a call to the target in flight
+    max_pool_connections = max(
+        DEFAULT_MAX_POOL_CONNECTIONS,
+        len(args.sources)
+        * max(
+            args.workers,
+            args.invite_workers,
+            args.preflight_workers,
+            args.verify_workers,
+            *args.wave_workers,
+        ),
+    )
+    with metrics.phase("startup"):
+        sources = [
+            SourceAwsOrganization(
+                profile_name=profile,
+                account=args.account,
+                organizational_units=args.source_organizational_units,
+                include=args.include,
+                exclude=args.exclude,
+                manifest=Manifest(args.manifest) if args.manifest is not None else None,
+                max_attempts=args.max_attempts,
+                max_pool_connections=max_pool_connections,
+                journal=journal,
+                progress=progress,
+                snapshots=snapshots,
+                resume=args.is_resume,
+                retry_attempts=args.retry_attempts,
+                retry_backoff=args.retry_backoff,
+            )
+            for profile in args.sources
+        ]
+        source = sources[0]
+        target = TargetAwsOrganization(
+            profile_name=args.target,
+            organizational_unit=args.organizational_unit,
+            readiness_interval=args.readiness_interval,
+            readiness_timeout=args.readiness_timeout,
+            max_attempts=args.max_attempts,
+            max_pool_connections=max_pool_connections,
+            journal=journal,
+            progress=progress,
+            snapshots=snapshots,
         )
-        if not strtobool(confirm):
+    # only the accounts this pair of organizations left unfinished block the migration, accounts a
+    # migration left unfinished are verified too
+    pending = [
+        entry
+        for organization in sources
+        for entry in journal.pending(
+            organization.organization["Id"], target.organization["Id"]
+        )
+    ]
+    if pending and not args.is_resume and not args.is_verify:
+        parser.error(
+            f"Journal {args.journal} has {len(pending)} unfinished accounts, use --resume to continue the previous migration"
+        )
+    if progress is not None:
+        progress.start()
+        atexit.register(progress.stop)
+
+    if args.is_verify:
+        # the migrated accounts are no longer in the source organization the manifest is validated against
+        with metrics.phase("verify"):
+            verifier = PlacementVerifier(target=target, workers=args.verify_workers)
+            verifier.verify(
+                expected_placements(sources, target, source.manifest, journal)
+            )
+        if args.is_fix and verifier.mismatches:
+            with metrics.phase("fix"):
+                verifier.fix(args.is_quiet)
+        if args.verify_report is not None:
+            verifier.save(args.verify_report)
+        journal.close()
+        if snapshots is not None:
+            snapshots.close()
+        if verifier.remaining:
+            parser.exit(
+                -1,
+                f"{len(verifier.remaining)} accounts are not in their destination OU",
+            )
+        parser.exit(0, "Every account is in its destination OU")
+
+    if source.manifest is not None:
+        with metrics.phase("validate"):
+            errors = source.validate_manifest(target)
+        for error in errors:
+            logger.error(error)
+        if errors:
+            parser.exit(-1, f"Manifest {args.manifest} has {len(errors)} invalid rows")
+
+    # an unknown destination OU must fail before anything is changed
+    if target.destination_ou_id is not None:
+        logger.info(f"Destination OU is {target.destination_ou['Name']}")
+
+    if args.is_preflight:
+        failures = 0
+        for index, source in enumerate(sources):
+            with metrics.phase("preflight"):
+                preflight = PreflightCheck(
+                    source=source, target=target, workers=args.preflight_workers
+                )
+                preflight.run()
+            if args.preflight_report is not None:
+                preflight.save(args.preflight_report, is_append=index > 0)
+            failures += len(preflight.failures)
+        if failures:
+            parser.exit(
+                -1,
+                f"{failures} accounts failed the pre-flight check, nothing was changed",
+            )
+
+    if args.is_plan:
+        with metrics.phase("plan"):
+            plan = MigrationPlan(
+                source=source, target=target, is_mirror=args.is_mirror, metrics=metrics
+            ).build()
+        if args.is_quiet:
+            print(plan.table())
+        elif not plan.review():
             logger.info("Exiting...")
             parser.exit(-1, "Migration canceled")
+        with metrics.phase("pipeline"):
+            plan.execute(args.workers)
+        is_complete = True
+    else:
+        if not args.is_quiet:
+            if not confirm(
+                f"Migrating accounts from {source.account_details()} to {target.account_details()}. Proceed? (Y/N): ",
+                metrics,
+            ):
+                logger.info("Exiting...")
+                parser.exit(-1, "Migration canceled")
+
+        if args.is_mirror:
+            # OUs of the same name are only created once when several organizations are mirrored
+            for source in sources:
+                with metrics.phase("mirror"):
+                    target.mirror_organizational_units(source)
 
-    invitations = target.invite(source, args.is_quiet)
-    accepted_ids = source.accept(invitations, args.is_quiet)
-    target.move_accounts(accepted_ids, args.is_quiet)
+        if len(sources) > 1:
+            is_complete = ConsolidationRun(
+                sources=sources,
+                target=target,
+                migrate=lambda source: migrate_source(source, target, args, metrics),
+            ).run()
+        else:
+            is_complete = migrate_source(source, target, args, metrics)
+    for operation, statistics in rate_limiter.statistics().items():
+        logger.info(
+            f"{operation}: {statistics['calls']} calls, {statistics['delayed']} delayed for {statistics['delay_seconds']}s, {statistics['throttled']} throttled, final rate {statistics['rate']}/s"
+        )
+    unfinished = 0
+    for source in sources:
+        source.report_failures()
+        unfinished += len(source.failures)
+    if unfinished:
+        parser.exit(
+            -1,
+            f"{unfinished} accounts still need work, run the same command again with --resume",
+        )
+    if not is_complete:
+        parser.exit(-1, "Migration stopped before every account was migrated")
+    journal.close()
+    if snapshots is not None:
+        snapshots.close()
     parser.exit(0, "Migration complete")
 
 
@@ -0,0 +1,133 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import botocore
+
+from aws_account_migration_example.runtime.aws import Aws
+from aws_account_migration_example.runtime.organization_tree import (
+    DEFAULT_TREE_WORKERS,
+    OrganizationalUnit,
+    OrganizationTree,
+)
+
+
+class OrganizationMirror:
+    # maps every source OU to an OU with the same path in the target, below the target root or the --ou destination
+    source_tree: OrganizationTree
+    target_tree: OrganizationTree
+    base: Optional[dict]
+    organizational_units: List[str]
+    workers: int
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self._aws: Aws = kwargs["aws"]
+        self.source_tree = kwargs["source_tree"]
+        self.target_tree = kwargs["target_tree"]
+        self.base = kwargs.get("base")
+        self.organizational_units = kwargs.get("organizational_units") or []
+        self.workers = kwargs.get("workers", DEFAULT_TREE_WORKERS)
+        self.logger = kwargs.get("logger", logging.getLogger("mirror"))
+        self._mapping: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _units_to_mirror(self) -> List[OrganizationalUnit]:
+        if not self.organizational_units:
+            return list(self.source_tree.units())
+        # selected subtrees and the OUs above them so their paths can be rebuilt
+        units: Dict[str, OrganizationalUnit] = {}
+        for organizational_unit_id in self.organizational_units:
+            for unit in self.source_tree.subtree(organizational_unit_id):
+                units[unit.id] = unit
+            parent_id = self.source_tree.find(organizational_unit_id).parent_id
+            while parent_id is not None and parent_id not in units:
+                parent = self.source_tree.find(parent_id)
+                units[parent.id] = parent
+                parent_id = parent.parent_id
+        return list(units.values())
+
+    def build(self) -> Dict[str, dict]:
+        source_root = self.source_tree.root
+        target_base = (
+            self.target_tree.find(self.base["Id"])
+            if self.base is not None
+            else self.target_tree.root
+        )
+        self._mapping[source_root.id] = {"Id": target_base.id, "Name": target_base.name}
+        levels: Dict[int, List[OrganizationalUnit]] = {}
+        for unit in self._units_to_mirror():
+            if unit.id != source_root.id:
+                levels.setdefault(unit.depth, []).append(unit)
+        # parents have to exist before their children, the OUs within one level are independent
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for depth in sorted(levels):
+                list(executor.map(self._mirror, levels[depth]))
+        self.logger.info(
+            f"Mapped {len(self._mapping)} source organizational units to the target organization"
+        )
+        return self._mapping
+
+    def _mirror(self, unit: OrganizationalUnit):
+        parent = self._mapping[unit.parent_id]
+        existing = self._find_child(parent["Id"], unit.name)
+        if existing is None:
+            self.logger.info(
+                f"Creating organizational unit {unit.name} under {parent['Id']} - {parent['Name']}"
+            )
+            try:
+                existing = self._aws.organizations.create_organizational_unit(
+                    ParentId=parent["Id"], Name=unit.name
+                )["OrganizationalUnit"]
+            except botocore.exceptions.ClientError as error:
+                if (
+                    error.response["Error"]["Code"]
+                    != "DuplicateOrganizationalUnitException"
+                ):
+                    raise error
+                existing = self._list_child(parent["Id"], unit.name)
+            self.target_tree.add_unit(existing, parent["Id"])
+        with self._lock:
+            self._mapping[unit.id] = {"Id": existing["Id"], "Name": existing["Name"]}
+
+    def _find_child(self, parent_id: str, name: str) -> Optional[dict]:
+        try:
+            target_parent = self.target_tree.find(parent_id)
+        except ValueError:
+            # the parent was created by this run so it has no children yet
+            return None
+        for child in target_parent.children:
+            if child.name == name:
+                return {"Id": child.id, "Name": child.name}
+        return None
+
+    def _list_child(self, parent_id: str, name: str) -> dict:
+        for page in self._aws.list_organizational_units_for_parent.paginate(
+            ParentId=parent_id
+        ):
+            for ou in page["OrganizationalUnits"]:
+                if ou["Name"] == name:
+                    return ou
+        raise ValueError(f"Organizational unit {name} not found under {parent_id}")
+
+    def destination_for(self, account_id: str) -> Optional[dict]:
+        parent = self.source_tree.parent_of(account_id)
+        if parent is None:
+            return self.base
+        return self._mapping.get(parent.id, self.base)
@@ -14,95 +14,350 @@
 #  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import logging
-from distutils.util import strtobool
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
 
 import botocore
 from boto3.session import Session
-from prompt_toolkit import prompt
-
-from aws_account_migration_example.runtime.aws import Aws
-from aws_account_migration_example.runtime.validator import yes_no_validator
+from aws_account_migration_example.runtime.aws import (
+    DEFAULT_MAX_POOL_CONNECTIONS,
+    MAX_PAGE_SIZE,
+    Aws,
+    compact_account,
+    compact_handshake,
+)
+from aws_account_migration_example.runtime.journal import (
+    ACCEPTED,
+    INVITED,
+    MOVED,
+    REMOVED,
+    MigrationJournal,
+)
+from aws_account_migration_example.runtime.lazy import LazySequence
+from aws_account_migration_example.runtime.manifest import Manifest
+from aws_account_migration_example.runtime.mirror import OrganizationMirror
+from aws_account_migration_example.runtime.organization_tree import OrganizationTree
+from aws_account_migration_example.runtime.rate_limiter import DEFAULT_MAX_ATTEMPTS
+from aws_account_migration_example.runtime.progress import MigrationProgress
+from aws_account_migration_example.runtime.prompts import confirm
+from aws_account_migration_example.runtime.readiness import (
+    DEFAULT_READINESS_INTERVAL,
+    DEFAULT_READINESS_TIMEOUT,
+    AccountReadinessPoller,
+)
+from aws_account_migration_example.runtime.retry import (
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BACKOFF,
+    RetryQueue,
+)
+from aws_account_migration_example.runtime.snapshot import (
+    OrganizationSnapshot,
+    SnapshotCache,
+)
 
 
 class AwsOrganization:
     profile: str
-    root_account: dict
-    organization: dict
+    _organization: Optional[dict] = None
+    _root_account: Optional[dict] = None
     _aws: Aws
     logger: logging.Logger
+    journal: Optional[MigrationJournal]
+    progress: Optional[MigrationProgress]
+    snapshots: Optional[SnapshotCache]
+    snapshot: Optional[OrganizationSnapshot] = None
+    tree: OrganizationTree
 
     def __init__(self, **kwargs):
         self.logger = logging.getLogger(kwargs["profile_name"])
         self.logger.setLevel(logging.INFO)
-        self.logger.info(
-            f" Retrieving organization and root account information using profile {kwargs['profile_name']}"
-        )
+        self.journal = kwargs.get("journal")
+        self.progress = kwargs.get("progress")
+        self.profile = kwargs["profile_name"]
         if "aws" in kwargs:
             self._aws = kwargs["aws"]
         else:
             session = Session(profile_name=kwargs["profile_name"])
-            self._aws = Aws(session=session)
-        self.organization = self._aws.organizations.describe_organization()[
-            "Organization"
-        ]
-        self.root_account = self._aws.organizations.describe_account(
-            AccountId=self.organization["MasterAccountId"]
-        )["Account"]
-        self.logger.info(f" Root account is {self.account_details()}")
+            self._aws = Aws(
+                session=session,
+                max_attempts=kwargs.get("max_attempts", DEFAULT_MAX_ATTEMPTS),
+                max_pool_connections=kwargs.get(
+                    "max_pool_connections", DEFAULT_MAX_POOL_CONNECTIONS
+                ),
+            )
+        self.snapshots = kwargs.get("snapshots")
+        if self.snapshots is not None:
+            self.snapshot = OrganizationSnapshot(
+                cache=self.snapshots,
+                profile=self.profile,
+                organization_id=lambda: self.organization["Id"],
+            )
+        self.tree = OrganizationTree(
+            aws=self._aws, logger=self.logger, snapshot=self.snapshot
+        )
+
+    # organization details are only fetched once they are first needed
+    @property
+    def organization(self) -> dict:
+        if self._organization is None and self.snapshots is not None:
+            self._organization = self.snapshots.organization(self.profile)
+        if self._organization is None:
+            self.logger.info(
+                f" Retrieving organization information using profile {self.profile}"
+            )
+            self._organization = self._aws.organizations.describe_organization()[
+                "Organization"
+            ]
+            if self.snapshots is not None:
+                self.snapshots.store(
+                    self.profile,
+                    self._organization["Id"],
+                    "organization",
+                    value=self._organization,
+                )
+        return self._organization
+
+    @property
+    def root_account(self) -> dict:
+        if self._root_account is None:
+            self._root_account = self.cached_value(
+                "root_account",
+                lambda: self._aws.organizations.describe_account(
+                    AccountId=self.organization["MasterAccountId"]
+                )["Account"],
+            )
+            self.logger.info(f" Root account is {self.account_details()}")
+        return self._root_account
+
+    def cached_value(self, name: str, fetch: Callable[[], Any]) -> Any:
+        if self.snapshot is None:
+            return fetch()
+        return self.snapshot.value(name, fetch)
+
+    @property
+    def journal_organization_id(self) -> Optional[str]:
+        return None
+
+    @property
+    def journal_target_organization_id(self) -> Optional[str]:
+        return None
+
+    def record(
+        self,
+        account_id: str,
+        state: str,
+        handshake_id: Optional[str] = None,
+        target_organization_id: Optional[str] = None,
+        destination_id: Optional[str] = None,
+    ):
+        if self.journal is not None:
+            self.journal.record(
+                account_id,
+                state,
+                handshake_id,
+                self.journal_organization_id,
+                target_organization_id or self.journal_target_organization_id,
+                destination_id,
+            )
+        if self.progress is not None:
+            self.progress.record(account_id, state)
+
+    def journal_entry(
+        self, account_id: str, target_organization_id: Optional[str] = None
+    ) -> Optional[dict]:
+        # entries of a migration between other organizations are ignored
+        if self.journal is None:
+            return None
+        return self.journal.entry(
+            account_id,
+            self.journal_organization_id,
+            target_organization_id or self.journal_target_organization_id,
+        )
+
+    def has_reached(
+        self,
+        account_id: str,
+        state: str,
+        target_organization_id: Optional[str] = None,
+    ) -> bool:
+        return self.journal is not None and self.journal.has_reached(
+            account_id,
+            state,
+            self.journal_organization_id,
+            target_organization_id or self.journal_target_organization_id,
+        )
+
+    def account_scoped_aws(self, account: dict) -> Aws:
+        return self._aws.account_scoped_instance(account)
 
     def account_details(self):
         return f"{self.organization['Id']} - {self.root_account['Id']} - {self.root_account['Email']}"
 
     def get_invitation_source_and_target(self, invite: dict):
-        source = [x for x in invite["Parties"] if x["Type"] == "ACCOUNT"]
-        target = [x for x in invite["Parties"] if x["Type"] == "ORGANIZATION"]
-        return (
-            source[0] if len(source) > 0 else None,
-            target[0] if len(target) > 0 else None,
-        )
+        source = None
+        target = None
+        for party in invite["Parties"]:
+            if party["Type"] == "ACCOUNT" and source is None:
+                source = party
+            elif party["Type"] == "ORGANIZATION" and target is None:
+                target = party
+        return source, target
 
 
 class SourceAwsOrganization(AwsOrganization):
-    child_accounts: List[dict] = []
+    child_accounts: Iterable[dict]
     account_was_specified = False
+    organizational_units: List[str]
+    include: List[str]
+    exclude: List[str]
+    manifest: Optional[Manifest]
+    retry_attempts: int
+    retry_backoff: float
+    failures: Dict[str, Exception]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.organizational_units = kwargs.get("organizational_units") or []
+        self.include = kwargs.get("include") or []
+        self.exclude = kwargs.get("exclude") or []
+        self.manifest = kwargs.get("manifest")
+        self.retry_attempts = kwargs.get("retry_attempts", DEFAULT_RETRY_ATTEMPTS)
+        self.retry_backoff = kwargs.get("retry_backoff", DEFAULT_RETRY_BACKOFF)
+        self.failures = {}
 
         if "account" in kwargs and kwargs["account"] is not None:
+            self.child_accounts = LazySequence(
+                self.describe_child_account(kwargs["account"])
+            )
+            self.account_was_specified = True
+        else:
+            self.child_accounts = LazySequence(
+                self.list_child_accounts(kwargs.get("resume", False))
+            )
+
+    @property
+    def journal_organization_id(self) -> Optional[str]:
+        # several source organizations can share one journal, each only resumes the accounts that left it
+        return self.organization["Id"]
+
+    @property
+    def is_filtered(self) -> bool:
+        return not self.account_was_specified and (
+            self.manifest is not None
+            or len(self.organizational_units + self.include + self.exclude) > 0
+        )
+
+    @property
+    def includes_management_account(self) -> bool:
+        # the management account can only leave once every account has left the organization
+        return not self.account_was_specified and not self.is_filtered
+
+    def describe_child_account(self, account_id: str) -> Iterator[dict]:
+        if self.has_reached(account_id, REMOVED):
+            # the account already left this organization in an earlier run
+            yield {"Id": account_id}
+            return
+        self.logger.info(
+            f"Retrieving child account {account_id} for management account {self.account_details()}"
+        )
+        response = self._aws.organizations.describe_account(AccountId=account_id)
+        yield compact_account(response["Account"])
+
+    def list_child_accounts(self, resume=False) -> Iterator[dict]:
+        if self.manifest is not None:
+            self.logger.info(
+                f"Reading child accounts from manifest {self.manifest.path}"
+            )
+            yield from self.manifest.accounts()
+            return
+        listed_ids = set()
+        if self.is_filtered:
             self.logger.info(
-                f"Retrieving child account {kwargs['account']} for management account {self.account_details()}"
+                f"Retrieving child accounts in {self.organizational_units or 'all organizational units'} for management account {self.account_details()}"
             )
-            response = self._aws.organizations.describe_account(
-                AccountId=kwargs["account"]
+            accounts = self.tree.accounts(
+                self.organizational_units, self.include, self.exclude
             )
-            self.child_accounts.append(response["Account"])
-            self.account_was_specified = True
         else:
             self.logger.info(
                 f"Retrieving all child accounts for management account {self.account_details()}"
             )
-            list_accounts_iterator = self._aws.list_accounts.paginate(
-                PaginationConfig={
-                    "PageSize": 10,
-                }
-            )
-            for page in list_accounts_iterator:
-                for account in page["Accounts"]:
-                    if account["Id"] != self.root_account["Id"]:
-                        self.child_accounts.append(account)
+            accounts = self.all_accounts()
+        for account in accounts:
+            if account["Id"] != self.root_account["Id"]:
+                listed_ids.add(account["Id"])
+                yield account
+        if resume:
+            yield from self.resume_accounts(listed_ids)
+
+    def list_accounts(self) -> Iterator[dict]:
+        list_accounts_iterator = self._aws.list_accounts.paginate(
+            PaginationConfig={
+                "PageSize": MAX_PAGE_SIZE,
+            }
+        )
+        for page in list_accounts_iterator:
+            for account in page["Accounts"]:
+                yield compact_account(account)
+
+    def all_accounts(self) -> Iterable[dict]:
+        if self.snapshot is None:
+            return self.list_accounts()
+        return self.snapshot.items(
+            "accounts", lambda account: account["Id"], self.list_accounts
+        )
+
+    def validate_manifest(self, target: "TargetAwsOrganization") -> List[str]:
+        self.logger.info(f"Validating manifest {self.manifest.path}")
+        account_ids = {account["Id"] for account in self.all_accounts()}
+        if self.journal is not None:
+            # accounts that already left the organization in an earlier run
+            account_ids.update(entry["AccountId"] for entry in self.pending_entries())
+        errors = self.manifest.validate(
+            account_ids, self.root_account["Id"], target.tree
+        )
+        if not errors:
+            target.account_destinations = self.manifest.destinations
+        return errors
+
+    def pending_entries(self) -> List[dict]:
+        # invited accounts are still listed by the organization they are part of, accounts journaled
+        # before the organization was recorded are assumed to belong to this one
+        return [
+            entry
+            for entry in self.journal.pending(self.organization["Id"])
+            if entry["OrganizationId"] == self.organization["Id"]
+            or (entry["OrganizationId"] is None and entry["State"] != INVITED)
+        ]
+
+    def resume_accounts(self, listed_ids: Set[str]) -> Iterator[dict]:
+        if self.journal is None:
+            return
+        # accounts removed from the organization by an earlier run are only known to the journal
+        for entry in self.pending_entries():
+            if (
+                entry["AccountId"] not in listed_ids
+                and entry["AccountId"] != self.root_account["Id"]
+            ):
+                self.logger.info(
+                    f"Resuming account {entry['AccountId']} from state {entry['State']}"
+                )
+                yield {"Id": entry["AccountId"]}
 
     def accept_invitation(self, invitation: dict, is_quiet=False) -> Optional[str]:
         account_id = None
         source, target = self.get_invitation_source_and_target(invitation)
+        if self.has_reached(source["Id"], ACCEPTED, target["Id"]):
+            self.logger.info(
+                f"Invitation {invitation['Id']} for {source['Id']} already accepted, skipping..."
+            )
+            return source["Id"]
         if not is_quiet:
-            confirm = prompt(
+            if not confirm(
                 f"Accept invite {invitation['Id']} to move account {source['Id']} to organization {target['Id']}. Proceed? (Y/N): ",
-                default="N",
-                validator=yes_no_validator,
-            )
-            if not strtobool(confirm):
+                self._aws.metrics,
+            ):
                 self.logger.info(f"Declining invitation {invitation['Id']}...")
                 if source["Id"] == self.root_account["Id"]:
                     response_handshake = self._aws.organizations.decline_handshake(
@@ -121,6 +376,11 @@ class SourceAwsOrganization(AwsOrganization):
                     self.logger.info(
                         f"Invitation {invitation['Id']} for {source['Id']} from organization {self.organization['Id']} {response_handshake['State']}!"
                     )
+                self.forget_invitation(invitation)
+                # the declined handshake can not be accepted later, the next run invites the account again
+                entry = self.journal_entry(source["Id"], target["Id"])
+                if entry is not None and entry["State"] == INVITED:
+                    self.journal.forget(source["Id"])
                 return None
         if source["Id"] == self.root_account["Id"]:
             if not self.migrate_management_account(invitation, is_quiet):
@@ -131,27 +391,51 @@ class SourceAwsOrganization(AwsOrganization):
                 HandshakeId=invitation["Id"]
             )["Handshake"]
             account_id = source["Id"]
+            self.record(account_id, ACCEPTED, invitation["Id"], target["Id"])
+            self.forget_invitation(invitation)
             self.logger.info(
                 f"Invitation {invitation['Id']} for {source['Id']} from organization {self.organization['Id']} {response_handshake['State']}!"
             )
         else:
             account_scoped_aws = self._aws.account_scoped_instance(source)
-            self.logger.info(
-                f"Removing {source['Id']} from organization {self.organization['Id']}..."
-            )
-            response = self._aws.organizations.remove_account_from_organization(
-                AccountId=source["Id"]
-            )
+            if self.has_reached(source["Id"], REMOVED, target["Id"]):
+                self.logger.info(
+                    f"{source['Id']} already removed from organization {self.organization['Id']}..."
+                )
+            else:
+                self.logger.info(
+                    f"Removing {source['Id']} from organization {self.organization['Id']}..."
+                )
+                response = self._aws.organizations.remove_account_from_organization(
+                    AccountId=source["Id"]
+                )
+                self.record(source["Id"], REMOVED, invitation["Id"], target["Id"])
+                self.forget_account(source["Id"])
             self.logger.info(f"Accepting invitation {invitation['Id']}...")
             response_handshake = account_scoped_aws.organizations.accept_handshake(
                 HandshakeId=invitation["Id"]
             )["Handshake"]
             account_id = source["Id"]
+            self.record(account_id, ACCEPTED, invitation["Id"], target["Id"])
+            self.forget_invitation(invitation)
             self.logger.info(
                 f"Invitation {invitation['Id']} for {source['Id']} from organization {self.organization['Id']} {response_handshake['State']}!"
             )
         return account_id
 
+    def forget_account(self, account_id: str):
+        if self.snapshot is not None:
+            self.snapshot.delete_item("accounts", account_id)
+        self.tree.remove_account(account_id)
+
+    def forget_invitation(self, invitation: dict):
+        # the handshake is no longer open in the snapshot of the organization that sent it
+        source, target = self.get_invitation_source_and_target(invitation)
+        if self.snapshots is not None and target is not None:
+            self.snapshots.delete_item(
+                target["Id"], "open_invitations", invitation["Id"]
+            )
+
     def __sort_invitations(self, invite):
         source, target = self.get_invitation_source_and_target(invite)
         if source is None:
@@ -168,117 +452,473 @@ class SourceAwsOrganization(AwsOrganization):
         # first sort the invitations to make sure the management account is last
         sorted_invitations = sorted(invitations, key=self.__sort_invitations)
         account_ids: [str] = []
+        retries = self.retry_queue()
+
+        def accept_invitation(invitation: dict) -> Optional[str]:
+            return self.accept_invitation(invitation, is_quiet)
+
         for invitation in sorted_invitations:
-            account_id = self.accept_invitation(invitation, is_quiet)
+            source, target = self.get_invitation_source_and_target(invitation)
+            if source["Id"] == self.root_account["Id"]:
+                account_ids.extend(retries.drain(accept_invitation))
+                self.failures.update(retries.failures)
+                if not self.can_migrate_management_account():
+                    continue
+                account_id = self.accept_invitation(invitation, is_quiet)
+            else:
+                account_id = retries.attempt(
+                    source["Id"], invitation, accept_invitation
+                )
             if account_id is not None:
                 account_ids.append(account_id)
+        account_ids.extend(retries.drain(accept_invitation))
+        self.failures.update(retries.failures)
         return account_ids
 
+    def retry_queue(self) -> RetryQueue:
+        return RetryQueue(
+            attempts=self.retry_attempts,
+            backoff=self.retry_backoff,
+            logger=self.logger,
+        )
+
+    def can_migrate_management_account(self) -> bool:
+        if self.failures:
+            self.logger.warning(
+                f"Not migrating management account {self.root_account['Id']}, {len(self.failures)} accounts still need work"
+            )
+        return not self.failures
+
+    def report_failures(self):
+        for account_id, error in self.failures.items():
+            entry = self.journal_entry(account_id)
+            state = entry["State"] if entry is not None else None
+            if state == REMOVED:
+                detail = "left the source organization but has not accepted its invitation, it is a standalone account"
+            elif state == ACCEPTED:
+                detail = "joined the target organization but was not moved to its destination OU"
+            elif state == INVITED:
+                detail = "was invited but is still part of the source organization"
+            else:
+                detail = "was not invited"
+            self.logger.error(f"Account {account_id} {detail}: {error}")
+
     def migrate_management_account(self, invitation: dict, is_quiet=False):
         if not is_quiet:
-            confirm = prompt(
+            if not confirm(
                 f"Delete AWS organization {self.organization['Id']}? (Y/N): ",
-                default="N",
-                validator=yes_no_validator,
-            )
-            if not strtobool(confirm):
+                self._aws.metrics,
+            ):
                 self.logger.info(f"Skipping deletion of organization.")
                 return False
         self.logger.info(f"Deleting organization {self.organization['Id']}")
         self._aws.organizations.delete_organization()
+        if self.snapshot is not None:
+            self.snapshot.invalidate()
         self.logger.info(f"Organization {self.organization['Id']} deleted")
         return True
 
 
 class TargetAwsOrganization(AwsOrganization):
-    invitations: List[dict] = []
+    _invitations: List[dict]
+    _invitations_by_account: Dict[str, dict]
+    _invitations_by_id: Dict[str, dict]
+    _invitations_loaded = False
     organization_id: str
-    destination_ou: Optional[dict] = None
-    root_ou: str
+    destination_ou_id: Optional[str] = None
+    _destination_ou: Optional[dict] = None
+    mirrors: List[OrganizationMirror]
+    account_destinations: Dict[str, str]
+    readiness_interval: float
+    readiness_timeout: float
+    _root_ou: Optional[str] = None
+    _accepted_before: Dict[str, Optional[str]]
+    _readiness: Optional[AccountReadinessPoller] = None
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        if (
-            "organizational_unit" in kwargs
-            and kwargs["organizational_unit"] is not None
-        ):
-            organization_unit_id = kwargs["organizational_unit"]
-            self.logger.info(f"Retrieving OU {organization_unit_id}")
-            self.destination_ou = self._aws.organizations.describe_organizational_unit(
-                OrganizationalUnitId=organization_unit_id
+        self.readiness_interval = kwargs.get(
+            "readiness_interval", DEFAULT_READINESS_INTERVAL
+        )
+        self.readiness_timeout = kwargs.get(
+            "readiness_timeout", DEFAULT_READINESS_TIMEOUT
+        )
+        self.account_destinations = {}
+        self.mirrors = []
+        self.destination_ou_id = kwargs.get("organizational_unit")
+        self._invitations = []
+        self._invitations_by_account = {}
+        self._invitations_by_id = {}
+        self._invitations_lock = threading.Lock()
+        self._invitations_load_lock = threading.Lock()
+        # accounts an earlier run accepted but did not record as moved, read before this run accepts any,
+        # with the organization they were accepted into
+        self._accepted_before = {
+            entry["AccountId"]: entry["TargetOrganizationId"]
+            for entry in (self.journal.pending() if self.journal is not None else [])
+            if entry["State"] == ACCEPTED
+        }
+
+    @property
+    def journal_target_organization_id(self) -> Optional[str]:
+        # an account can be migrated again into another organization with the same journal
+        return self.organization["Id"]
+
+    @property
+    def destination_ou(self) -> Optional[dict]:
+        if self.destination_ou_id is not None and self._destination_ou is None:
+            self.logger.info(f"Retrieving OU {self.destination_ou_id}")
+            self._destination_ou = self._aws.organizations.describe_organizational_unit(
+                OrganizationalUnitId=self.destination_ou_id
             )["OrganizationalUnit"]
             self.logger.info(
-                f"Found OU {self.destination_ou['Id']} - {self.destination_ou['Name']}"
+                f"Found OU {self._destination_ou['Id']} - {self._destination_ou['Name']}"
             )
-            self.root_ou = self._aws.organizations.list_roots(MaxResults=1)["Roots"][0][
-                "Id"
-            ]
-            self.logger.info(f"Found root OU {self.root_ou}")
+        return self._destination_ou
 
-        self.logger.info(
-            f"Retrieving existing invitations for management account {self.account_details()}"
-        )
+    def load_open_invitations(self):
+        # open handshakes are loaded once, the first time an invitation is looked up or added
+        if self._invitations_loaded:
+            return
+        with self._invitations_load_lock:
+            if self._invitations_loaded:
+                return
+            self.logger.info(
+                f"Retrieving existing invitations for management account {self.account_details()}"
+            )
+            if self.snapshot is None:
+                invitations = self.list_open_invitations()
+            else:
+                invitations = self.snapshot.items(
+                    "open_invitations",
+                    lambda invitation: invitation["Id"],
+                    self.list_open_invitations,
+                )
+            for invite in invitations:
+                self._index_invitation(invite)
+            self.logger.info(f"Found {len(self._invitations)} open invitations")
+            self._invitations_loaded = True
+
+    @property
+    def invitations(self) -> List[dict]:
+        self.load_open_invitations()
+        return self._invitations
+
+    @property
+    def invitations_by_account(self) -> Dict[str, dict]:
+        self.load_open_invitations()
+        return self._invitations_by_account
+
+    @property
+    def invitations_by_id(self) -> Dict[str, dict]:
+        self.load_open_invitations()
+        return self._invitations_by_id
+
+    def list_open_invitations(self) -> Iterator[dict]:
         handshakes_iterator = self._aws.list_handshakes_for_organization.paginate(
             Filter={"ActionType": "INVITE"},
             PaginationConfig={
-                "PageSize": 10,
+                "PageSize": MAX_PAGE_SIZE,
             },
         )
         for page in handshakes_iterator:
             for invite in page["Handshakes"]:
                 if invite["State"] == "OPEN":
-                    self.invitations.append(invite)
+                    yield compact_handshake(invite)
+
+    @property
+    def root_ou(self) -> str:
+        if self._root_ou is None:
+            self._root_ou = self.cached_value(
+                "root_ou",
+                lambda: self._aws.organizations.list_roots(MaxResults=1)["Roots"][0][
+                    "Id"
+                ],
+            )
+        return self._root_ou
+
+    @property
+    def readiness(self) -> AccountReadinessPoller:
+        if self._readiness is None:
+            self._readiness = AccountReadinessPoller(
+                aws=self._aws,
+                parent_id=self.root_ou,
+                interval=self.readiness_interval,
+                timeout=self.readiness_timeout,
+                logger=self.logger,
+            )
+        return self._readiness
+
+    def mirror_organizational_units(self, source: SourceAwsOrganization):
+        self.logger.info(
+            f"Mirroring organizational units of {source.account_details()} into {self.account_details()}"
+        )
+        mirror = OrganizationMirror(
+            aws=self._aws,
+            source_tree=source.tree,
+            target_tree=self.tree,
+            base=self.destination_ou,
+            organizational_units=source.organizational_units,
+            logger=self.logger,
+        )
+        mirror.build()
+        # every source organization that is migrated into this one has its own mirror
+        self.mirrors.append(mirror)
+
+    def destination_for(self, account: str) -> Optional[dict]:
+        if account in self.account_destinations:
+            unit = self.tree.find(self.account_destinations[account])
+            return {"Id": unit.id, "Name": unit.name}
+        for mirror in self.mirrors:
+            if mirror.source_tree.parent_of(account) is not None:
+                return mirror.destination_for(account)
+        # an account that left the source organization in an earlier run is no longer in its tree
+        entry = self.journal_entry(account) if self.mirrors else None
+        if entry is not None and entry["DestinationId"] is not None:
+            unit = self.tree.find(entry["DestinationId"])
+            return {"Id": unit.id, "Name": unit.name}
+        return self.destination_ou
 
-    def send_invitation(self, account: dict, is_quiet=False):
+    def mirrored_destination_id(self, account: str) -> Optional[str]:
+        for mirror in self.mirrors:
+            if mirror.source_tree.parent_of(account) is not None:
+                destination = mirror.destination_for(account)
+                return destination["Id"] if destination is not None else None
+        return None
+
+    def add_invitation(self, invitation: dict):
+        self.load_open_invitations()
+        self._index_invitation(invitation)
+
+    def _index_invitation(self, invitation: dict):
+        source, target = self.get_invitation_source_and_target(invitation)
+        with self._invitations_lock:
+            self._invitations.append(invitation)
+            self._invitations_by_id[invitation["Id"]] = invitation
+            if source is not None:
+                self._invitations_by_account[source["Id"]] = invitation
+
+    def find_invitation(self, account_id: str) -> Optional[dict]:
+        self.load_open_invitations()
+        with self._invitations_lock:
+            return self._invitations_by_account.get(account_id)
+
+    def journaled_invitation(self, account_id: str) -> Optional[dict]:
+        invitation = self.find_invitation(account_id)
+        if invitation is not None:
+            return invitation
+        # handshakes that are no longer open are not loaded up front
+        handshake_id = self.journal_entry(account_id)["HandshakeId"]
+        if handshake_id is None:
+            return None
+        invitation = self._aws.organizations.describe_handshake(
+            HandshakeId=handshake_id
+        )["Handshake"]
+        if invitation["State"] not in ["OPEN", "ACCEPTED"]:
+            self.logger.info(
+                f"Invitation {handshake_id} for {account_id} is {invitation['State']}, inviting again..."
+            )
+            return None
+        self.add_invitation(invitation)
+        return invitation
+
+    def record_invitation(self, account_id: str, handshake_id: str):
+        # an account that already left the source organization stays removed when it is invited again, the
+        # mirrored destination is recorded before it leaves so a resumed run can still move it there
+        entry = self.journal_entry(account_id)
+        state = REMOVED if entry is not None and entry["State"] == REMOVED else INVITED
+        self.record(
+            account_id,
+            state,
+            handshake_id,
+            destination_id=self.mirrored_destination_id(account_id),
+        )
+
+    def send_invitation(self, account: dict, is_quiet=False) -> Optional[dict]:
         if not is_quiet:
-            confirm = prompt(
+            if not confirm(
                 f"Invite account {account['Id']} to {self.account_details()}. Proceed? (Y/N): ",
-                default="N",
-                validator=yes_no_validator,
-            )
-            if not strtobool(confirm):
+                self._aws.metrics,
+            ):
                 self.logger.info(f"Skipping account {account['Id']}...")
-                return
+                return None
+        if self.has_reached(account["Id"], INVITED):
+            invitation = self.journaled_invitation(account["Id"])
+            if invitation is not None:
+                self.logger.info(
+                    f"Account {account['Id']} already invited, skipping..."
+                )
+                return invitation
+        invitation = self.find_invitation(account["Id"])
+        if invitation is not None:
+            self.logger.info(
+                f"Account {account['Id']} already has open invitation {invitation['Id']}, skipping..."
+            )
+            self.record_invitation(account["Id"], invitation["Id"])
+            return invitation
         self.logger.info(f"Inviting account {account['Id']}")
         try:
             response = self._aws.organizations.invite_account_to_organization(
                 Target={"Id": account["Id"], "Type": "ACCOUNT"},
                 Notes="Invite generated by AWS Account Migration Example Script",
             )
-            self.invitations.append(response["Handshake"])
+            self.add_invitation(response["Handshake"])
+            if self.snapshot is not None:
+                self.snapshot.put_item(
+                    "open_invitations",
+                    response["Handshake"]["Id"],
+                    compact_handshake(response["Handshake"]),
+                )
+            self.record_invitation(account["Id"], response["Handshake"]["Id"])
+            return response["Handshake"]
         except botocore.exceptions.ClientError as error:
             if error.response["Error"]["Code"] == "DuplicateHandshakeException":
                 self.logger.warning("Invitation already sent...")
+                invitation = self.find_invitation(account["Id"])
+                if invitation is not None:
+                    self.record_invitation(account["Id"], invitation["Id"])
+                return invitation
             else:
                 raise error
 
-    def invite(self, source: SourceAwsOrganization, is_quiet=False):
-        for account in source.child_accounts:
-            self.send_invitation(account, is_quiet)
-        # if we didn't specify a single account invite the root account
-        if not source.account_was_specified:
-            self.send_invitation(source.root_account, is_quiet)
-        return self.invitations
+    def invite(self, source: SourceAwsOrganization, is_quiet=False, workers=1):
+        if workers > 1 and not is_quiet:
+            self.logger.warning(
+                "Concurrent invitations require quiet mode, inviting accounts one at a time"
+            )
+            workers = 1
+        if workers > 1:
+            self.logger.info(f"Inviting accounts using {workers} workers")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # consume the results so the first failed invitation is raised here
+                invitations = list(
+                    executor.map(
+                        lambda account: self.send_invitation(account, is_quiet),
+                        source.child_accounts,
+                    )
+                )
+        else:
+            invitations = [
+                self.send_invitation(account, is_quiet)
+                for account in source.child_accounts
+            ]
+        # if we are migrating the whole organization invite the root account
+        if source.includes_management_account:
+            invitations.append(self.send_invitation(source.root_account, is_quiet))
+        # the open invitations of the target include the accounts of other source organizations
+        return [invitation for invitation in invitations if invitation is not None]
+
+    def is_already_moved(self, account: str) -> bool:
+        # the move of an account accepted by an earlier run may have succeeded without reaching the journal,
+        # such an account never shows up under the root
+        if account not in self._accepted_before:
+            return False
+        target_organization_id = self._accepted_before.pop(account)
+        if target_organization_id not in [None, self.organization["Id"]]:
+            return False
+        # one sweep of the root rules out the accounts still waiting to be moved before any is looked up
+        if self.readiness.is_present(account):
+            return False
+        parent_id = self.parent_id_of(account)
+        if parent_id is None or parent_id == self.root_ou:
+            return False
+        self.logger.info(f"Account {account} already moved to {parent_id}, skipping...")
+        self.tree.place_account({"Id": account}, parent_id)
+        self.record(account, MOVED)
+        return True
+
+    def stays_in_root(self, account: str) -> bool:
+        destination = self.destination_for(account)
+        return destination is None or destination["Id"] == self.root_ou
 
     def move_accounts(self, accounts: [str], is_quiet=False):
+        pending = []
         for account in accounts:
+            if self.has_reached(account, MOVED):
+                continue
+            # an account that stays in the root is not moved so it is not waited for
+            if self.stays_in_root(account):
+                self.move_account(account, is_quiet)
+            elif not self.is_already_moved(account):
+                pending.append(account)
+        # an accepted account can only be moved once it has joined the organization
+        for account in self.readiness.ready(pending):
             self.move_account(account, is_quiet)
 
+    def move_account_when_ready(self, account: str, is_quiet=False):
+        if (
+            not self.has_reached(account, MOVED)
+            and not self.stays_in_root(account)
+            and not self.is_already_moved(account)
+        ):
+            self.readiness.wait_for(account)
+        self.move_account(account, is_quiet)
+
     def move_account(self, account: str, is_quiet=False):
-        if self.destination_ou is not None:
+        if self.has_reached(account, MOVED):
+            self.logger.info(f"Account {account} already moved, skipping...")
+            return
+        destination = self.destination_for(account)
+        if destination is not None and destination["Id"] != self.root_ou:
             if not is_quiet:
-                confirm = prompt(
-                    f"Move account {account} from root OU {self.root_ou} to destination OU {self.destination_ou['Id']} - {self.destination_ou['Name']}. Proceed? (Y/N): ",
-                    default="N",
-                    validator=yes_no_validator,
-                )
-                if not strtobool(confirm):
+                if not confirm(
+                    f"Move account {account} from root OU {self.root_ou} to destination OU {destination['Id']} - {destination['Name']}. Proceed? (Y/N): ",
+                    self._aws.metrics,
+                ):
                     return
             self.logger.info(
-                f"Moving account {account} from root OU {self.root_ou} to destination OU {self.destination_ou['Id']} - {self.destination_ou['Name']}"
+                f"Moving account {account} from root OU {self.root_ou} to destination OU {destination['Id']} - {destination['Name']}"
             )
             self._aws.organizations.move_account(
                 AccountId=account,
                 SourceParentId=self.root_ou,
-                DestinationParentId=self.destination_ou["Id"],
+                DestinationParentId=destination["Id"],
             )
+            self.tree.place_account({"Id": account}, destination["Id"])
+        else:
+            self.tree.place_account({"Id": account}, self.root_ou)
+        self.record(account, MOVED)
+
+    def account_ids_for_parent(self, parent_id: str) -> List[str]:
+        accounts_iterator = self._aws.list_accounts_for_parent.paginate(
+            ParentId=parent_id,
+            PaginationConfig={
+                "PageSize": MAX_PAGE_SIZE,
+            },
+        )
+        return [
+            account["Id"] for page in accounts_iterator for account in page["Accounts"]
+        ]
+
+    def parent_id_of(self, account: str) -> Optional[str]:
+        try:
+            parents = self._aws.organizations.list_parents(ChildId=account)["Parents"]
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] in [
+                "AccountNotFoundException",
+                "ChildNotFoundException",
+            ]:
+                return None
+            raise error
+        return parents[0]["Id"]
+
+    def correct_placement(
+        self, account: str, parent_id: str, destination_id: str, is_quiet=False
+    ) -> bool:
+        if not is_quiet:
+            if not confirm(
+                f"Move account {account} from OU {parent_id} to expected OU {destination_id}. Proceed? (Y/N): ",
+                self._aws.metrics,
+            ):
+                return False
+        self.logger.info(
+            f"Moving account {account} from OU {parent_id} to expected OU {destination_id}"
+        )
+        self._aws.organizations.move_account(
+            AccountId=account,
+            SourceParentId=parent_id,
+            DestinationParentId=destination_id,
+        )
+        self.tree.place_account({"Id": account}, destination_id)
+        self.record(account, MOVED)
+        return True
@@ -0,0 +1,286 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from typing import Dict, Iterator, List, Optional
+
+from aws_account_migration_example.runtime.aws import (
+    MAX_PAGE_SIZE,
+    Aws,
+    compact_account,
+)
+from aws_account_migration_example.runtime.snapshot import OrganizationSnapshot
+
+DEFAULT_TREE_WORKERS = 8
+
+
+class OrganizationalUnit:
+    id: str
+    name: str
+    parent_id: Optional[str]
+    path: str
+    children: List["OrganizationalUnit"]
+    accounts: List[dict]
+
+    def __init__(self, **kwargs):
+        self.id = kwargs["id"]
+        self.name = kwargs["name"]
+        self.parent_id = kwargs.get("parent_id")
+        self.path = kwargs["path"]
+        self.children = []
+        self.accounts = []
+
+    @property
+    def depth(self) -> int:
+        return self.path.count("/")
+
+    def as_dict(self) -> dict:
+        return {
+            "Id": self.id,
+            "Name": self.name,
+            "ParentId": self.parent_id,
+            "Path": self.path,
+            "Accounts": self.accounts,
+        }
+
+
+class OrganizationTree:
+    workers: int
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self._aws: Aws = kwargs["aws"]
+        self.workers = kwargs.get("workers", DEFAULT_TREE_WORKERS)
+        self.logger = kwargs.get("logger", logging.getLogger("tree"))
+        self.snapshot: Optional[OrganizationSnapshot] = kwargs.get("snapshot")
+        self._root: Optional[OrganizationalUnit] = None
+        self._units: Dict[str, OrganizationalUnit] = {}
+        self._account_parents: Dict[str, OrganizationalUnit] = {}
+        # accounts that left the organization during this run are still mirrored to their last OU
+        self._former_parents: Dict[str, OrganizationalUnit] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> OrganizationalUnit:
+        return self.load()
+
+    def load(self) -> OrganizationalUnit:
+        # the tree is walked once on first use and served from memory afterwards
+        with self._lock:
+            if self._root is None and self.snapshot is None:
+                self._root = self._walk()
+            elif self._root is None:
+                units = list(
+                    self.snapshot.items("tree", lambda unit: unit["Id"], self._fetch)
+                )
+                if self._root is None:
+                    self._root = self._restore(units)
+            return self._root
+
+    def _fetch(self) -> List[dict]:
+        self._root = self._walk()
+        return [unit.as_dict() for unit in self._units.values()]
+
+    def _restore(self, units: List[dict]) -> OrganizationalUnit:
+        root = None
+        for values in units:
+            unit = OrganizationalUnit(
+                id=values["Id"],
+                name=values["Name"],
+                parent_id=values["ParentId"],
+                path=values["Path"],
+            )
+            unit.accounts = values["Accounts"]
+            self._units[unit.id] = unit
+            if unit.parent_id is None:
+                root = unit
+        for unit in self._units.values():
+            if unit.parent_id is not None:
+                self._units[unit.parent_id].children.append(unit)
+            for account in unit.accounts:
+                self._account_parents[account["Id"]] = unit
+        self.logger.info(
+            f"Loaded {len(self._units)} organizational units and {len(self._account_parents)} accounts from {self.snapshot.cache.path}"
+        )
+        return root
+
+    # changes made by this tool are applied to the loaded tree and its snapshot instead of walking it again
+    def _save(self, *units: OrganizationalUnit):
+        if self.snapshot is not None:
+            for unit in units:
+                self.snapshot.put_item("tree", unit.id, unit.as_dict())
+
+    def _discard(self):
+        # a snapshot that was not loaded by this run cannot be patched
+        if self.snapshot is not None:
+            self.snapshot.discard("tree")
+
+    def remove_account(self, account_id: str):
+        with self._lock:
+            if self._root is None:
+                self._discard()
+                return
+            unit = self._account_parents.pop(account_id, None)
+            if unit is not None:
+                self._former_parents[account_id] = unit
+                unit.accounts = [
+                    account for account in unit.accounts if account["Id"] != account_id
+                ]
+                self._save(unit)
+
+    def place_account(self, account: dict, organizational_unit_id: str):
+        with self._lock:
+            destination = self._units.get(organizational_unit_id)
+            if self._root is None or destination is None:
+                self._discard()
+                return
+            previous = self._account_parents.get(account["Id"])
+            if previous is destination:
+                return
+            if previous is not None:
+                previous.accounts = [
+                    existing
+                    for existing in previous.accounts
+                    if existing["Id"] != account["Id"]
+                ]
+                self._save(previous)
+            destination.accounts.append(account)
+            self._account_parents[account["Id"]] = destination
+            self._save(destination)
+
+    def add_unit(self, organizational_unit: dict, parent_id: str):
+        with self._lock:
+            parent = self._units.get(parent_id)
+            if self._root is None or parent is None:
+                self._discard()
+                return
+            if organizational_unit["Id"] in self._units:
+                return
+            unit = OrganizationalUnit(
+                id=organizational_unit["Id"],
+                name=organizational_unit["Name"],
+                parent_id=parent.id,
+                path=f"{parent.path}/{organizational_unit['Name']}",
+            )
+            parent.children.append(unit)
+            self._units[unit.id] = unit
+            self._save(unit)
+
+    def _walk(self) -> OrganizationalUnit:
+        root = self._aws.organizations.list_roots()["Roots"][0]
+        root_unit = OrganizationalUnit(id=root["Id"], name=root["Name"], path="")
+        self.logger.info(f"Walking organizational units from root {root_unit.id}")
+        level = [root_unit]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while level:
+                for unit in level:
+                    self._units[unit.id] = unit
+                level = [
+                    child
+                    for children in executor.map(self._expand, level)
+                    for child in children
+                ]
+        for unit in self._units.values():
+            for account in unit.accounts:
+                self._account_parents[account["Id"]] = unit
+        self.logger.info(
+            f"Found {len(self._units)} organizational units and {len(self._account_parents)} accounts"
+        )
+        return root_unit
+
+    def _expand(self, unit: OrganizationalUnit) -> List[OrganizationalUnit]:
+        for page in self._aws.list_accounts_for_parent.paginate(
+            ParentId=unit.id, PaginationConfig={"PageSize": MAX_PAGE_SIZE}
+        ):
+            unit.accounts.extend(
+                compact_account(account) for account in page["Accounts"]
+            )
+        for page in self._aws.list_organizational_units_for_parent.paginate(
+            ParentId=unit.id, PaginationConfig={"PageSize": MAX_PAGE_SIZE}
+        ):
+            unit.children.extend(
+                OrganizationalUnit(
+                    id=ou["Id"],
+                    name=ou["Name"],
+                    parent_id=unit.id,
+                    path=f"{unit.path}/{ou['Name']}",
+                )
+                for ou in page["OrganizationalUnits"]
+            )
+        return unit.children
+
+    def find(self, organizational_unit_id: str) -> OrganizationalUnit:
+        root = self.load()
+        if organizational_unit_id not in self._units:
+            raise ValueError(
+                f"Organizational unit {organizational_unit_id} not found under root {root.id}"
+            )
+        return self._units[organizational_unit_id]
+
+    def units(self) -> Iterator[OrganizationalUnit]:
+        return self.subtree(self.root.id)
+
+    def subtree(self, organizational_unit_id: str) -> Iterator[OrganizationalUnit]:
+        pending = [self.find(organizational_unit_id)]
+        while pending:
+            unit = pending.pop()
+            yield unit
+            pending.extend(reversed(unit.children))
+
+    def parent_of(self, account_id: str) -> Optional[OrganizationalUnit]:
+        self.load()
+        return self._account_parents.get(account_id) or self._former_parents.get(
+            account_id
+        )
+
+    def accounts(
+        self,
+        organizational_unit_ids: Optional[List[str]] = None,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+    ) -> Iterator[dict]:
+        seen = set()
+        for organizational_unit_id in organizational_unit_ids or [self.root.id]:
+            for unit in self.subtree(organizational_unit_id):
+                for account in unit.accounts:
+                    if account["Id"] in seen:
+                        continue
+                    seen.add(account["Id"])
+                    if matches_patterns(account, unit.path, include, exclude):
+                        yield account
+
+
+def matches_patterns(
+    account: dict,
+    path: str,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+) -> bool:
+    # patterns are matched against the account ID, the account name and the OU path, e.g. /Workloads/Prod,
+    # which is also matched with a trailing / so */Sandbox/* covers the accounts directly in Sandbox
+    path = path or "/"
+    values = [account["Id"], account.get("Name") or "", path, path.rstrip("/") + "/"]
+    if include and not any(
+        fnmatch(value, pattern) for pattern in include for value in values
+    ):
+        return False
+    if exclude and any(
+        fnmatch(value, pattern) for pattern in exclude for value in values
+    ):
+        return False
+    return True
@@ -0,0 +1,96 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+
+DEFAULT_PIPELINE_WORKERS = 8
+
+
+class MigrationPipeline:
+    source: SourceAwsOrganization
+    target: TargetAwsOrganization
+    accounts: Iterable[dict]
+    management_account: Optional[dict]
+    workers: int
+    is_quiet: bool
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self.source = kwargs["source"]
+        self.target = kwargs["target"]
+        self.accounts = kwargs.get("accounts", self.source.child_accounts)
+        self.management_account = (
+            kwargs["management_account"]
+            if "management_account" in kwargs
+            else (
+                self.source.root_account
+                if self.source.includes_management_account
+                else None
+            )
+        )
+        self.is_quiet = kwargs.get("is_quiet", False)
+        self.workers = kwargs.get("workers") or DEFAULT_PIPELINE_WORKERS
+        self.logger = logging.getLogger("pipeline")
+        self.logger.setLevel(logging.INFO)
+        if self.workers > 1 and not self.is_quiet:
+            self.logger.warning(
+                "Concurrent migration requires quiet mode, migrating accounts one at a time"
+            )
+            self.workers = 1
+
+    def migrate_account(self, account: dict) -> Optional[str]:
+        invitation = self.target.send_invitation(account, self.is_quiet)
+        if invitation is None:
+            return None
+        account_id = self.source.accept_invitation(invitation, self.is_quiet)
+        if account_id is not None:
+            self.target.move_account_when_ready(account_id, self.is_quiet)
+        return account_id
+
+    def run(self) -> List[str]:
+        self.logger.info(
+            f"Migrating accounts from {self.source.account_details()} using {self.workers} workers"
+        )
+        retries = self.source.retry_queue()
+
+        def migrate_account(account: dict) -> Optional[str]:
+            # a failing account is retried later instead of stopping the other accounts
+            return retries.attempt(account["Id"], account, self.migrate_account)
+
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                account_ids = list(executor.map(migrate_account, self.accounts))
+        else:
+            # prompts must stay on the main thread
+            account_ids = [migrate_account(account) for account in self.accounts]
+        account_ids.extend(retries.drain(self.migrate_account))
+        self.source.failures.update(retries.failures)
+        migrated_ids = [account_id for account_id in account_ids if account_id]
+        # the management account can only leave once every child account has left the organization
+        if (
+            self.management_account is not None
+            and self.source.can_migrate_management_account()
+        ):
+            account_id = self.migrate_account(self.management_account)
+            if account_id is not None:
+                migrated_ids.append(account_id)
+        return migrated_ids
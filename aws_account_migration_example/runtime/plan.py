@@ -0,0 +1,311 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import csv
+import logging
+import shlex
+from typing import List, Optional
+
+from aws_account_migration_example.runtime.journal import (
+    ACCEPTED,
+    INVITED,
+    MOVED,
+    REMOVED,
+)
+from aws_account_migration_example.runtime.metrics import Metrics, shared_metrics
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+from aws_account_migration_example.runtime.organization_tree import matches_patterns
+from aws_account_migration_example.runtime.pipeline import (
+    DEFAULT_PIPELINE_WORKERS,
+    MigrationPipeline,
+)
+from aws_account_migration_example.runtime.prompts import ask, is_yes
+
+DONE = "done"
+PLAN_COMMANDS = """Commands:
+  show                      print the plan again
+  exclude PATTERN           do not migrate accounts whose ID or name matches PATTERN
+  include PATTERN           migrate excluded accounts whose ID or name matches PATTERN again
+  move PATTERN OU_ID        move accounts whose ID or name matches PATTERN to OU_ID
+  save FILE                 write the plan as a manifest that can be edited and passed to --manifest
+  yes                       approve the plan and migrate every included account without further prompts
+  no                        cancel the migration"""
+
+
+class PlannedAccount:
+    account: dict
+    invitation: str
+    removal: str
+    acceptance: str
+    destination: Optional[dict]
+    destination_label: str
+    is_management_account: bool
+    is_excluded: bool
+
+    def __init__(self, **kwargs):
+        self.account = kwargs["account"]
+        self.invitation = kwargs["invitation"]
+        self.removal = kwargs["removal"]
+        self.acceptance = kwargs["acceptance"]
+        self.destination = kwargs.get("destination")
+        self.destination_label = kwargs["destination_label"]
+        self.is_management_account = kwargs.get("is_management_account", False)
+        self.is_excluded = False
+
+    @property
+    def id(self) -> str:
+        return self.account["Id"]
+
+    def matches(self, pattern: str) -> bool:
+        return matches_patterns(self.account, "", include=[pattern])
+
+
+class MigrationPlan:
+    # computes every step of the migration up front so it can be approved once and run without prompts
+    source: SourceAwsOrganization
+    target: TargetAwsOrganization
+    is_mirror: bool
+    accounts: List[PlannedAccount]
+    management_account: Optional[PlannedAccount]
+    metrics: Metrics
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self.source = kwargs["source"]
+        self.target = kwargs["target"]
+        self.is_mirror = kwargs.get("is_mirror", False)
+        self.metrics = kwargs.get("metrics") or shared_metrics()
+        self.logger = kwargs.get("logger", logging.getLogger("plan"))
+        self.accounts = []
+        self.management_account = None
+
+    def build(self) -> "MigrationPlan":
+        self.logger.info(f"Planning migration from {self.source.account_details()}")
+        for account in self.source.child_accounts:
+            self.accounts.append(self._plan(account, False))
+        if self.source.includes_management_account:
+            self.management_account = self._plan(self.source.root_account, True)
+        return self
+
+    def _plan(self, account: dict, is_management_account: bool) -> PlannedAccount:
+        account_id = account["Id"]
+        if self.target.has_reached(account_id, INVITED):
+            invitation = DONE
+        else:
+            open_invitation = self.target.find_invitation(account_id)
+            invitation = (
+                f"reuse {open_invitation['Id']}"
+                if open_invitation is not None
+                else "invite"
+            )
+        target_organization_id = self.target.organization["Id"]
+        if self.source.has_reached(account_id, REMOVED, target_organization_id):
+            removal = DONE
+        else:
+            removal = "delete organization" if is_management_account else "remove"
+        acceptance = (
+            DONE
+            if self.source.has_reached(account_id, ACCEPTED, target_organization_id)
+            else "accept"
+        )
+        destination = None
+        if self.target.has_reached(account_id, MOVED):
+            destination_label = DONE
+        elif account_id in self.target.account_destinations or not self.is_mirror:
+            destination = self.target.destination_for(account_id)
+            destination_label = self._label(destination)
+        else:
+            # mirrored OUs are only created once the plan is approved, the OU of an account that left the
+            # source organization in an earlier run was journaled when it was invited
+            parent = self.source.tree.parent_of(account_id)
+            entry = self.target.journal_entry(account_id)
+            if parent is None and entry is not None and entry["DestinationId"]:
+                unit = self.target.tree.find(entry["DestinationId"])
+                destination_label = self._label({"Id": unit.id, "Name": unit.name})
+            else:
+                path = parent.path if parent is not None else ""
+                destination_label = f"mirror of {path or '/'}"
+        return PlannedAccount(
+            account=account,
+            invitation=invitation,
+            removal=removal,
+            acceptance=acceptance,
+            destination=destination,
+            destination_label=destination_label,
+            is_management_account=is_management_account,
+        )
+
+    def _label(self, destination: Optional[dict]) -> str:
+        if destination is None or destination["Id"] == self.target.root_ou:
+            return "stay in root"
+        return f"{destination['Id']} - {destination['Name']}"
+
+    @property
+    def included(self) -> List[PlannedAccount]:
+        return [planned for planned in self.accounts if not planned.is_excluded]
+
+    @property
+    def includes_management_account(self) -> bool:
+        # the source organization can only be deleted once every other account has left it
+        return (
+            self.management_account is not None
+            and not self.management_account.is_excluded
+            and len(self.included) == len(self.accounts)
+        )
+
+    def _all(self) -> List[PlannedAccount]:
+        if self.management_account is None:
+            return self.accounts
+        return self.accounts + [self.management_account]
+
+    def exclude(self, pattern: str) -> int:
+        matched = [planned for planned in self._all() if planned.matches(pattern)]
+        for planned in matched:
+            planned.is_excluded = True
+        return len(matched)
+
+    def include(self, pattern: str) -> int:
+        matched = [planned for planned in self._all() if planned.matches(pattern)]
+        for planned in matched:
+            planned.is_excluded = False
+        return len(matched)
+
+    def move(self, pattern: str, organizational_unit_id: str) -> int:
+        # raises ValueError for OUs that do not exist in the target organization
+        unit = self.target.tree.find(organizational_unit_id)
+        destination = {"Id": unit.id, "Name": unit.name}
+        matched = [
+            planned
+            for planned in self._all()
+            if planned.matches(pattern) and planned.destination_label != DONE
+        ]
+        for planned in matched:
+            planned.destination = destination
+            planned.destination_label = self._label(destination)
+            self.target.account_destinations[planned.id] = unit.id
+        return len(matched)
+
+    def save(self, path: str):
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["account_id", "destination_ou", "skip"])
+            for planned in self.accounts:
+                writer.writerow(
+                    [
+                        planned.id,
+                        planned.destination["Id"] if planned.destination else "",
+                        "yes" if planned.is_excluded else "",
+                    ]
+                )
+
+    def table(self) -> str:
+        header = [
+            "",
+            "Account",
+            "Name",
+            "Invitation",
+            "Leave source",
+            "Accept",
+            "Destination",
+        ]
+        rows = [header]
+        for planned in self._all():
+            excluded = planned.is_excluded or (
+                planned.is_management_account and not self.includes_management_account
+            )
+            rows.append(
+                [
+                    "-" if excluded else "+",
+                    planned.id,
+                    planned.account.get("Name", ""),
+                    planned.invitation,
+                    planned.removal,
+                    planned.acceptance,
+                    planned.destination_label,
+                ]
+            )
+        widths = [
+            max(len(row[column]) for row in rows) for column in range(len(header))
+        ]
+        lines = [
+            "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+            for row in rows
+        ]
+        lines.append(self.summary())
+        return "\n".join(lines)
+
+    def summary(self) -> str:
+        included = self.included
+        summary = (
+            f"{len(included)} of {len(self.accounts)} child accounts will be migrated"
+        )
+        if self.includes_management_account:
+            summary += (
+                f", then management account {self.management_account.id} and organization"
+                f" {self.source.organization['Id']} is deleted"
+            )
+        elif self.management_account is not None:
+            summary += (
+                ", the management account stays because not every account is migrated"
+            )
+        return summary
+
+    def review(self) -> bool:
+        # the only prompt of the migration, everything after approval runs unattended
+        print(self.table())
+        print(PLAN_COMMANDS)
+        while True:
+            try:
+                command = shlex.split(ask("plan> ", self.metrics))
+                if not command:
+                    continue
+                name, arguments = command[0].lower(), command[1:]
+                if name == "show":
+                    print(self.table())
+                elif name == "exclude" and len(arguments) == 1:
+                    print(f"Excluded {self.exclude(arguments[0])} accounts")
+                elif name == "include" and len(arguments) == 1:
+                    print(f"Included {self.include(arguments[0])} accounts")
+                elif name == "move" and len(arguments) == 2:
+                    print(f"Moving {self.move(arguments[0], arguments[1])} accounts")
+                elif name == "save" and len(arguments) == 1:
+                    self.save(arguments[0])
+                    print(f"Plan written to {arguments[0]}")
+                elif len(arguments) == 0 and name in ("y", "yes", "n", "no"):
+                    return is_yes(name)
+                else:
+                    print(PLAN_COMMANDS)
+            # unbalanced quotes are reported like any other invalid command
+            except ValueError as error:
+                print(error)
+
+    def execute(self, workers: int = DEFAULT_PIPELINE_WORKERS) -> List[str]:
+        if self.is_mirror:
+            self.target.mirror_organizational_units(self.source)
+        return MigrationPipeline(
+            source=self.source,
+            target=self.target,
+            is_quiet=True,
+            workers=workers,
+            accounts=[planned.account for planned in self.included],
+            management_account=(
+                self.management_account.account
+                if self.includes_management_account
+                else None
+            ),
+        ).run()
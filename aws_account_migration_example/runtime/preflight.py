@@ -0,0 +1,172 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import csv
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from aws_account_migration_example.runtime.aws import ACCEPT_INVITATION_ROLE_NAME
+from aws_account_migration_example.runtime.journal import ACCEPTED
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+
+DEFAULT_PREFLIGHT_WORKERS = 16
+ACCEPT_ACTIONS = ["organizations:AcceptHandshake"]
+PASSED = "passed"
+FAILED = "failed"
+UNVERIFIED = "unverified"
+
+
+class PreflightResult:
+    account: dict
+    assume_role: str
+    accept_handshake: str
+    error: Optional[str]
+
+    def __init__(self, **kwargs):
+        self.account = kwargs["account"]
+        self.assume_role = kwargs.get("assume_role", FAILED)
+        self.accept_handshake = kwargs.get("accept_handshake", FAILED)
+        self.error = kwargs.get("error")
+
+    @property
+    def id(self) -> str:
+        return self.account["Id"]
+
+    @property
+    def is_passed(self) -> bool:
+        # roles deployed before the simulation permission was added to the template can not be verified
+        return self.assume_role == PASSED and self.accept_handshake != FAILED
+
+
+class PreflightCheck:
+    # assumes the accept invitation role in every selected source account before anything is changed,
+    # the credentials stay in the account cache of the source organization for the migration itself
+    source: SourceAwsOrganization
+    target: TargetAwsOrganization
+    workers: int
+    results: List[PreflightResult]
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self.source = kwargs["source"]
+        self.target = kwargs["target"]
+        self.workers = kwargs.get("workers", DEFAULT_PREFLIGHT_WORKERS)
+        self.results = []
+        self.logger = logging.getLogger("preflight")
+        self.logger.setLevel(logging.INFO)
+
+    @property
+    def handshake_arn(self) -> str:
+        # any handshake of the target organization, the role only accepts invitations from it
+        organization = self.target.organization
+        return f"arn:aws:organizations::{organization['MasterAccountId']}:handshake/{organization['Id']}/invite/h-0000000000"
+
+    def _check(self, account: dict) -> PreflightResult:
+        result = PreflightResult(account=account)
+        try:
+            account_scoped_aws = self.source.account_scoped_aws(account)
+        except ClientError as error:
+            result.error = error.response["Error"]["Message"]
+            return result
+        except BotoCoreError as error:
+            # an unreachable endpoint or missing credentials fail this account, not the whole check
+            result.error = str(error)
+            return result
+        result.assume_role = PASSED
+        try:
+            response = account_scoped_aws.iam.simulate_principal_policy(
+                PolicySourceArn=f"arn:aws:iam::{account['Id']}:role/{ACCEPT_INVITATION_ROLE_NAME}",
+                ActionNames=ACCEPT_ACTIONS,
+                ResourceArns=[self.handshake_arn],
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] != "AccessDenied":
+                result.error = error.response["Error"]["Message"]
+                return result
+            result.accept_handshake = UNVERIFIED
+            result.error = "The role is not allowed to simulate its policies, update the accept invitation role stack"
+            return result
+        except BotoCoreError as error:
+            result.error = str(error)
+            return result
+        denied = [
+            evaluation["EvalActionName"]
+            for evaluation in response["EvaluationResults"]
+            if evaluation["EvalDecision"] != "allowed"
+        ]
+        if denied:
+            result.error = f"{', '.join(denied)} denied for handshakes of organization {self.target.organization['Id']}"
+        else:
+            result.accept_handshake = PASSED
+        return result
+
+    def accounts(self) -> List[dict]:
+        return [
+            account
+            for account in self.source.child_accounts
+            if not self.source.has_reached(
+                account["Id"], ACCEPTED, self.target.organization["Id"]
+            )
+        ]
+
+    def run(self) -> bool:
+        accounts = self.accounts()
+        self.logger.info(
+            f"Checking the accept invitation role in {len(accounts)} accounts using {self.workers} workers"
+        )
+        # checked last to first so the least recently used credentials evicted from a full account
+        # cache are the ones of the accounts migrated last
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            self.results = list(executor.map(self._check, reversed(accounts)))
+        self.results.reverse()
+        for result in self.failures:
+            self.logger.error(f"Account {result.id}: {result.error}")
+        for result in self.results:
+            if result.is_passed and result.error is not None:
+                self.logger.warning(f"Account {result.id}: {result.error}")
+        self.logger.info(
+            f"{len(self.results) - len(self.failures)} accounts passed, {len(self.failures)} failed"
+        )
+        return not self.failures
+
+    @property
+    def failures(self) -> List[PreflightResult]:
+        return [result for result in self.results if not result.is_passed]
+
+    def save(self, path: str, is_append=False):
+        # the checks of several source organizations are appended to one report
+        with open(path, "a" if is_append else "w", newline="") as file:
+            writer = csv.writer(file)
+            if not is_append:
+                writer.writerow(
+                    ["AccountId", "Name", "AssumeRole", "AcceptHandshake", "Error"]
+                )
+            for result in self.results:
+                writer.writerow(
+                    [
+                        result.id,
+                        result.account.get("Name") or "",
+                        result.assume_role,
+                        result.accept_handshake,
+                        result.error or "",
+                    ]
+                )
+        self.logger.info(f"Wrote pre-flight report to {path}")
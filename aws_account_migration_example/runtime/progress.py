@@ -0,0 +1,159 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Callable, Dict, Optional, TextIO
+
+from aws_account_migration_example.runtime.journal import MOVED, STATES
+from aws_account_migration_example.runtime.metrics import Metrics
+from aws_account_migration_example.runtime.rate_limiter import AdaptiveRateLimiter
+
+DEFAULT_PROGRESS_INTERVAL = 5.0
+# throughput and ETA are computed over the accounts moved in this many recent seconds
+THROUGHPUT_WINDOW = 300.0
+# the live terminal view is redrawn at least this often
+TTY_INTERVAL = 1.0
+
+
+class MigrationProgress:
+    # counts every journal state reached by an account, the migration threads only update counters and
+    # everything else is computed by the reporter thread when it renders
+    total: Callable[[], Optional[int]]
+    interval: float
+    window: float
+    stream: TextIO
+    is_tty: bool
+
+    def __init__(self, **kwargs):
+        self.total = kwargs.get("total") or (lambda: None)
+        self.rate_limiter: Optional[AdaptiveRateLimiter] = kwargs.get("rate_limiter")
+        self.metrics: Optional[Metrics] = kwargs.get("metrics")
+        self.window = kwargs.get("window", THROUGHPUT_WINDOW)
+        self.stream = kwargs.get("stream") or sys.stderr
+        self.is_tty = kwargs.get("is_tty", self.stream.isatty())
+        self.interval = kwargs.get("interval", DEFAULT_PROGRESS_INTERVAL)
+        if self.is_tty:
+            self.interval = min(self.interval, TTY_INTERVAL)
+        self.counts: Dict[str, int] = {state: 0 for state in STATES}
+        self._reached: Dict[str, int] = {}
+        self._moved_at = deque()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, account_id: str, state: str):
+        index = STATES.index(state)
+        with self._lock:
+            reached = self._reached.get(account_id, -1)
+            if index <= reached:
+                return
+            self._reached[account_id] = index
+            # a resumed account may skip states that were reached in an earlier run
+            for skipped in STATES[reached + 1 : index + 1]:
+                self.counts[skipped] += 1
+            if state == MOVED:
+                self._moved_at.append(time.monotonic())
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            counts = dict(self.counts)
+            while self._moved_at and self._moved_at[0] < now - self.window:
+                self._moved_at.popleft()
+            recently_moved = len(self._moved_at)
+        elapsed = now - self._started
+        window = min(elapsed, self.window)
+        per_minute = recently_moved / window * 60 if window > 0 else 0.0
+        total = self.total()
+        remaining = None if total is None else max(0, total - counts[MOVED])
+        eta = (
+            remaining / per_minute * 60
+            if remaining is not None and per_minute > 0
+            else None
+        )
+        status = {
+            "elapsed_seconds": round(elapsed, 1),
+            "total": total,
+            **counts,
+            "accounts_per_minute": round(per_minute, 2),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+        # calls are timed from before the rate limiter wait until the response, so the wait is taken off
+        if self.rate_limiter is not None:
+            status["rate_limiter_wait_seconds"] = round(
+                self.rate_limiter.delay_seconds(), 3
+            )
+        if self.metrics is not None:
+            status["api_seconds"] = round(
+                self.metrics.latency_seconds()
+                - status.get("rate_limiter_wait_seconds", 0.0),
+                3,
+            )
+        return status
+
+    def line(self, status: dict) -> str:
+        total = status["total"] if status["total"] is not None else "?"
+        eta = (
+            str(timedelta(seconds=int(status["eta_seconds"])))
+            if status["eta_seconds"] is not None
+            else "--:--:--"
+        )
+        parts = [
+            f"{status[MOVED]}/{total} moved",
+            " ".join(f"{state} {status[state]}" for state in STATES[:-1]),
+            f"{status['accounts_per_minute']:.1f}/min",
+            f"ETA {eta}",
+            f"elapsed {timedelta(seconds=int(status['elapsed_seconds']))}",
+        ]
+        if "rate_limiter_wait_seconds" in status:
+            parts.append(f"rate limited {status['rate_limiter_wait_seconds']:.0f}s")
+        if "api_seconds" in status:
+            parts.append(f"API {status['api_seconds']:.0f}s")
+        return " | ".join(parts)
+
+    def render(self, is_final=False):
+        status = self.status()
+        if self.is_tty:
+            self.stream.write(f"\r\x1b[K{self.line(status)}")
+            if is_final:
+                self.stream.write("\n")
+        else:
+            self.stream.write(json.dumps({"progress": status}) + "\n")
+        self.stream.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.render()
+
+    def start(self) -> "MigrationProgress":
+        self._thread = threading.Thread(
+            target=self._run, name="migration-progress", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.render(is_final=True)
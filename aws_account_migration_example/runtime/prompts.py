@@ -0,0 +1,39 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import re
+from typing import Optional
+
+from aws_account_migration_example.runtime.metrics import Metrics, shared_metrics
+
+YES_PATTERN = re.compile(r"^\s*[yY]")
+
+
+def is_yes(answer: str) -> bool:
+    return YES_PATTERN.match(answer) is not None
+
+
+def ask(message: str, metrics: Optional[Metrics] = None, **kwargs) -> str:
+    # prompt_toolkit is slow to import and only needed by interactive runs
+    from prompt_toolkit import prompt
+
+    with (metrics or shared_metrics()).operator():
+        return prompt(message, **kwargs)
+
+
+def confirm(message: str, metrics: Optional[Metrics] = None) -> bool:
+    from aws_account_migration_example.runtime.validator import yes_no_validator
+
+    return is_yes(ask(message, metrics, default="N", validator=yes_no_validator))
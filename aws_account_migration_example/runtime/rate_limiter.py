@@ -0,0 +1,209 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import threading
+import time
+from typing import Dict, Optional
+
+# AWS Organizations throttles write operations well below its read operations,
+# stay comfortably under the quota when no rate is specified
+DEFAULT_INVITE_RATE = 2.0
+DEFAULT_OPERATION_RATE = 5.0
+DEFAULT_OPERATION_RATES = {
+    "InviteAccountToOrganization": DEFAULT_INVITE_RATE,
+    "AssumeRole": 20.0,
+}
+DEFAULT_MAX_ATTEMPTS = 10
+THROTTLING_ERROR_CODES = {
+    "TooManyRequestsException",
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+
+
+class TokenBucket:
+    rate: float
+    capacity: float
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Rate must be greater than zero")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self.rate = rate
+
+    def acquire(self) -> float:
+        # blocks until a token is available and returns the number of seconds spent waiting
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class OperationStatistics:
+    calls: int = 0
+    delayed: int = 0
+    delay_seconds: float = 0.0
+    throttled: int = 0
+
+    def as_dict(self, rate: float) -> dict:
+        return {
+            "calls": self.calls,
+            "delayed": self.delayed,
+            "delay_seconds": round(self.delay_seconds, 3),
+            "throttled": self.throttled,
+            "rate": round(rate, 3),
+        }
+
+
+class AdaptiveRateLimiter:
+    # one token bucket per API operation, the rate of an operation is halved every time it is
+    # throttled and recovers additively with every successful call up to its configured rate
+    rates: Dict[str, float]
+    default_rate: float
+    decrease_factor: float
+    increase: float
+    min_rate: float
+
+    def __init__(self, **kwargs):
+        self.rates = {**DEFAULT_OPERATION_RATES, **kwargs.get("rates", {})}
+        self.default_rate = kwargs.get("default_rate", DEFAULT_OPERATION_RATE)
+        self.decrease_factor = kwargs.get("decrease_factor", 0.5)
+        self.increase = kwargs.get("increase", 0.1)
+        self.min_rate = kwargs.get("min_rate", 0.1)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._statistics: Dict[str, OperationStatistics] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, operation: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(operation)
+            if bucket is None:
+                bucket = TokenBucket(self.rates.get(operation, self.default_rate))
+                self._buckets[operation] = bucket
+                self._statistics[operation] = OperationStatistics()
+            return bucket
+
+    def acquire(self, operation: str) -> float:
+        waited = self._bucket(operation).acquire()
+        with self._lock:
+            statistics = self._statistics[operation]
+            statistics.calls += 1
+            if waited > 0:
+                statistics.delayed += 1
+                statistics.delay_seconds += waited
+        return waited
+
+    def on_success(self, operation: str):
+        bucket = self._bucket(operation)
+        max_rate = self.rates.get(operation, self.default_rate)
+        if bucket.rate < max_rate:
+            bucket.set_rate(min(max_rate, bucket.rate + self.increase))
+
+    def on_throttle(self, operation: str):
+        bucket = self._bucket(operation)
+        bucket.set_rate(max(self.min_rate, bucket.rate * self.decrease_factor))
+        with self._lock:
+            self._statistics[operation].throttled += 1
+
+    def delay_seconds(self) -> float:
+        with self._lock:
+            return sum(
+                statistics.delay_seconds for statistics in self._statistics.values()
+            )
+
+    def statistics(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                operation: statistics.as_dict(self._buckets[operation].rate)
+                for operation, statistics in sorted(self._statistics.items())
+            }
+
+    def register(self, client):
+        # before-send is emitted for every attempt so retries are rate limited as well
+        events = client.meta.events
+        events.register("before-send", self._before_send)
+        events.register("needs-retry", self._needs_retry)
+        events.register("after-call", self._after_call)
+
+    def _before_send(self, event_name: str, **kwargs):
+        self.acquire(_operation_name(event_name))
+
+    def _needs_retry(self, event_name: str, response=None, **kwargs):
+        if response is None:
+            return None
+        error_code = response[1].get("Error", {}).get("Code")
+        if error_code in THROTTLING_ERROR_CODES:
+            self.on_throttle(_operation_name(event_name))
+        return None
+
+    def _after_call(self, event_name: str, http_response=None, **kwargs):
+        if http_response is not None and http_response.status_code < 300:
+            self.on_success(_operation_name(event_name))
+
+
+def _operation_name(event_name: str) -> str:
+    return event_name.rsplit(".", 1)[-1]
+
+
+_rate_limiter: Optional[AdaptiveRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def configure_rate_limiter(**kwargs) -> AdaptiveRateLimiter:
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = AdaptiveRateLimiter(**kwargs)
+        return _rate_limiter
+
+
+def shared_rate_limiter() -> AdaptiveRateLimiter:
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = AdaptiveRateLimiter()
+        return _rate_limiter
+
+
+def parse_operation_rates(values: Optional[list]) -> Dict[str, float]:
+    rates = {}
+    for value in values or []:
+        operation, separator, rate = value.partition("=")
+        if not separator or not operation:
+            raise ValueError(f"Expected OPERATION=RATE but got {value}")
+        rates[operation] = float(rate)
+    return rates
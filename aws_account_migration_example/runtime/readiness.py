@@ -0,0 +1,122 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import logging
+import threading
+import time
+from typing import Iterable, Iterator, Set
+
+from aws_account_migration_example.runtime.aws import MAX_PAGE_SIZE, Aws
+
+DEFAULT_READINESS_INTERVAL = 5.0
+DEFAULT_READINESS_TIMEOUT = 600.0
+
+
+class AccountReadinessPoller:
+    # an accepted account can be moved once it shows up under the root of the target organization,
+    # every waiter shares one paginated sweep of the root per interval instead of describing each account
+    parent_id: str
+    interval: float
+    timeout: float
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self._aws: Aws = kwargs["aws"]
+        self.parent_id = kwargs["parent_id"]
+        self.interval = kwargs.get("interval", DEFAULT_READINESS_INTERVAL)
+        self.timeout = kwargs.get("timeout", DEFAULT_READINESS_TIMEOUT)
+        self.logger = kwargs.get("logger", logging.getLogger("readiness"))
+        self._condition = threading.Condition()
+        self._present: Set[str] = set()
+        self._is_sweeping = False
+        self._next_sweep = 0.0
+        self.sweeps = 0
+
+    def _sweep(self) -> Set[str]:
+        accounts_iterator = self._aws.list_accounts_for_parent.paginate(
+            ParentId=self.parent_id,
+            PaginationConfig={
+                "PageSize": MAX_PAGE_SIZE,
+            },
+        )
+        self.sweeps += 1
+        return {
+            account["Id"] for page in accounts_iterator for account in page["Accounts"]
+        }
+
+    def _refresh(self):
+        # called with the condition held, only one thread sweeps at a time
+        self._is_sweeping = True
+        self._condition.release()
+        try:
+            present = self._sweep()
+        finally:
+            self._condition.acquire()
+            self._is_sweeping = False
+            self._next_sweep = time.monotonic() + self.interval
+            self._condition.notify_all()
+        self._present = present
+
+    def wait_for(self, account_id: str):
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while account_id not in self._present:
+                now = time.monotonic()
+                if now >= deadline:
+                    raise TimeoutError(
+                        f"Account {account_id} did not join {self.parent_id} within {self.timeout}s"
+                    )
+                if not self._is_sweeping and now >= self._next_sweep:
+                    self._refresh()
+                    continue
+                wait = self.interval if self._is_sweeping else self._next_sweep - now
+                self._condition.wait(min(wait, deadline - now))
+
+    def is_present(self, account_id: str) -> bool:
+        # every lookup within one interval is answered by the same sweep
+        with self._condition:
+            while self._is_sweeping:
+                self._condition.wait()
+            if time.monotonic() >= self._next_sweep:
+                self._refresh()
+            return account_id in self._present
+
+    def ready(self, account_ids: Iterable[str]) -> Iterator[str]:
+        # yields each account as soon as a sweep finds it
+        pending = list(dict.fromkeys(account_ids))
+        deadline = time.monotonic() + self.timeout
+        while pending:
+            with self._condition:
+                while self._is_sweeping:
+                    self._condition.wait()
+                if time.monotonic() >= self._next_sweep:
+                    self._refresh()
+                present = self._present
+            ready = [account_id for account_id in pending if account_id in present]
+            pending = [
+                account_id for account_id in pending if account_id not in present
+            ]
+            yield from ready
+            if not pending:
+                return
+            now = time.monotonic()
+            if now >= deadline:
+                raise TimeoutError(
+                    f"Accounts {', '.join(pending)} did not join {self.parent_id} within {self.timeout}s"
+                )
+            self.logger.info(
+                f"Waiting for {len(pending)} accounts to join {self.parent_id}..."
+            )
+            time.sleep(max(0.0, min(self._next_sweep, deadline) - now))
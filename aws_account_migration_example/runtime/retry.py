@@ -0,0 +1,102 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF = 5.0
+MAX_RETRY_BACKOFF = 300.0
+
+
+class RetryQueue:
+    # a failed account waits here with exponential backoff while the other accounts keep going,
+    # the step is run again from the start and skips whatever the journal already recorded
+    attempts: int
+    backoff: float
+    failures: Dict[str, Exception]
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self.attempts = kwargs.get("attempts", DEFAULT_RETRY_ATTEMPTS)
+        self.backoff = kwargs.get("backoff", DEFAULT_RETRY_BACKOFF)
+        self.logger = kwargs.get("logger") or logging.getLogger("retry")
+        self.failures = {}
+        self._retries: Dict[str, int] = {}
+        self._queue: List[Tuple[float, int, str, Any]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def delay(self, retries: int) -> float:
+        return min(MAX_RETRY_BACKOFF, self.backoff * 2 ** (retries - 1))
+
+    def defer(self, key: str, item: Any, error: Exception):
+        with self._lock:
+            retries = self._retries.get(key, 0) + 1
+            self._retries[key] = retries
+            self.failures[key] = error
+            if retries > self.attempts:
+                self.logger.error(
+                    f"Giving up on account {key} after {retries} attempts: {error}"
+                )
+                return
+            delay = self.delay(retries)
+            self.logger.warning(
+                f"Account {key} failed, retrying in {delay:.0f}s ({retries}/{self.attempts}): {error}"
+            )
+            heapq.heappush(
+                self._queue,
+                (time.monotonic() + delay, next(self._sequence), key, item),
+            )
+
+    def attempt(self, key: str, item: Any, step: Callable[[Any], Any]) -> Any:
+        try:
+            result = step(item)
+        except Exception as error:
+            self.defer(key, item, error)
+            return None
+        with self._lock:
+            self.failures.pop(key, None)
+        return result
+
+    def _next(self) -> Optional[Tuple[float, str, Any]]:
+        with self._lock:
+            if not self._queue:
+                return None
+            ready_at, _, key, item = heapq.heappop(self._queue)
+            return ready_at, key, item
+
+    def drain(self, step: Callable[[Any], Any]) -> List[Any]:
+        results = []
+        while True:
+            entry = self._next()
+            if entry is None:
+                return results
+            ready_at, key, item = entry
+            wait = ready_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.logger.info(f"Retrying account {key}")
+            result = self.attempt(key, item, step)
+            if result is not None:
+                results.append(result)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._queue)
@@ -0,0 +1,238 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_SNAPSHOT_PATH = "aws-account-migration-snapshots.sqlite"
+DEFAULT_SNAPSHOT_TTL = 900.0
+# the marker row of a snapshot holds its single value, or nothing for lists stored one item per row
+MARKER = ""
+
+
+class SnapshotCache:
+    # organization metadata shared by consecutive runs, keyed by profile and organization ID
+    path: str
+    ttl: float
+
+    def __init__(
+        self, path: str = DEFAULT_SNAPSHOT_PATH, ttl: float = DEFAULT_SNAPSHOT_TTL
+    ):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    profile TEXT NOT NULL,
+                    organization_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (profile, organization_id, name, key)
+                )
+                """)
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.ttl
+
+    def organization(self, profile: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, fetched_at FROM snapshots WHERE profile = ? AND name = 'organization' AND key = ?",
+                (profile, MARKER),
+            ).fetchone()
+        if row is None or not self._is_fresh(row[1]):
+            return None
+        return json.loads(row[0])
+
+    def value(self, profile: str, organization_id: str, name: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, fetched_at FROM snapshots WHERE profile = ? AND organization_id = ? AND name = ? AND key = ?",
+                (profile, organization_id, name, MARKER),
+            ).fetchone()
+        if row is None or not self._is_fresh(row[1]):
+            return None
+        return json.loads(row[0])
+
+    def items(
+        self, profile: str, organization_id: str, name: str
+    ) -> Optional[List[Any]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, value, fetched_at FROM snapshots WHERE profile = ? AND organization_id = ? AND name = ? ORDER BY key != ?, rowid",
+                (profile, organization_id, name, MARKER),
+            ).fetchall()
+        if not rows or rows[0][0] != MARKER or not self._is_fresh(rows[0][2]):
+            return None
+        return [json.loads(row[1]) for row in rows[1:]]
+
+    def store(self, profile: str, organization_id: str, name: str, value: Any):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM snapshots WHERE profile = ? AND organization_id = ? AND name = ?",
+                (profile, organization_id, name),
+            )
+            self._connection.execute(
+                "INSERT INTO snapshots (profile, organization_id, name, key, value, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    profile,
+                    organization_id,
+                    name,
+                    MARKER,
+                    json.dumps(value, default=str),
+                    time.time(),
+                ),
+            )
+
+    def stream(
+        self,
+        profile: str,
+        organization_id: str,
+        name: str,
+        items: Iterable[Tuple[str, Any]],
+    ) -> Iterator[Any]:
+        # every item is stored before it is returned, the marker row that makes the snapshot valid is only
+        # written once the listing was read to the end
+        fetched_at = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM snapshots WHERE profile = ? AND organization_id = ? AND name = ?",
+                (profile, organization_id, name),
+            )
+        for key, item in items:
+            with self._lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO snapshots (profile, organization_id, name, key, value, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        profile,
+                        organization_id,
+                        name,
+                        key,
+                        json.dumps(item, default=str),
+                        fetched_at,
+                    ),
+                )
+            yield item
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO snapshots (profile, organization_id, name, key, value, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    profile,
+                    organization_id,
+                    name,
+                    MARKER,
+                    json.dumps(None),
+                    fetched_at,
+                ),
+            )
+
+    def put_item(self, organization_id: str, name: str, key: str, item: Any):
+        # only snapshots that were stored completely are updated, for every profile of the organization
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO snapshots (profile, organization_id, name, key, value, fetched_at)
+                SELECT profile, organization_id, name, ?, ?, fetched_at FROM snapshots
+                WHERE organization_id = ? AND name = ? AND key = ?
+                """,
+                (key, json.dumps(item, default=str), organization_id, name, MARKER),
+            )
+
+    def delete_item(self, organization_id: str, name: str, key: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM snapshots WHERE organization_id = ? AND name = ? AND key = ?",
+                (organization_id, name, key),
+            )
+
+    def discard(self, organization_id: str, name: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM snapshots WHERE organization_id = ? AND name = ?",
+                (organization_id, name),
+            )
+
+    def invalidate(
+        self, organization_id: Optional[str] = None, profile: Optional[str] = None
+    ):
+        with self._lock, self._connection:
+            if organization_id is not None:
+                self._connection.execute(
+                    "DELETE FROM snapshots WHERE organization_id = ?",
+                    (organization_id,),
+                )
+            if profile is not None:
+                self._connection.execute(
+                    "DELETE FROM snapshots WHERE profile = ?", (profile,)
+                )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class OrganizationSnapshot:
+    # the part of the cache that belongs to one organization, seen through one profile
+    cache: SnapshotCache
+    profile: str
+
+    def __init__(self, **kwargs):
+        self.cache = kwargs["cache"]
+        self.profile = kwargs["profile"]
+        self._organization_id: Callable[[], str] = kwargs["organization_id"]
+
+    @property
+    def organization_id(self) -> str:
+        return self._organization_id()
+
+    def value(self, name: str, fetch: Callable[[], Any]) -> Any:
+        value = self.cache.value(self.profile, self.organization_id, name)
+        if value is None:
+            value = fetch()
+            self.cache.store(self.profile, self.organization_id, name, value=value)
+        return value
+
+    def items(
+        self, name: str, key: Callable[[Any], str], fetch: Callable[[], Iterable[Any]]
+    ) -> Iterable[Any]:
+        items = self.cache.items(self.profile, self.organization_id, name)
+        if items is None:
+            return self.cache.stream(
+                self.profile,
+                self.organization_id,
+                name,
+                ((key(item), item) for item in fetch()),
+            )
+        return items
+
+    def put_item(self, name: str, key: str, item: Any):
+        self.cache.put_item(self.organization_id, name, key, item)
+
+    def delete_item(self, name: str, key: str):
+        self.cache.delete_item(self.organization_id, name, key)
+
+    def discard(self, name: str):
+        self.cache.discard(self.organization_id, name)
+
+    def invalidate(self):
+        self.cache.invalidate(organization_id=self.organization_id)
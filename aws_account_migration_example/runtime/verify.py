@@ -0,0 +1,201 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import csv
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from aws_account_migration_example.runtime.journal import ACCEPTED, MigrationJournal
+from aws_account_migration_example.runtime.manifest import Manifest
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+
+DEFAULT_VERIFY_WORKERS = 8
+MISPLACED = "misplaced"
+MISSING = "missing"
+FIXED = "fixed"
+
+
+def expected_placements(
+    sources: List[SourceAwsOrganization],
+    target: TargetAwsOrganization,
+    manifest: Optional[Manifest] = None,
+    journal: Optional[MigrationJournal] = None,
+) -> Dict[str, str]:
+    # the manifest is the most precise source, then every account the journal saw accepted, and the
+    # source organizations only for accounts that have not left them yet
+    def destination_id(account: str) -> str:
+        destination = target.destination_for(account)
+        return destination["Id"] if destination is not None else target.root_ou
+
+    if manifest is not None:
+        return {
+            row.account_id: row.destination_ou or destination_id(row.account_id)
+            for row in manifest.rows()
+            if not row.skip
+        }
+    entries = (
+        journal.reached(
+            ACCEPTED, target_organization_id=target.journal_target_organization_id
+        )
+        if journal is not None
+        else []
+    )
+    if entries:
+        return {
+            entry["AccountId"]: destination_id(entry["AccountId"]) for entry in entries
+        }
+    expected = {}
+    for source in sources:
+        for account in source.child_accounts:
+            expected[account["Id"]] = destination_id(account["Id"])
+        if source.includes_management_account:
+            expected[source.root_account["Id"]] = destination_id(
+                source.root_account["Id"]
+            )
+    return expected
+
+
+class Mismatch:
+    account_id: str
+    expected_parent_id: str
+    actual_parent_id: Optional[str]
+    status: str
+
+    def __init__(self, **kwargs):
+        self.account_id = kwargs["account_id"]
+        self.expected_parent_id = kwargs["expected_parent_id"]
+        self.actual_parent_id = kwargs.get("actual_parent_id")
+        self.status = MISPLACED if self.actual_parent_id is not None else MISSING
+
+
+class PlacementVerifier:
+    # lists the accounts of every expected parent once instead of asking for the parent of each account,
+    # only accounts that are not under any of the listed parents are looked up one by one
+    target: TargetAwsOrganization
+    workers: int
+    mismatches: List[Mismatch]
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self.target = kwargs["target"]
+        self.workers = kwargs.get("workers", DEFAULT_VERIFY_WORKERS)
+        self.mismatches = []
+        self.logger = logging.getLogger("verify")
+        self.logger.setLevel(logging.INFO)
+
+    def actual_placements(self, expected: Dict[str, str]) -> Dict[str, Optional[str]]:
+        parent_ids = sorted({self.target.root_ou, *expected.values()})
+        self.logger.info(
+            f"Listing the accounts of {len(parent_ids)} parents using {self.workers} workers"
+        )
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            listings = list(
+                executor.map(self.target.account_ids_for_parent, parent_ids)
+            )
+            actual = {
+                account: parent_id
+                for parent_id, account_ids in zip(parent_ids, listings)
+                for account in account_ids
+            }
+            unlisted = [account for account in expected if account not in actual]
+            if unlisted:
+                self.logger.info(
+                    f"Looking up the parents of {len(unlisted)} accounts that are not in an expected parent"
+                )
+            for account, parent_id in zip(
+                unlisted, executor.map(self.target.parent_id_of, unlisted)
+            ):
+                actual[account] = parent_id
+        return actual
+
+    def verify(self, expected: Dict[str, str]) -> List[Mismatch]:
+        self.logger.info(
+            f"Verifying the placement of {len(expected)} accounts in {self.target.account_details()}"
+        )
+        actual = self.actual_placements(expected)
+        self.mismatches = [
+            Mismatch(
+                account_id=account,
+                expected_parent_id=parent_id,
+                actual_parent_id=actual.get(account),
+            )
+            for account, parent_id in expected.items()
+            if actual.get(account) != parent_id
+        ]
+        for mismatch in self.mismatches:
+            if mismatch.status == MISSING:
+                self.logger.error(
+                    f"Account {mismatch.account_id} is not in the target organization"
+                )
+            else:
+                self.logger.error(
+                    f"Account {mismatch.account_id} is in {mismatch.actual_parent_id} instead of {mismatch.expected_parent_id}"
+                )
+        self.logger.info(
+            f"{len(expected) - len(self.mismatches)} accounts are in place, {len(self.mismatches)} are not"
+        )
+        return self.mismatches
+
+    def _fix(self, mismatch: Mismatch, is_quiet: bool):
+        if self.target.correct_placement(
+            mismatch.account_id,
+            mismatch.actual_parent_id,
+            mismatch.expected_parent_id,
+            is_quiet,
+        ):
+            mismatch.status = FIXED
+
+    def fix(self, is_quiet=False) -> List[Mismatch]:
+        # accounts that are not in the target organization have to be migrated again
+        misplaced = [
+            mismatch for mismatch in self.mismatches if mismatch.status == MISPLACED
+        ]
+        if is_quiet and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(
+                    executor.map(lambda mismatch: self._fix(mismatch, True), misplaced)
+                )
+        else:
+            for mismatch in misplaced:
+                self._fix(mismatch, is_quiet)
+        self.logger.info(
+            f"Moved {sum(1 for mismatch in misplaced if mismatch.status == FIXED)} of {len(misplaced)} misplaced accounts"
+        )
+        return self.remaining
+
+    @property
+    def remaining(self) -> List[Mismatch]:
+        return [mismatch for mismatch in self.mismatches if mismatch.status != FIXED]
+
+    def save(self, path: str):
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(
+                ["AccountId", "ExpectedParentId", "ActualParentId", "Status"]
+            )
+            for mismatch in self.mismatches:
+                writer.writerow(
+                    [
+                        mismatch.account_id,
+                        mismatch.expected_parent_id,
+                        mismatch.actual_parent_id or "",
+                        mismatch.status,
+                    ]
+                )
+        self.logger.info(f"Wrote verification report to {path}")
@@ -0,0 +1,196 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this
+#  software and associated documentation files (the "Software"), to deal in the Software
+#  without restriction, including without limitation the rights to use, copy, modify,
+#  merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+#  permit persons to whom the Software is furnished to do so.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+#  INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+#  OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+#  SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+
+DEFAULT_CANARY_SIZE = 5
+DEFAULT_WAVE_GROWTH = 4.0
+DEFAULT_MAX_WAVE_SIZE = 500
+# concurrency of each wave, the last value is used for every later wave
+DEFAULT_WAVE_WORKERS = [2, 4, 8, 16]
+DEFAULT_ERROR_WINDOW = 20
+DEFAULT_ERROR_THRESHOLD = 0.25
+DEFAULT_ERROR_MINIMUM = 5
+
+
+class CircuitBreaker:
+    # opens once the share of failed accounts among the most recent outcomes goes above the threshold
+    threshold: float
+    minimum: int
+
+    def __init__(self, **kwargs):
+        self.threshold = kwargs.get("threshold", DEFAULT_ERROR_THRESHOLD)
+        self.minimum = kwargs.get("minimum", DEFAULT_ERROR_MINIMUM)
+        self._outcomes = deque(maxlen=kwargs.get("window", DEFAULT_ERROR_WINDOW))
+        self._is_open = False
+        self._lock = threading.Lock()
+
+    def record(self, is_success: bool):
+        with self._lock:
+            self._outcomes.append(is_success)
+            if (
+                len(self._outcomes) >= self.minimum
+                and self._error_rate() > self.threshold
+            ):
+                self._is_open = True
+
+    def trip(self):
+        with self._lock:
+            self._is_open = True
+
+    def _error_rate(self) -> float:
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._error_rate() if self._outcomes else 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self._is_open
+
+
+class WaveScheduler:
+    source: SourceAwsOrganization
+    target: TargetAwsOrganization
+    is_quiet: bool
+    canary_size: int
+    growth: float
+    max_wave_size: int
+    workers: List[int]
+    breaker: CircuitBreaker
+    migrated_ids: List[str]
+    failures: Dict[str, Exception]
+    skipped_ids: List[str]
+    logger: logging.Logger
+
+    def __init__(self, **kwargs):
+        self.source = kwargs["source"]
+        self.target = kwargs["target"]
+        self.is_quiet = kwargs.get("is_quiet", False)
+        self.canary_size = kwargs.get("canary_size", DEFAULT_CANARY_SIZE)
+        self.growth = kwargs.get("growth", DEFAULT_WAVE_GROWTH)
+        self.max_wave_size = kwargs.get("max_wave_size", DEFAULT_MAX_WAVE_SIZE)
+        self.workers = kwargs.get("workers") or DEFAULT_WAVE_WORKERS
+        self.breaker = CircuitBreaker(
+            window=kwargs.get("error_window", DEFAULT_ERROR_WINDOW),
+            threshold=kwargs.get("error_threshold", DEFAULT_ERROR_THRESHOLD),
+            minimum=kwargs.get("error_minimum", DEFAULT_ERROR_MINIMUM),
+        )
+        self.logger = logging.getLogger("waves")
+        self.logger.setLevel(logging.INFO)
+        if not self.is_quiet and max(self.workers) > 1:
+            self.logger.warning(
+                "Concurrent migration requires quiet mode, migrating accounts one at a time"
+            )
+            self.workers = [1]
+        self.pipeline = MigrationPipeline(
+            source=self.source,
+            target=self.target,
+            is_quiet=self.is_quiet,
+            workers=1,
+        )
+        self.migrated_ids = []
+        self.failures = {}
+        self.skipped_ids = []
+        self._lock = threading.Lock()
+
+    def waves(self, accounts: Iterable[dict]) -> Iterator[List[dict]]:
+        # accounts are consumed one wave at a time so nothing past a tripped breaker is listed
+        iterator = iter(accounts)
+        size = self.canary_size
+        while True:
+            wave = list(islice(iterator, max(1, int(size))))
+            if not wave:
+                return
+            yield wave
+            size = min(self.max_wave_size, size * self.growth)
+
+    def _workers_for(self, index: int) -> int:
+        return self.workers[min(index, len(self.workers) - 1)]
+
+    def _migrate(self, account: dict):
+        if self.breaker.is_open:
+            with self._lock:
+                self.skipped_ids.append(account["Id"])
+            return
+        try:
+            account_id = self.pipeline.migrate_account(account)
+        except Exception as error:
+            self.logger.error(f"Migrating account {account['Id']} failed: {error}")
+            with self._lock:
+                self.failures[account["Id"]] = error
+            self.breaker.record(False)
+            return
+        self.breaker.record(True)
+        if account_id is not None:
+            with self._lock:
+                self.migrated_ids.append(account_id)
+
+    def run(self) -> bool:
+        for index, wave in enumerate(self.waves(self.source.child_accounts)):
+            workers = min(self._workers_for(index), len(wave))
+            name = "canary wave" if index == 0 else f"wave {index}"
+            self.logger.info(
+                f"Starting {name} with {len(wave)} accounts using {workers} workers"
+            )
+            failed = len(self.failures)
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(self._migrate, wave))
+            else:
+                # prompts must stay on the main thread
+                for account in wave:
+                    self._migrate(account)
+            if index == 0 and len(self.failures) > failed:
+                # a failing canary points at a precondition every account shares
+                self.logger.error(
+                    f"{len(self.failures) - failed} accounts of the canary wave failed, stopping"
+                )
+                self.breaker.trip()
+            elif self.breaker.is_open:
+                self.logger.error(
+                    f"Error rate {self.breaker.error_rate:.0%} is above {self.breaker.threshold:.0%}, stopping"
+                )
+            if self.breaker.is_open:
+                break
+        # reported together with the failures of every other mode
+        self.source.failures.update(self.failures)
+        is_complete = not self.failures and not self.breaker.is_open
+        # the management account can only leave once every child account has left the organization
+        if is_complete and self.source.includes_management_account:
+            account_id = self.pipeline.migrate_account(self.source.root_account)
+            if account_id is not None:
+                self.migrated_ids.append(account_id)
+        self.logger.info(
+            f"Migrated {len(self.migrated_ids)} accounts, {len(self.failures)} failed and {len(self.skipped_ids)} were skipped by the circuit breaker"
+        )
+        if self.breaker.is_open:
+            self.logger.info(
+                "Accounts of later waves were not started, fix the failures and run again with --resume"
+            )
+        return is_complete
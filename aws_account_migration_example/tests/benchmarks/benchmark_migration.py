@@ -0,0 +1,225 @@
+import argparse
+import json
+import logging
+import time
+import tracemalloc
+from typing import Callable, List
+
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.runtime.rate_limiter import AdaptiveRateLimiter
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    DEFAULT_QUOTA,
+    DEFAULT_QUOTAS,
+    OrganizationsSimulator,
+)
+
+DEFAULT_SIZES = [100, 1000, 5000]
+# the client-side rate limiter runs slightly under the simulated quotas, as it would against AWS
+RATE_HEADROOM = 0.9
+# simulated joins complete in seconds, so the target root is checked more often than against AWS
+READINESS_INTERVAL = 0.5
+
+
+class Benchmark:
+    def __init__(self, **kwargs):
+        self.accounts = kwargs["accounts"]
+        self.organizational_units = kwargs.get("organizational_units", 0)
+        self.workers = kwargs.get("workers", 8)
+        self.is_pipeline = kwargs.get("pipeline", False)
+        quota_scale = kwargs.get("quota_scale", 1.0)
+        quotas = {
+            operation: quota * quota_scale
+            for operation, quota in DEFAULT_QUOTAS.items()
+        }
+        self.simulator = OrganizationsSimulator(
+            latency=kwargs.get("latency", 0.0),
+            join_delay=kwargs.get("join_delay", 0.0),
+            quotas=quotas,
+            default_quota=DEFAULT_QUOTA * quota_scale,
+        )
+        self.rate_limiter = AdaptiveRateLimiter(
+            rates={
+                operation: quota * RATE_HEADROOM for operation, quota in quotas.items()
+            },
+            default_rate=DEFAULT_QUOTA * quota_scale * RATE_HEADROOM,
+        )
+        self.source_organization = self.simulator.create_organization("source")
+        self.target_organization = self.simulator.create_organization("target")
+        self.simulator.populate(
+            self.source_organization, self.accounts, self.organizational_units
+        )
+        self.destination = self.simulator.create_organizational_unit_in(
+            self.target_organization, self.target_organization.root_id, "Migrated"
+        )
+
+    def _phase(self, name: str, step: Callable[[], object]) -> dict:
+        calls = self.simulator.total_calls()
+        throttled = self.simulator.throttled
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        step()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        api_calls = self.simulator.total_calls() - calls
+        return {
+            "phase": name,
+            "accounts": self.accounts,
+            "seconds": round(seconds, 3),
+            "accounts_per_minute": round(self.accounts / seconds * 60, 1),
+            "api_calls": api_calls,
+            "api_calls_per_account": round(api_calls / self.accounts, 2),
+            "throttled": self.simulator.throttled - throttled,
+            "peak_memory_mb": round(peak / 1024 / 1024, 2),
+        }
+
+    def run(self) -> List[dict]:
+        tracemalloc.start()
+        try:
+            results = []
+            organizations = {}
+
+            def start():
+                organizations["source"] = SourceAwsOrganization(
+                    profile_name="source",
+                    aws=self.simulator.aws(
+                        self.source_organization.management_account_id,
+                        rate_limiter=self.rate_limiter,
+                    ),
+                )
+                organizations["target"] = TargetAwsOrganization(
+                    profile_name="target",
+                    aws=self.simulator.aws(
+                        self.target_organization.management_account_id,
+                        rate_limiter=self.rate_limiter,
+                    ),
+                    organizational_unit=self.destination["Id"],
+                    readiness_interval=READINESS_INTERVAL,
+                )
+
+            results.append(self._phase("startup", start))
+            source = organizations["source"]
+            target = organizations["target"]
+            if self.is_pipeline:
+                pipeline = MigrationPipeline(
+                    source=source, target=target, is_quiet=True, workers=self.workers
+                )
+                results.append(self._phase("pipeline", pipeline.run))
+            else:
+                state = {}
+                results.append(
+                    self._phase(
+                        "invite",
+                        lambda: state.update(
+                            invitations=target.invite(source, True, self.workers)
+                        ),
+                    )
+                )
+                results.append(
+                    self._phase(
+                        "accept",
+                        lambda: state.update(
+                            accepted_ids=source.accept(state["invitations"], True)
+                        ),
+                    )
+                )
+                results.append(
+                    self._phase(
+                        "move",
+                        lambda: target.move_accounts(state["accepted_ids"], True),
+                    )
+                )
+            return results
+        finally:
+            tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="Aws Account Migration Benchmark",
+        description="Measures migration throughput against a local AWS Organizations and STS simulator",
+    )
+    parser.add_argument(
+        "--accounts",
+        dest="sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help=f"Number of source accounts to migrate, defaults to {' '.join(str(size) for size in DEFAULT_SIZES)}",
+    )
+    parser.add_argument(
+        "--ous",
+        dest="organizational_units",
+        type=int,
+        default=20,
+        help="Number of organizational units in the source organization",
+    )
+    parser.add_argument(
+        "--latency",
+        dest="latency",
+        type=float,
+        default=0.05,
+        help="Simulated latency of every API call in seconds",
+    )
+    parser.add_argument(
+        "--join-delay",
+        dest="join_delay",
+        type=float,
+        default=0.0,
+        help="Seconds between accepting a handshake and the account showing up in the target organization",
+    )
+    parser.add_argument(
+        "--quota-scale",
+        dest="quota_scale",
+        type=float,
+        default=1.0,
+        help="Multiplier applied to the simulated AWS Organizations quotas",
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        type=int,
+        default=8,
+        help="Number of concurrent workers for invitations and the pipeline",
+    )
+    parser.add_argument(
+        "--pipeline",
+        dest="is_pipeline",
+        action="store_true",
+        help="Benchmark the streaming pipeline instead of the invite, accept and move phases",
+    )
+    parser.add_argument(
+        "--json",
+        dest="json",
+        help="Write the results to this file as JSON",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    results = []
+    for size in args.sizes:
+        results.extend(
+            Benchmark(
+                accounts=size,
+                organizational_units=args.organizational_units,
+                latency=args.latency,
+                join_delay=args.join_delay,
+                quota_scale=args.quota_scale,
+                workers=args.workers,
+                pipeline=args.is_pipeline,
+            ).run()
+        )
+    columns = list(results[0].keys())
+    print(" ".join(f"{column:>22}" for column in columns))
+    for result in results:
+        print(" ".join(f"{result[column]:>22}" for column in columns))
+    if args.json is not None:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from typing import List, Optional
+
+from aws_account_migration_example.runtime.aws import Aws
+from aws_account_migration_example.runtime.journal import MigrationJournal
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+from aws_account_migration_example.runtime.rate_limiter import AdaptiveRateLimiter
+from aws_account_migration_example.runtime.readiness import DEFAULT_READINESS_TIMEOUT
+from aws_account_migration_example.runtime.retry import (
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BACKOFF,
+)
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+    SimulatedAccount,
+    SimulatedOrganization,
+)
+
+
+class SimulatedMigration:
+    # a populated source organization and a target organization with a Migrated destination OU, both
+    # sharing one rate limiter, as most simulator tests start from
+    simulator: OrganizationsSimulator
+    journal: Optional[MigrationJournal]
+    retry_attempts: int
+    retry_backoff: float
+    readiness_timeout: float
+    rate_limiter: AdaptiveRateLimiter
+    source_organizations: List[SimulatedOrganization]
+    sources: List[SourceAwsOrganization]
+    accounts: List[SimulatedAccount]
+    target_organization: SimulatedOrganization
+    destination: dict
+    target: TargetAwsOrganization
+
+    def __init__(self, **kwargs):
+        self.simulator = kwargs.get("simulator") or OrganizationsSimulator()
+        self.journal = kwargs.get("journal")
+        self.retry_attempts = kwargs.get("retry_attempts", DEFAULT_RETRY_ATTEMPTS)
+        self.retry_backoff = kwargs.get("retry_backoff", DEFAULT_RETRY_BACKOFF)
+        self.readiness_timeout = kwargs.get(
+            "readiness_timeout", DEFAULT_READINESS_TIMEOUT
+        )
+        self.rate_limiter = AdaptiveRateLimiter(default_rate=100.0)
+        self.source_organizations = []
+        self.sources = []
+        self.accounts = []
+        self.target_organization = self.simulator.create_organization("target")
+        self.destination = self.simulator.create_organizational_unit_in(
+            self.target_organization, self.target_organization.root_id, "Migrated"
+        )
+        self.add_source(
+            kwargs.get("source_name", "source"),
+            kwargs.get("accounts", 6),
+            kwargs.get("organizational_units", 0),
+        )
+        self.target = self.create_target()
+
+    @property
+    def source_organization(self) -> SimulatedOrganization:
+        return self.source_organizations[0]
+
+    @property
+    def source(self) -> SourceAwsOrganization:
+        return self.sources[0]
+
+    def aws(self, organization: SimulatedOrganization) -> Aws:
+        return self.simulator.aws(
+            organization.management_account_id, rate_limiter=self.rate_limiter
+        )
+
+    def add_source(
+        self, name: str, accounts: int, organizational_units: int = 0
+    ) -> SourceAwsOrganization:
+        organization = self.simulator.create_organization(name)
+        self.accounts.extend(
+            self.simulator.populate(organization, accounts, organizational_units)
+        )
+        self.source_organizations.append(organization)
+        source = self.create_source(organization, profile_name=name)
+        self.sources.append(source)
+        return source
+
+    def create_source(
+        self, organization: Optional[SimulatedOrganization] = None, **kwargs
+    ) -> SourceAwsOrganization:
+        # a new instance reads the organizations again, like a new run would
+        organization = organization or self.source_organization
+        options = {
+            "profile_name": "source",
+            "aws": self.aws(organization),
+            "journal": self.journal,
+            "retry_attempts": self.retry_attempts,
+            "retry_backoff": self.retry_backoff,
+        }
+        options.update(kwargs)
+        return SourceAwsOrganization(**options)
+
+    def create_target(self, **kwargs) -> TargetAwsOrganization:
+        options = {
+            "profile_name": "target",
+            "aws": self.aws(self.target_organization),
+            "organizational_unit": self.destination["Id"],
+            "readiness_interval": 0.1,
+            "readiness_timeout": self.readiness_timeout,
+            "journal": self.journal,
+        }
+        options.update(kwargs)
+        return TargetAwsOrganization(**options)
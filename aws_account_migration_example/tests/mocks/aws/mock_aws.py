@@ -11,7 +11,9 @@ from aws_account_migration_example.tests import date_start_end
 
 def __organizations(session):
     organizations_client = session.client("organizations")
-    organizations_client.create_organization(FeatureSet="All")
+    organization = organizations_client.create_organization(FeatureSet="All")[
+        "Organization"
+    ]
     response = organizations_client.create_account(
         Email="test@test.test",
         AccountName="Test child account",
@@ -43,6 +45,7 @@ def __organizations(session):
                 "Arn": "string",
                 "Parties": [
                     {"Id": kwargs["Target"]["Id"], "Type": "ACCOUNT"},
+                    {"Id": organization["Id"], "Type": "ORGANIZATION"},
                 ],
                 "State": "REQUESTED",
                 "RequestedTimestamp": start.timestamp(),
@@ -54,6 +57,13 @@ def __organizations(session):
             }
         }
 
+    # source and target are the same organization, leaving it would also leave the target
+    def remove_account_from_organization(**kwargs):
+        return {}
+
+    def delete_organization(**kwargs):
+        return {}
+
     def list_handshakes_for_organization(**kwargs):
         return {"Handshakes": [], "NextToken": None}
 
@@ -62,6 +72,10 @@ def __organizations(session):
     )
     organizations_client.invite_account_to_organization = invite_account_to_organization
     organizations_client.accept_handshake = accept_handshake
+    organizations_client.remove_account_from_organization = (
+        remove_account_from_organization
+    )
+    organizations_client.delete_organization = delete_organization
     return organizations_client
 
 
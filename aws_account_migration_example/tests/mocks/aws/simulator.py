@@ -0,0 +1,723 @@
+import itertools
+import json
+import random
+import re
+import string
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from boto3.session import Session
+from botocore.awsrequest import AWSResponse
+
+from aws_account_migration_example.runtime.aws import Aws
+from aws_account_migration_example.runtime.rate_limiter import TokenBucket
+
+ROLE_NAME = "AwsAccountMigrationAcceptInvitationRole"
+ACCOUNT_ID_PATTERN = re.compile(r"Credential=[A-Z]+(\d{12})")
+# simulated AWS Organizations quotas in calls per second, operations not listed use DEFAULT_QUOTA
+DEFAULT_QUOTA = 20.0
+DEFAULT_QUOTAS = {
+    "InviteAccountToOrganization": 5.0,
+    "RemoveAccountFromOrganization": 5.0,
+    "AcceptHandshake": 10.0,
+    "MoveAccount": 10.0,
+    "AssumeRole": 100.0,
+}
+
+
+class QuotaBucket(TokenBucket):
+    # a call over the quota is throttled instead of waiting for a token
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class SimulatorError(Exception):
+    def __init__(self, code: str, message: str, status: int = 400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+
+class _Raw:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def stream(self, **kwargs):
+        yield self._body
+
+
+class SimulatedAccount:
+    def __init__(self, **kwargs):
+        self.id = kwargs["id"]
+        self.name = kwargs["name"]
+        self.email = f"{self.name}@example.com"
+        self.organization_id = kwargs.get("organization_id")
+        self.parent_id = kwargs.get("parent_id")
+        self.trusted_account_id = kwargs.get("trusted_account_id")
+        self.has_role = kwargs.get("has_role", True)
+        # whether the accept invitation role is allowed to accept handshakes
+        self.can_accept = kwargs.get("can_accept", True)
+        self.joins_at: Optional[float] = None
+        self.joining_organization_id: Optional[str] = None
+
+    def describe(self) -> dict:
+        return {
+            "Id": self.id,
+            "Arn": f"arn:aws:organizations::{self.id}:account/{self.organization_id}/{self.id}",
+            "Email": self.email,
+            "Name": self.name,
+            "Status": "ACTIVE",
+            "JoinedMethod": "INVITED",
+            "JoinedTimestamp": time.time(),
+        }
+
+
+class SimulatedOrganization:
+    def __init__(self, **kwargs):
+        self.id = kwargs["id"]
+        self.management_account_id = kwargs["management_account_id"]
+        self.root_id = kwargs["root_id"]
+        self.organizational_units: Dict[str, dict] = {}
+
+    def describe(self) -> dict:
+        return {
+            "Id": self.id,
+            "Arn": f"arn:aws:organizations::{self.management_account_id}:organization/{self.id}",
+            "FeatureSet": "ALL",
+            "MasterAccountId": self.management_account_id,
+            "MasterAccountEmail": f"{self.management_account_id}@example.com",
+        }
+
+
+class OrganizationsSimulator:
+    # answers the AWS Organizations and STS calls of real botocore clients from an in-memory model of
+    # several organizations, with per-call latency, quota throttling and delayed handshake completion
+    latency: float
+    join_delay: float
+    calls: Dict[str, int]
+
+    def __init__(self, **kwargs):
+        self.latency = kwargs.get("latency", 0.0)
+        self.join_delay = kwargs.get("join_delay", 0.0)
+        self.quotas = {**DEFAULT_QUOTAS, **kwargs.get("quotas", {})}
+        self.default_quota = kwargs.get("default_quota", DEFAULT_QUOTA)
+        self.is_throttling = kwargs.get("throttling", True)
+        self.random = random.Random(kwargs.get("seed", 0))
+        self.organizations: Dict[str, SimulatedOrganization] = {}
+        self.accounts: Dict[str, SimulatedAccount] = {}
+        self.handshakes: Dict[str, dict] = {}
+        self.calls = {}
+        self.throttled = 0
+        self._quota_buckets: Dict[str, QuotaBucket] = {}
+        self._account_ids = itertools.count(100000000000)
+        self._lock = threading.RLock()
+
+    # organization set up
+
+    def _id(
+        self, prefix: str, length: int, alphabet=string.ascii_lowercase + string.digits
+    ) -> str:
+        return prefix + "".join(self.random.choice(alphabet) for _ in range(length))
+
+    def create_organization(self, name: str = "org") -> SimulatedOrganization:
+        management = SimulatedAccount(
+            id=str(next(self._account_ids)), name=f"{name}-management"
+        )
+        organization = SimulatedOrganization(
+            id=self._id("o-", 10),
+            management_account_id=management.id,
+            root_id=self._id("r-", 4),
+        )
+        management.organization_id = organization.id
+        management.parent_id = organization.root_id
+        self.organizations[organization.id] = organization
+        self.accounts[management.id] = management
+        return organization
+
+    def create_organizational_unit_in(
+        self, organization: SimulatedOrganization, parent_id: str, name: str
+    ) -> dict:
+        organizational_unit = {
+            "Id": self._id(f"ou-{organization.root_id[2:]}-", 8),
+            "Arn": f"arn:aws:organizations::{organization.management_account_id}:ou/{organization.id}/{name}",
+            "Name": name,
+            "ParentId": parent_id,
+        }
+        organization.organizational_units[organizational_unit["Id"]] = (
+            organizational_unit
+        )
+        return organizational_unit
+
+    def create_account_in(
+        self, organization: SimulatedOrganization, parent_id: str, has_role=True
+    ) -> SimulatedAccount:
+        account_id = str(next(self._account_ids))
+        account = SimulatedAccount(
+            id=account_id,
+            name=f"account-{account_id}",
+            organization_id=organization.id,
+            parent_id=parent_id,
+            trusted_account_id=organization.management_account_id,
+            has_role=has_role,
+        )
+        self.accounts[account_id] = account
+        return account
+
+    def populate(
+        self,
+        organization: SimulatedOrganization,
+        accounts: int,
+        organizational_units: int = 0,
+        depth: int = 2,
+    ):
+        # spreads the accounts evenly over a tree of organizational_units OUs at most depth levels deep
+        parents = [organization.root_id]
+        units = []
+        for index in range(organizational_units):
+            parent_id = parents[index % len(parents)]
+            unit = self.create_organizational_unit_in(
+                organization, parent_id, f"ou-{index}"
+            )
+            units.append(unit["Id"])
+            if self._depth(organization, unit["Id"]) < depth:
+                parents.append(unit["Id"])
+        placements = units or [organization.root_id]
+        return [
+            self.create_account_in(organization, placements[index % len(placements)])
+            for index in range(accounts)
+        ]
+
+    def _depth(self, organization: SimulatedOrganization, parent_id: str) -> int:
+        depth = 0
+        while parent_id != organization.root_id:
+            parent_id = organization.organizational_units[parent_id]["ParentId"]
+            depth += 1
+        return depth
+
+    def session(self, account_id: str) -> Session:
+        return Session(
+            aws_access_key_id=f"SIM{account_id}",
+            aws_secret_access_key="simulated",
+            region_name="us-east-1",
+        )
+
+    def aws(self, account_id: str, **kwargs) -> Aws:
+        aws = Aws(session=self.session(account_id), **kwargs)
+        self.attach(aws)
+        return aws
+
+    def attach(self, aws: Aws):
+        if getattr(aws, "simulator", None) is self:
+            return
+        aws.simulator = self
+        # clients created later, like STS and IAM, copy the handlers of their session
+        self.register(aws.session)
+        self.register(aws.organizations)
+        account_scoped_instance = aws.account_scoped_instance
+
+        def simulated_account_scoped_instance(source):
+            account_scoped_aws = account_scoped_instance(source)
+            self.attach(account_scoped_aws)
+            return account_scoped_aws
+
+        aws.account_scoped_instance = simulated_account_scoped_instance
+
+    def register(self, client_or_session):
+        events = getattr(client_or_session, "events", None)
+        if events is None:
+            events = client_or_session.meta.events
+        events.register(
+            "before-send", self._handle, unique_id="organizations-simulator"
+        )
+
+    # request handling
+
+    def _handle(self, request, **kwargs) -> AWSResponse:
+        caller = self._caller(request)
+        target = request.headers.get("X-Amz-Target")
+        if target is not None:
+            operation = target.decode() if isinstance(target, bytes) else target
+            operation = operation.split(".")[-1]
+            body = (
+                request.body.decode()
+                if isinstance(request.body, bytes)
+                else request.body
+            )
+            params = json.loads(body or "{}")
+            is_query = False
+        else:
+            body = (
+                request.body.decode()
+                if isinstance(request.body, bytes)
+                else request.body
+            )
+            params = {key: values[0] for key, values in parse_qs(body or "").items()}
+            operation = params.pop("Action")
+            is_query = True
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            self._throttle(operation)
+            with self._lock:
+                self.calls[operation] = self.calls.get(operation, 0) + 1
+                self._complete_joins()
+                result = getattr(self, f"_{_snake_case(operation)}")(caller, **params)
+            if is_query:
+                return _query_response(request.url, operation, result)
+            return _json_response(request.url, 200, result)
+        except SimulatorError as error:
+            if is_query:
+                return _query_error(request.url, error)
+            return _json_response(
+                request.url,
+                error.status,
+                {"__type": error.code, "Message": error.message},
+            )
+
+    def _caller(self, request) -> SimulatedAccount:
+        authorization = request.headers.get("Authorization", b"")
+        if isinstance(authorization, bytes):
+            authorization = authorization.decode()
+        match = ACCOUNT_ID_PATTERN.search(authorization)
+        if match is None or match.group(1) not in self.accounts:
+            raise SimulatorError(
+                "UnrecognizedClientException", "Unknown credentials", 403
+            )
+        return self.accounts[match.group(1)]
+
+    def _throttle(self, operation: str):
+        if not self.is_throttling:
+            return
+        with self._lock:
+            bucket = self._quota_buckets.get(operation)
+            if bucket is None:
+                bucket = QuotaBucket(self.quotas.get(operation, self.default_quota))
+                self._quota_buckets[operation] = bucket
+            if not bucket.try_acquire():
+                self.throttled += 1
+                raise SimulatorError(
+                    "TooManyRequestsException", f"Rate exceeded for {operation}"
+                )
+
+    def _complete_joins(self):
+        now = time.monotonic()
+        for account in self.accounts.values():
+            if account.joins_at is not None and account.joins_at <= now:
+                organization = self.organizations[account.joining_organization_id]
+                account.organization_id = organization.id
+                account.parent_id = organization.root_id
+                account.joins_at = None
+                account.joining_organization_id = None
+
+    def _managed_organization(self, caller: SimulatedAccount) -> SimulatedOrganization:
+        for organization in self.organizations.values():
+            if organization.management_account_id == caller.id:
+                return organization
+        raise SimulatorError(
+            "AccessDeniedException", f"{caller.id} is not a management account"
+        )
+
+    def _member(
+        self, organization: SimulatedOrganization, account_id: str
+    ) -> SimulatedAccount:
+        account = self.accounts.get(account_id)
+        if account is None or account.organization_id != organization.id:
+            raise SimulatorError(
+                "AccountNotFoundException", f"Account {account_id} not found"
+            )
+        return account
+
+    def _parent(self, organization: SimulatedOrganization, parent_id: str):
+        if (
+            parent_id != organization.root_id
+            and parent_id not in organization.organizational_units
+        ):
+            raise SimulatorError(
+                "ParentNotFoundException", f"Parent {parent_id} not found"
+            )
+
+    def _page(
+        self, items: list, key: str, NextToken=None, MaxResults=20, **kwargs
+    ) -> dict:
+        start = int(NextToken or 0)
+        end = start + int(MaxResults or 20)
+        page = {key: items[start:end]}
+        if end < len(items):
+            page["NextToken"] = str(end)
+        return page
+
+    # AWS Organizations operations
+
+    def _describe_organization(self, caller):
+        if caller.organization_id is None:
+            raise SimulatorError(
+                "AWSOrganizationsNotInUseException", "Not in an organization"
+            )
+        return {"Organization": self.organizations[caller.organization_id].describe()}
+
+    def _describe_account(self, caller, AccountId):
+        organization = self._managed_organization(caller)
+        return {"Account": self._member(organization, AccountId).describe()}
+
+    def _list_accounts(self, caller, **kwargs):
+        organization = self._managed_organization(caller)
+        accounts = [
+            account.describe()
+            for account in self.accounts.values()
+            if account.organization_id == organization.id
+        ]
+        return self._page(accounts, "Accounts", **kwargs)
+
+    def _list_roots(self, caller, **kwargs):
+        organization = self._managed_organization(caller)
+        root = {
+            "Id": organization.root_id,
+            "Arn": f"arn:aws:organizations::{organization.management_account_id}:root/{organization.id}/{organization.root_id}",
+            "Name": "Root",
+            "PolicyTypes": [],
+        }
+        return self._page([root], "Roots", **kwargs)
+
+    def _list_organizational_units_for_parent(self, caller, ParentId, **kwargs):
+        organization = self._managed_organization(caller)
+        self._parent(organization, ParentId)
+        units = [
+            {key: unit[key] for key in ("Id", "Arn", "Name")}
+            for unit in organization.organizational_units.values()
+            if unit["ParentId"] == ParentId
+        ]
+        return self._page(units, "OrganizationalUnits", **kwargs)
+
+    def _list_accounts_for_parent(self, caller, ParentId, **kwargs):
+        organization = self._managed_organization(caller)
+        self._parent(organization, ParentId)
+        accounts = [
+            account.describe()
+            for account in self.accounts.values()
+            if account.organization_id == organization.id
+            and account.parent_id == ParentId
+        ]
+        return self._page(accounts, "Accounts", **kwargs)
+
+    def _list_parents(self, caller, ChildId, **kwargs):
+        organization = self._managed_organization(caller)
+        account = self._member(organization, ChildId)
+        parent_type = (
+            "ROOT"
+            if account.parent_id == organization.root_id
+            else "ORGANIZATIONAL_UNIT"
+        )
+        return self._page(
+            [{"Id": account.parent_id, "Type": parent_type}], "Parents", **kwargs
+        )
+
+    def _describe_organizational_unit(self, caller, OrganizationalUnitId):
+        organization = self._managed_organization(caller)
+        unit = organization.organizational_units.get(OrganizationalUnitId)
+        if unit is None:
+            raise SimulatorError(
+                "OrganizationalUnitNotFoundException",
+                f"OU {OrganizationalUnitId} not found",
+            )
+        return {"OrganizationalUnit": {key: unit[key] for key in ("Id", "Arn", "Name")}}
+
+    def _create_organizational_unit(self, caller, ParentId, Name, **kwargs):
+        organization = self._managed_organization(caller)
+        self._parent(organization, ParentId)
+        for unit in organization.organizational_units.values():
+            if unit["ParentId"] == ParentId and unit["Name"] == Name:
+                raise SimulatorError(
+                    "DuplicateOrganizationalUnitException", f"OU {Name} already exists"
+                )
+        unit = self.create_organizational_unit_in(organization, ParentId, Name)
+        return {"OrganizationalUnit": {key: unit[key] for key in ("Id", "Arn", "Name")}}
+
+    def _invite_account_to_organization(self, caller, Target, **kwargs):
+        organization = self._managed_organization(caller)
+        for handshake in self.handshakes.values():
+            if (
+                handshake["State"] == "OPEN"
+                and handshake["_AccountId"] == Target["Id"]
+                and handshake["_OrganizationId"] == organization.id
+            ):
+                raise SimulatorError(
+                    "DuplicateHandshakeException", "Handshake already exists"
+                )
+        if Target["Id"] not in self.accounts:
+            raise SimulatorError(
+                "AccountNotFoundException", f"Account {Target['Id']} not found"
+            )
+        now = datetime.now(timezone.utc)
+        handshake_id = self._id("h-", 10)
+        handshake = {
+            "Id": handshake_id,
+            "Arn": f"arn:aws:organizations::{organization.management_account_id}:handshake/{organization.id}/invite/{handshake_id}",
+            "Parties": [
+                {"Id": Target["Id"], "Type": "ACCOUNT"},
+                {"Id": organization.id, "Type": "ORGANIZATION"},
+            ],
+            "State": "OPEN",
+            "RequestedTimestamp": now.timestamp(),
+            "ExpirationTimestamp": (now + timedelta(days=15)).timestamp(),
+            "Action": "INVITE",
+            "Resources": [{"Value": organization.id, "Type": "ORGANIZATION"}],
+            "_AccountId": Target["Id"],
+            "_OrganizationId": organization.id,
+        }
+        self.handshakes[handshake_id] = handshake
+        return {"Handshake": _public(handshake)}
+
+    def _list_handshakes_for_organization(self, caller, **kwargs):
+        organization = self._managed_organization(caller)
+        handshakes = [
+            _public(handshake)
+            for handshake in self.handshakes.values()
+            if handshake["_OrganizationId"] == organization.id
+        ]
+        return self._page(handshakes, "Handshakes", **kwargs)
+
+    def _handshake(self, HandshakeId) -> dict:
+        handshake = self.handshakes.get(HandshakeId)
+        if handshake is None:
+            raise SimulatorError(
+                "HandshakeNotFoundException", f"Handshake {HandshakeId} not found"
+            )
+        return handshake
+
+    def _describe_handshake(self, caller, HandshakeId):
+        return {"Handshake": _public(self._handshake(HandshakeId))}
+
+    def _accept_handshake(self, caller, HandshakeId):
+        handshake = self._handshake(HandshakeId)
+        if caller.id != handshake["_AccountId"] or not caller.can_accept:
+            raise SimulatorError(
+                "AccessDeniedException", f"{caller.id} cannot accept {HandshakeId}"
+            )
+        if handshake["State"] != "OPEN":
+            raise SimulatorError(
+                "InvalidHandshakeTransitionException",
+                f"Handshake {HandshakeId} is {handshake['State']}",
+            )
+        if caller.organization_id is not None:
+            organization = self.organizations[caller.organization_id]
+            if organization.management_account_id != caller.id:
+                raise SimulatorError(
+                    "HandshakeConstraintViolationException",
+                    f"{caller.id} is already a member of an organization",
+                )
+            del self.organizations[organization.id]
+        handshake["State"] = "ACCEPTED"
+        caller.organization_id = None
+        caller.parent_id = None
+        caller.joining_organization_id = handshake["_OrganizationId"]
+        caller.joins_at = time.monotonic() + self.join_delay
+        self._complete_joins()
+        return {"Handshake": _public(handshake)}
+
+    def _decline_handshake(self, caller, HandshakeId):
+        handshake = self._handshake(HandshakeId)
+        if caller.id != handshake["_AccountId"]:
+            raise SimulatorError(
+                "AccessDeniedException", f"{caller.id} cannot decline {HandshakeId}"
+            )
+        handshake["State"] = "DECLINED"
+        return {"Handshake": _public(handshake)}
+
+    def _remove_account_from_organization(self, caller, AccountId):
+        organization = self._managed_organization(caller)
+        account = self._member(organization, AccountId)
+        if account.id == organization.management_account_id:
+            raise SimulatorError(
+                "ConstraintViolationException",
+                "The management account cannot be removed",
+            )
+        account.organization_id = None
+        account.parent_id = None
+        return {}
+
+    def _move_account(self, caller, AccountId, SourceParentId, DestinationParentId):
+        organization = self._managed_organization(caller)
+        account = self._member(organization, AccountId)
+        self._parent(organization, DestinationParentId)
+        if account.parent_id != SourceParentId:
+            raise SimulatorError(
+                "SourceParentNotFoundException",
+                f"{AccountId} is not in {SourceParentId}",
+            )
+        account.parent_id = DestinationParentId
+        return {}
+
+    def _delete_organization(self, caller):
+        organization = self._managed_organization(caller)
+        for account in self.accounts.values():
+            if account.organization_id == organization.id and account.id != caller.id:
+                raise SimulatorError(
+                    "OrganizationNotEmptyException",
+                    "The organization still has member accounts",
+                )
+        del self.organizations[organization.id]
+        caller.organization_id = None
+        caller.parent_id = None
+        return {}
+
+    # AWS STS operations
+
+    def _assume_role(self, caller, RoleArn, RoleSessionName, **kwargs):
+        account_id = RoleArn.split(":")[4]
+        account = self.accounts.get(account_id)
+        if (
+            account is None
+            or not account.has_role
+            or not RoleArn.endswith(f":role/{ROLE_NAME}")
+            or account.trusted_account_id != caller.id
+        ):
+            raise SimulatorError(
+                "AccessDenied",
+                f"{caller.id} is not authorized to assume {RoleArn}",
+                403,
+            )
+        expiration = datetime.now(timezone.utc) + timedelta(hours=1)
+        return {
+            "Credentials": {
+                "AccessKeyId": f"ASIA{account_id}",
+                "SecretAccessKey": "simulated",
+                "SessionToken": "simulated",
+                "Expiration": expiration.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            },
+            "AssumedRoleUser": {
+                "AssumedRoleId": f"AROA{account_id}:{RoleSessionName}",
+                "Arn": f"arn:aws:sts::{account_id}:assumed-role/{ROLE_NAME}/{RoleSessionName}",
+            },
+        }
+
+    # AWS IAM operations
+
+    def _simulate_principal_policy(self, caller, PolicySourceArn, **kwargs):
+        account = self.accounts.get(PolicySourceArn.split(":")[4])
+        if (
+            account is None
+            or account.id != caller.id
+            or not account.has_role
+            or not PolicySourceArn.endswith(f":role/{ROLE_NAME}")
+        ):
+            raise SimulatorError(
+                "AccessDenied",
+                f"{caller.id} is not authorized to simulate {PolicySourceArn}",
+                403,
+            )
+        action_names = _members(kwargs, "ActionNames")
+        resource_arns = _members(kwargs, "ResourceArns") or ["*"]
+        return {
+            "EvaluationResults": [
+                {
+                    "EvalActionName": action_name,
+                    "EvalResourceName": resource_arn,
+                    "EvalDecision": (
+                        "allowed"
+                        if account.can_accept
+                        and action_name
+                        in [
+                            "organizations:AcceptHandshake",
+                            "organizations:DeclineHandshake",
+                        ]
+                        else "implicitDeny"
+                    ),
+                }
+                for action_name in action_names
+                for resource_arn in resource_arns
+            ],
+            "IsTruncated": "false",
+        }
+
+    def _get_caller_identity(self, caller, **kwargs):
+        return {
+            "UserId": caller.id,
+            "Account": caller.id,
+            "Arn": f"arn:aws:iam::{caller.id}:root",
+        }
+
+    # inspection helpers for tests and benchmarks
+
+    def parent_of(self, account_id: str) -> Optional[str]:
+        with self._lock:
+            self._complete_joins()
+            return self.accounts[account_id].parent_id
+
+    def organization_of(self, account_id: str) -> Optional[str]:
+        with self._lock:
+            self._complete_joins()
+            return self.accounts[account_id].organization_id
+
+    def total_calls(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+
+def _public(handshake: dict) -> dict:
+    return {key: value for key, value in handshake.items() if not key.startswith("_")}
+
+
+def _snake_case(operation: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", operation).lower()
+
+
+def _json_response(url: str, status: int, body: dict) -> AWSResponse:
+    return AWSResponse(
+        url,
+        status,
+        {"Content-Type": "application/x-amz-json-1.1", "x-amzn-RequestId": "simulated"},
+        _Raw(json.dumps(body).encode()),
+    )
+
+
+def _members(params: dict, name: str) -> List[str]:
+    # query protocol lists arrive as Name.member.1, Name.member.2, ...
+    prefix = f"{name}.member."
+    members = [
+        (int(key[len(prefix) :]), value)
+        for key, value in params.items()
+        if key.startswith(prefix)
+    ]
+    return [value for _, value in sorted(members)]
+
+
+def _xml(value) -> str:
+    if isinstance(value, list):
+        return "".join(f"<member>{_xml(item)}</member>" for item in value)
+    if isinstance(value, dict):
+        return "".join(f"<{key}>{_xml(item)}</{key}>" for key, item in value.items())
+    return str(value)
+
+
+def _query_response(url: str, operation: str, result: dict) -> AWSResponse:
+    body = (
+        f'<{operation}Response xmlns="https://sts.amazonaws.com/doc/2011-06-15/">'
+        f"<{operation}Result>{_xml(result)}</{operation}Result>"
+        f"<ResponseMetadata><RequestId>simulated</RequestId></ResponseMetadata>"
+        f"</{operation}Response>"
+    )
+    return AWSResponse(url, 200, {"Content-Type": "text/xml"}, _Raw(body.encode()))
+
+
+def _query_error(url: str, error: SimulatorError) -> AWSResponse:
+    body = (
+        '<ErrorResponse xmlns="https://sts.amazonaws.com/doc/2011-06-15/">'
+        f"<Error><Type>Sender</Type><Code>{error.code}</Code><Message>{error.message}</Message></Error>"
+        "<RequestId>simulated</RequestId></ErrorResponse>"
+    )
+    return AWSResponse(
+        url, error.status, {"Content-Type": "text/xml"}, _Raw(body.encode())
+    )
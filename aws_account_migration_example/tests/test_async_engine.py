@@ -0,0 +1,53 @@
+import botocore
+import pytest
+
+from aws_account_migration_example.runtime.async_engine import AsyncMigrationEngine
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
+
+
+def migrate_with(run) -> dict:
+    migration = SimulatedMigration(
+        simulator=OrganizationsSimulator(quotas={"InviteAccountToOrganization": 50.0}),
+        accounts=12,
+        organizational_units=3,
+    )
+    migrated_ids = run(migration.source, migration.target)
+    assert migrated_ids[-1] == migration.source_organization.management_account_id
+    return {
+        "migrated": set(migrated_ids),
+        "organizations": set(migration.simulator.organizations),
+        "placements": {
+            account.id: (account.organization_id, account.parent_id)
+            for account in migration.simulator.accounts.values()
+        },
+    }
+
+
+def test_async_engine_matches_pipeline():
+    expected = migrate_with(
+        lambda source, target: MigrationPipeline(
+            source=source, target=target, is_quiet=True, workers=4
+        ).run()
+    )
+    actual = migrate_with(
+        lambda source, target: AsyncMigrationEngine(
+            source=source, target=target, concurrency=5, workers=3
+        ).migrate()
+    )
+    assert actual == expected
+    assert len(actual["migrated"]) == 13
+
+
+def test_async_engine_records_the_failing_account():
+    migration = SimulatedMigration(accounts=3)
+    failing = migration.accounts[0]
+    failing.has_role = False
+    source = migration.source
+    engine = AsyncMigrationEngine(source=source, target=migration.target, concurrency=1)
+    with pytest.raises(botocore.exceptions.ClientError):
+        engine.migrate()
+    assert list(source.failures) == [failing.id]
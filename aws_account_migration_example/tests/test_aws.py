@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+import boto3
+from moto import mock_organizations, mock_sts
+
+from aws_account_migration_example.runtime.aws import AccountScopedCache, Aws
+from aws_account_migration_example.runtime.rate_limiter import AdaptiveRateLimiter
+
+
+@mock_organizations
+@mock_sts
+def test_account_scoped_instance_is_cached():
+    session = boto3.session.Session(region_name="us-east-1")
+    aws = Aws(organizations=session.client("organizations"), sts=session.client("sts"))
+    account = {"Id": "111111111111"}
+    assert aws.account_scoped_instance(account) is aws.account_scoped_instance(account)
+    assert aws.account_scoped_instance(
+        {"Id": "222222222222"}
+    ) is not aws.account_scoped_instance(account)
+
+
+def test_account_scoped_cache_expires_and_evicts():
+    cache = AccountScopedCache(max_size=2, refresh_margin=timedelta(minutes=5))
+    now = datetime.now(timezone.utc)
+    expiring = {"Expiration": now + timedelta(minutes=4)}
+    valid = {"Expiration": now + timedelta(hours=1)}
+    cache.put("1", expiring, "expiring")
+    assert cache.get("1") is None
+    assert cache.credentials("1") is None
+    cache.put("1", valid, "first")
+    cache.put("2", valid, "second")
+    assert cache.get("1") == "first"
+    cache.put("3", valid, "third")
+    assert cache.get("2") is None
+    assert cache.get("1") == "first"
+    assert len(cache) == 2
+    # the credentials of an evicted account are kept
+    assert cache.credentials("2") is valid
+
+
+@mock_organizations
+@mock_sts
+def test_evicted_account_is_not_assumed_again():
+    limiter = AdaptiveRateLimiter()
+    aws = Aws(
+        session=boto3.session.Session(region_name="us-east-1"),
+        account_cache=AccountScopedCache(max_size=1),
+        rate_limiter=limiter,
+    )
+    first = aws.account_scoped_instance({"Id": "111111111111"})
+    aws.account_scoped_instance({"Id": "222222222222"})
+    again = aws.account_scoped_instance({"Id": "111111111111"})
+    assert again is not first
+    assert again.credentials is first.credentials
+    assert limiter.statistics()["AssumeRole"]["calls"] == 2
+
+
+def test_rate_limiter_backs_off_when_throttled_and_recovers():
+    limiter = AdaptiveRateLimiter(rates={"ListAccounts": 4.0}, increase=1.0)
+    limiter.on_throttle("ListAccounts")
+    assert limiter.statistics()["ListAccounts"]["rate"] == 2.0
+    limiter.on_success("ListAccounts")
+    limiter.on_success("ListAccounts")
+    limiter.on_success("ListAccounts")
+    statistics = limiter.statistics()["ListAccounts"]
+    assert statistics["rate"] == 4.0
+    assert statistics["throttled"] == 1
+
+
+@mock_organizations
+@mock_sts
+def test_rate_limiter_is_shared_with_account_scoped_clients():
+    limiter = AdaptiveRateLimiter()
+    aws = Aws(
+        session=boto3.session.Session(region_name="us-east-1"), rate_limiter=limiter
+    )
+    account_scoped_aws = aws.account_scoped_instance({"Id": "111111111111"})
+    assert account_scoped_aws.rate_limiter is limiter
+    aws.organizations.create_organization(FeatureSet="ALL")
+    aws.organizations.describe_organization()
+    statistics = limiter.statistics()
+    assert statistics["AssumeRole"]["calls"] == 1
+    assert statistics["DescribeOrganization"]["calls"] == 1
+
+
+@mock_organizations
+@mock_sts
+def test_account_scoped_clients_are_created_from_the_shared_session():
+    session = boto3.session.Session(region_name="us-east-1")
+    aws = Aws(session=session, max_pool_connections=32)
+    account_scoped_aws = aws.account_scoped_instance({"Id": "111111111111"})
+    assert account_scoped_aws.session is session
+    client = account_scoped_aws.organizations
+    assert (
+        client._request_signer._credentials.access_key
+        == account_scoped_aws.credentials["AccessKeyId"]
+    )
+    assert client.meta.config.max_pool_connections == 32
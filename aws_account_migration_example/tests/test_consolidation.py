@@ -0,0 +1,111 @@
+from aws_account_migration_example.runtime.consolidation import ConsolidationRun
+from aws_account_migration_example.runtime.journal import MigrationJournal
+from aws_account_migration_example.runtime.model import SourceAwsOrganization
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
+
+
+def consolidate(simulator: OrganizationsSimulator, journal: MigrationJournal):
+    migration = SimulatedMigration(
+        simulator=simulator,
+        source_name="first",
+        accounts=4,
+        organizational_units=2,
+        journal=journal,
+        retry_attempts=0,
+    )
+    for name in ["second", "third"]:
+        migration.add_source(name, 4, 2)
+    return migration.source_organizations, migration.sources, migration.target
+
+
+def test_sources_are_migrated_into_one_target(tmp_path):
+    simulator = OrganizationsSimulator()
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    source_organizations, sources, target = consolidate(simulator, journal)
+    for source in sources:
+        target.mirror_organizational_units(source)
+    expected = {
+        account["Id"]: target.destination_for(account["Id"])["Id"]
+        for source in sources
+        for account in source.child_accounts
+    }
+    assert ConsolidationRun(
+        sources=sources,
+        target=target,
+        migrate=lambda source: bool(
+            MigrationPipeline(
+                source=source, target=target, is_quiet=True, workers=2
+            ).run()
+        ),
+    ).run()
+    assert {
+        account_id: simulator.parent_of(account_id) for account_id in expected
+    } == expected
+    for organization in source_organizations:
+        assert organization.id not in simulator.organizations
+    # the open handshakes of the shared target are only listed once
+    assert simulator.calls["ListHandshakesForOrganization"] == 1
+    assert journal.pending() == []
+
+
+def test_sources_are_migrated_step_by_step_into_one_target(tmp_path):
+    simulator = OrganizationsSimulator()
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    source_organizations, sources, target = consolidate(simulator, journal)
+    expected = [
+        account["Id"] for source in sources for account in source.child_accounts
+    ]
+
+    def migrate(source: SourceAwsOrganization) -> bool:
+        # every source only accepts the invitations of its own accounts
+        invitations = target.invite(source, True, 2)
+        assert {
+            target.get_invitation_source_and_target(invitation)[0]["Id"]
+            for invitation in invitations
+        } == {account["Id"] for account in source.child_accounts} | {
+            source.root_account["Id"]
+        }
+        target.move_accounts(source.accept(invitations, True), True)
+        return True
+
+    assert ConsolidationRun(sources=sources, target=target, migrate=migrate).run()
+    assert {simulator.parent_of(account_id) for account_id in expected} == {
+        target.destination_ou_id
+    }
+    for organization in source_organizations:
+        assert organization.id not in simulator.organizations
+    assert journal.pending() == []
+
+
+def test_failing_source_does_not_stop_the_others(tmp_path):
+    simulator = OrganizationsSimulator()
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    source_organizations, sources, target = consolidate(simulator, journal)
+    broken = list(sources[1].child_accounts)[0]["Id"]
+    simulator.accounts[broken].can_accept = False
+
+    def migrate(source: SourceAwsOrganization) -> bool:
+        if source.profile == "third":
+            raise RuntimeError("Credentials expired")
+        return bool(
+            MigrationPipeline(
+                source=source, target=target, is_quiet=True, workers=2
+            ).run()
+        )
+
+    consolidation = ConsolidationRun(sources=sources, target=target, migrate=migrate)
+    assert not consolidation.run()
+    assert list(consolidation.errors) == ["third"]
+    assert list(sources[1].failures) == [broken]
+    assert source_organizations[0].id not in simulator.organizations
+    assert source_organizations[1].id in simulator.organizations
+    assert source_organizations[2].id in simulator.organizations
+    # a resumed run of another organization does not pick up the account that left the second one
+    assert [entry["AccountId"] for entry in journal.pending()] == [broken]
+    assert sources[0].pending_entries() == []
+    assert sources[2].pending_entries() == []
+    assert [entry["AccountId"] for entry in sources[1].pending_entries()] == [broken]
@@ -0,0 +1,165 @@
+from aws_account_migration_example.runtime.aws import Aws
+from aws_account_migration_example.runtime.journal import (
+    ACCEPTED,
+    INVITED,
+    MOVED,
+    REMOVED,
+    MigrationJournal,
+)
+from aws_account_migration_example.runtime import model
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.tests.mocks.aws.mock_aws import mock_aws
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
+
+
+def test_journal_tracks_pending_accounts(tmp_path):
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    journal.record("111111111111", INVITED, "h-1")
+    journal.record("111111111111", REMOVED)
+    journal.record("222222222222", MOVED, "h-2")
+    assert journal.entry("111111111111") == {
+        "AccountId": "111111111111",
+        "State": REMOVED,
+        "HandshakeId": "h-1",
+        "OrganizationId": None,
+        "TargetOrganizationId": None,
+        "DestinationId": None,
+    }
+    assert journal.has_reached("111111111111", INVITED)
+    assert not journal.has_reached("111111111111", ACCEPTED)
+    assert [entry["AccountId"] for entry in journal.pending()] == ["111111111111"]
+
+
+@mock_aws
+def test_resume_skips_completed_steps(aws: Aws = None):
+    journal = MigrationJournal(":memory:")
+    account = aws.organizations.list_accounts()["Accounts"][1]
+    source = SourceAwsOrganization(
+        profile_name="test01", account=account["Id"], aws=aws, journal=journal
+    )
+    target = TargetAwsOrganization(profile_name="test02", aws=aws, journal=journal)
+    target.invite(source, True)
+    # the previous run stopped right after removing the account
+    aws.organizations.remove_account_from_organization(AccountId=account["Id"])
+    journal.record(account["Id"], REMOVED)
+
+    resumed_source = SourceAwsOrganization(
+        profile_name="test01",
+        account=account["Id"],
+        aws=aws,
+        journal=journal,
+        resume=True,
+    )
+    invitations = target.invite(resumed_source, True)
+    assert len(invitations) == 1
+    assert resumed_source.accept(invitations, True) == [account["Id"]]
+    target.move_accounts([account["Id"]], True)
+    assert journal.entry(account["Id"])["State"] == MOVED
+    assert journal.pending() == []
+
+
+def test_resume_invites_again_when_the_handshake_is_gone(tmp_path, monkeypatch):
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    migration = SimulatedMigration(accounts=3, journal=journal)
+    simulator = migration.simulator
+
+    def organizations(resume=False):
+        return migration.create_source(resume=resume), migration.create_target()
+
+    source, target = organizations()
+    target.invite(source, True)
+    declined, expired, standalone = [account["Id"] for account in source.child_accounts]
+
+    # the operator declines one invitation
+    monkeypatch.setattr(model, "confirm", lambda *args: False)
+    invitation = target.find_invitation(declined)
+    assert source.accept_invitation(invitation, False) is None
+    assert journal.entry(declined) is None
+    monkeypatch.undo()
+    # the other handshakes expire, one of them after its account left the source organization
+    simulator.handshakes[target.find_invitation(expired)["Id"]]["State"] = "EXPIRED"
+    migration.aws(
+        migration.source_organization
+    ).organizations.remove_account_from_organization(AccountId=standalone)
+    journal.record(standalone, REMOVED)
+    simulator.handshakes[target.find_invitation(standalone)["Id"]]["State"] = "EXPIRED"
+
+    source, target = organizations(resume=True)
+    MigrationPipeline(source=source, target=target, is_quiet=True, workers=2).run()
+    for account_id in [declined, expired, standalone]:
+        assert simulator.parent_of(account_id) == migration.destination["Id"]
+    assert journal.pending() == []
+
+
+def test_journal_entries_of_another_migration_are_ignored(tmp_path):
+    simulator = OrganizationsSimulator()
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    organizations = {
+        name: simulator.create_organization(name) for name in ["a", "b", "c"]
+    }
+    simulator.populate(organizations["a"], 2, 0)
+
+    def migrate(source_name, target_name):
+        source = SourceAwsOrganization(
+            profile_name=source_name,
+            aws=simulator.aws(organizations[source_name].management_account_id),
+            journal=journal,
+        )
+        target = TargetAwsOrganization(
+            profile_name=target_name,
+            aws=simulator.aws(organizations[target_name].management_account_id),
+            readiness_interval=0.1,
+            journal=journal,
+        )
+        account_ids = [account["Id"] for account in source.child_accounts]
+        MigrationPipeline(source=source, target=target, is_quiet=True, workers=2).run()
+        return account_ids
+
+    migrate("a", "b")
+    # the roles of the moved accounts now trust the management account of their new organization
+    for account in simulator.accounts.values():
+        if account.organization_id == organizations["b"].id:
+            account.trusted_account_id = organizations["b"].management_account_id
+    for account_id in migrate("b", "c"):
+        assert simulator.parent_of(account_id) == organizations["c"].root_id
+        assert journal.entry(account_id)["OrganizationId"] == organizations["b"].id
+        assert (
+            journal.entry(account_id)["TargetOrganizationId"] == organizations["c"].id
+        )
+    assert journal.pending() == []
+
+
+def test_resume_moves_accounts_that_left_the_source_to_their_mirrored_ou(tmp_path):
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    migration = SimulatedMigration(accounts=3, organizational_units=2, journal=journal)
+
+    def organizations(resume=False):
+        source = migration.create_source(resume=resume)
+        target = migration.create_target()
+        target.mirror_organizational_units(source)
+        return source, target
+
+    source, target = organizations()
+    expected = {
+        account["Id"]: target.destination_for(account["Id"])["Id"]
+        for account in source.child_accounts
+    }
+    assert migration.destination["Id"] not in expected.values()
+    target.invite(source, True)
+    # the previous process stopped right after the first account joined the target organization
+    accepted = next(iter(expected))
+    assert source.accept_invitation(target.find_invitation(accepted), True) == accepted
+
+    source, target = organizations(resume=True)
+    MigrationPipeline(source=source, target=target, is_quiet=True, workers=2).run()
+    assert {
+        account_id: migration.simulator.parent_of(account_id) for account_id in expected
+    } == expected
+    assert journal.pending() == []
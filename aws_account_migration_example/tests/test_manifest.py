@@ -0,0 +1,96 @@
+import os
+import tempfile
+
+from aws_account_migration_example.runtime.aws import Aws
+from aws_account_migration_example.runtime.manifest import Manifest
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+from aws_account_migration_example.tests.mocks.aws.mock_aws import mock_aws
+
+
+def _write_manifest(suffix: str, content: str) -> str:
+    file, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(file, "w") as manifest:
+        manifest.write(content)
+    return path
+
+
+@mock_aws
+def test_manifest_rows_are_validated_before_migration(aws: Aws = None):
+    root_id = aws.organizations.list_roots()["Roots"][0]["Id"]
+    destination = aws.organizations.create_organizational_unit(
+        ParentId=root_id, Name="Destination"
+    )["OrganizationalUnit"]
+    account = aws.organizations.list_accounts()["Accounts"][1]
+    path = _write_manifest(
+        ".csv",
+        "account_id,destination_ou,skip\n"
+        f"{account['Id']},{destination['Id']},\n"
+        "111111111111,,yes\n"
+        "222222222222,,\n"
+        "not-an-account,,\n",
+    )
+    try:
+        source = SourceAwsOrganization(
+            profile_name="test01", aws=aws, manifest=Manifest(path)
+        )
+        target = TargetAwsOrganization(profile_name="test02", aws=aws)
+        errors = source.validate_manifest(target)
+        assert len(errors) == 2
+        assert "222222222222 is not in the source organization" in errors[0]
+        assert "invalid account ID not-an-account" in errors[1]
+        assert "111111111111" not in {row["Id"] for row in source.manifest.accounts()}
+        assert not source.includes_management_account
+    finally:
+        os.remove(path)
+
+
+@mock_aws
+def test_manifest_destination_overrides_default(aws: Aws = None):
+    root_id = aws.organizations.list_roots()["Roots"][0]["Id"]
+    destination = aws.organizations.create_organizational_unit(
+        ParentId=root_id, Name="Destination"
+    )["OrganizationalUnit"]
+    account = aws.organizations.list_accounts()["Accounts"][1]
+    path = _write_manifest(
+        ".jsonl",
+        f'{{"account_id": "{account["Id"]}", "destination_ou": "{destination["Id"]}"}}\n',
+    )
+    try:
+        source = SourceAwsOrganization(
+            profile_name="test01", aws=aws, manifest=Manifest(path)
+        )
+        target = TargetAwsOrganization(profile_name="test02", aws=aws)
+        assert source.validate_manifest(target) == []
+        assert [child["Id"] for child in source.child_accounts] == [account["Id"]]
+        assert target.destination_for(account["Id"]) == {
+            "Id": destination["Id"],
+            "Name": "Destination",
+        }
+    finally:
+        os.remove(path)
+
+
+@mock_aws
+def test_unreadable_jsonl_rows_are_reported(aws: Aws = None):
+    account = aws.organizations.list_accounts()["Accounts"][1]
+    path = _write_manifest(
+        ".jsonl",
+        f'{{"account_id": "{account["Id"]}"}}\n'
+        '{"account_id": "111111111111"\n'
+        '["222222222222"]\n',
+    )
+    try:
+        source = SourceAwsOrganization(
+            profile_name="test01", aws=aws, manifest=Manifest(path)
+        )
+        target = TargetAwsOrganization(profile_name="test02", aws=aws)
+        errors = source.validate_manifest(target)
+        assert len(errors) == 2
+        assert errors[0].startswith(f"{path}:2 invalid JSON")
+        assert errors[1] == f"{path}:3 row is not a JSON object"
+        assert [row["Id"] for row in source.manifest.accounts()] == [account["Id"]]
+    finally:
+        os.remove(path)
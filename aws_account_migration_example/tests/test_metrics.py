@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+
+import pytest
+from botocore.exceptions import ClientError
+
+from aws_account_migration_example.runtime.metrics import Metrics
+from aws_account_migration_example.runtime.rate_limiter import AdaptiveRateLimiter
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
+
+
+def test_metrics_record_calls_retries_and_errors():
+    simulator = OrganizationsSimulator(quotas={"InviteAccountToOrganization": 2.0})
+    source = simulator.create_organization("source")
+    target = simulator.create_organization("target")
+    accounts = simulator.populate(source, 4)
+    metrics = Metrics()
+    aws = simulator.aws(
+        target.management_account_id,
+        rate_limiter=AdaptiveRateLimiter(rates={"InviteAccountToOrganization": 20.0}),
+        metrics=metrics,
+    )
+    for account in accounts:
+        aws.organizations.invite_account_to_organization(
+            Target={"Id": account.id, "Type": "ACCOUNT"}
+        )
+    with pytest.raises(ClientError):
+        aws.organizations.describe_account(AccountId="000000000000")
+    with metrics.phase("invite"):
+        aws.organizations.describe_organization()
+
+    report = metrics.report()
+    invites = report["operations"]["organizations.InviteAccountToOrganization"]
+    assert invites["calls"] == len(accounts)
+    assert invites["retries"] == simulator.throttled
+    assert sum(invites["latency_histogram"].values()) == len(accounts)
+    describe = report["operations"]["organizations.DescribeAccount"]
+    assert describe["errors"] == {"AccountNotFoundException": 1}
+    assert "invite" in report["phases"]
+
+    descriptor, path = tempfile.mkstemp(suffix=".prom")
+    os.close(descriptor)
+    try:
+        metrics.write_prometheus(path)
+        with open(path) as file:
+            content = file.read()
+        assert (
+            f'aws_account_migration_api_calls_total{{service="organizations",operation="InviteAccountToOrganization"}} {len(accounts)}'
+            in content
+        )
+        assert (
+            'aws_account_migration_api_errors_total{service="organizations",operation="DescribeAccount",code="AccountNotFoundException"} 1'
+            in content
+        )
+        metrics.write_json(path)
+        with open(path) as file:
+            assert json.load(file) == metrics.report()
+    finally:
+        os.remove(path)
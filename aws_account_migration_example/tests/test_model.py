@@ -4,6 +4,9 @@ from aws_account_migration_example.runtime.model import (
     TargetAwsOrganization,
 )
 from aws_account_migration_example.tests.mocks.aws.mock_aws import mock_aws
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
 
 
 @mock_aws
@@ -15,3 +18,83 @@ def test_invite_with_single_account(aws: Aws = None):
     target = TargetAwsOrganization(profile_name="test02", aws=aws)
     invitations = target.invite(source, True)
     source.accept(invitations, True)
+
+
+@mock_aws
+def test_invite_concurrently(aws: Aws = None):
+    for index in range(4):
+        aws.organizations.create_account(
+            Email=f"test{index}@test.test", AccountName=f"Test child account {index}"
+        )
+    source = SourceAwsOrganization(profile_name="test01", aws=aws)
+    target = TargetAwsOrganization(profile_name="test02", aws=aws)
+    invitations = target.invite(source, True, workers=4)
+    invited_ids = {
+        target.get_invitation_source_and_target(invitation)[0]["Id"]
+        for invitation in invitations
+    }
+    assert invited_ids == {account["Id"] for account in source.child_accounts} | {
+        source.root_account["Id"]
+    }
+
+
+@mock_aws
+def test_open_invitation_skips_invite(aws: Aws = None):
+    account = aws.organizations.list_accounts()["Accounts"][1]
+    source = SourceAwsOrganization(
+        profile_name="test01", account=account["Id"], aws=aws
+    )
+    target = TargetAwsOrganization(profile_name="test02", aws=aws)
+    target.add_invitation(
+        {
+            "Id": "h-open",
+            "State": "OPEN",
+            "Parties": [
+                {"Id": account["Id"], "Type": "ACCOUNT"},
+                {"Id": "o-target", "Type": "ORGANIZATION"},
+            ],
+        }
+    )
+    invitation = target.send_invitation(account, True)
+    assert invitation["Id"] == "h-open"
+    assert target.invitations_by_id["h-open"] is invitation
+    assert len(target.invitations) == 1
+
+
+@mock_aws
+def test_child_accounts_are_listed_lazily(aws: Aws = None):
+    source = SourceAwsOrganization(profile_name="test01", aws=aws)
+    assert not source.child_accounts.is_exhausted
+    accounts = list(source.child_accounts)
+    assert source.child_accounts.is_exhausted
+    assert accounts == list(source.child_accounts)
+    assert set(accounts[0].keys()) == {"Id", "Name", "Email"}
+
+
+def test_organizations_load_lazily():
+    simulator = OrganizationsSimulator()
+    source_organization = simulator.create_organization("source")
+    target_organization = simulator.create_organization("target")
+    account = simulator.populate(source_organization, 2)[0]
+    source = SourceAwsOrganization(
+        profile_name="source",
+        account=account.id,
+        aws=simulator.aws(source_organization.management_account_id),
+    )
+    target = TargetAwsOrganization(
+        profile_name="target",
+        aws=simulator.aws(target_organization.management_account_id),
+        organizational_unit=target_organization.root_id,
+    )
+    assert simulator.total_calls() == 0
+    assert [child["Id"] for child in source.child_accounts] == [account.id]
+    assert source.root_account["Id"] == source_organization.management_account_id
+    assert target.find_invitation(account.id) is None
+    # every lookup is fetched once
+    source.root_account
+    target.find_invitation(account.id)
+    assert simulator.calls == {
+        "DescribeAccount": 3,
+        "DescribeOrganization": 2,
+        "ListHandshakesForOrganization": 1,
+    }
@@ -0,0 +1,103 @@
+from aws_account_migration_example.runtime.aws import Aws
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+from aws_account_migration_example.tests.mocks.aws.mock_aws import mock_aws
+
+
+def _create_account(aws: Aws, name: str, parent_id: str) -> str:
+    account_id = aws.organizations.create_account(
+        Email=f"{name}@test.test", AccountName=name
+    )["CreateAccountStatus"]["AccountId"]
+    root_id = aws.organizations.list_roots()["Roots"][0]["Id"]
+    aws.organizations.move_account(
+        AccountId=account_id, SourceParentId=root_id, DestinationParentId=parent_id
+    )
+    return account_id
+
+
+@mock_aws
+def test_source_accounts_filtered_by_organizational_unit(aws: Aws = None):
+    root_id = aws.organizations.list_roots()["Roots"][0]["Id"]
+    workloads = aws.organizations.create_organizational_unit(
+        ParentId=root_id, Name="Workloads"
+    )["OrganizationalUnit"]
+    prod = aws.organizations.create_organizational_unit(
+        ParentId=workloads["Id"], Name="Prod"
+    )["OrganizationalUnit"]
+    sandbox = aws.organizations.create_organizational_unit(
+        ParentId=root_id, Name="Sandbox"
+    )["OrganizationalUnit"]
+    workload_id = _create_account(aws, "workload", workloads["Id"])
+    prod_id = _create_account(aws, "prod", prod["Id"])
+    _create_account(aws, "prod-legacy", prod["Id"])
+    sandbox_id = _create_account(aws, "sandbox", sandbox["Id"])
+
+    source = SourceAwsOrganization(
+        profile_name="test01",
+        aws=aws,
+        organizational_units=[workloads["Id"]],
+        exclude=["*-legacy"],
+    )
+    assert {account["Id"] for account in source.child_accounts} == {
+        workload_id,
+        prod_id,
+    }
+    assert not source.includes_management_account
+    # accounts directly in the matched OU are excluded along with the ones below it
+    source = SourceAwsOrganization(
+        profile_name="test01", aws=aws, exclude=["*/Sandbox/*", "*/Workloads/*"]
+    )
+    assert not {account["Id"] for account in source.child_accounts} & {
+        workload_id,
+        prod_id,
+        sandbox_id,
+    }
+    source = SourceAwsOrganization(
+        profile_name="test01", aws=aws, include=["/Workloads/Prod"]
+    )
+    assert prod_id in {account["Id"] for account in source.child_accounts}
+    assert workload_id not in {account["Id"] for account in source.child_accounts}
+    assert source.tree.parent_of(prod_id).path == "/Workloads/Prod"
+    assert [unit.name for unit in source.tree.subtree(workloads["Id"])] == [
+        "Workloads",
+        "Prod",
+    ]
+
+
+@mock_aws
+def test_mirror_recreates_source_hierarchy_below_destination(aws: Aws = None):
+    root_id = aws.organizations.list_roots()["Roots"][0]["Id"]
+    workloads = aws.organizations.create_organizational_unit(
+        ParentId=root_id, Name="Workloads"
+    )["OrganizationalUnit"]
+    prod = aws.organizations.create_organizational_unit(
+        ParentId=workloads["Id"], Name="Prod"
+    )["OrganizationalUnit"]
+    migrated = aws.organizations.create_organizational_unit(
+        ParentId=root_id, Name="Migrated"
+    )["OrganizationalUnit"]
+    prod_id = _create_account(aws, "prod", prod["Id"])
+
+    source = SourceAwsOrganization(
+        profile_name="test01", aws=aws, organizational_units=[workloads["Id"]]
+    )
+    target = TargetAwsOrganization(
+        profile_name="test02", aws=aws, organizational_unit=migrated["Id"]
+    )
+    target.mirror_organizational_units(source)
+
+    destination = target.destination_for(prod_id)
+    assert destination["Name"] == "Prod"
+    # the account is moved after it left the source organization
+    source.forget_account(prod_id)
+    assert target.destination_for(prod_id) == destination
+    mirrored_workloads = aws.organizations.list_organizational_units_for_parent(
+        ParentId=migrated["Id"]
+    )["OrganizationalUnits"]
+    assert [ou["Name"] for ou in mirrored_workloads] == ["Workloads"]
+    mirrored_prod = aws.organizations.list_organizational_units_for_parent(
+        ParentId=mirrored_workloads[0]["Id"]
+    )["OrganizationalUnits"]
+    assert mirrored_prod[0]["Id"] == destination["Id"]
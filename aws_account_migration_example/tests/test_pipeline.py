@@ -0,0 +1,24 @@
+from aws_account_migration_example.runtime.aws import Aws
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.tests.mocks.aws.mock_aws import mock_aws
+
+
+@mock_aws
+def test_pipeline_migrates_management_account_last(aws: Aws = None):
+    for index in range(3):
+        aws.organizations.create_account(
+            Email=f"test{index}@test.test", AccountName=f"Test child account {index}"
+        )
+    source = SourceAwsOrganization(profile_name="test01", aws=aws)
+    target = TargetAwsOrganization(profile_name="test02", aws=aws)
+    migrated_ids = MigrationPipeline(
+        source=source, target=target, is_quiet=True, workers=3
+    ).run()
+    assert set(migrated_ids[:-1]) == {
+        account["Id"] for account in source.child_accounts
+    }
+    assert migrated_ids[-1] == source.root_account["Id"]
@@ -0,0 +1,42 @@
+from aws_account_migration_example.runtime import plan as plan_module
+from aws_account_migration_example.runtime.plan import MigrationPlan
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+
+
+def test_plan_runs_only_approved_accounts(monkeypatch, capsys):
+    migration = SimulatedMigration(accounts=4)
+    simulator, accounts = migration.simulator, migration.accounts
+    source, target = migration.source, migration.target
+    sandbox = simulator.create_organizational_unit_in(
+        migration.target_organization, migration.target_organization.root_id, "Sandbox"
+    )
+    plan = MigrationPlan(source=source, target=target).build()
+    assert plan.includes_management_account
+    # building the plan does not change anything
+    assert "InviteAccountToOrganization" not in simulator.calls
+
+    # an unbalanced quote does not end the review
+    answers = iter(
+        [
+            f"exclude '{accounts[0].id}",
+            f"exclude {accounts[0].id}",
+            f"move '{accounts[1].name}' {sandbox['Id']}",
+            "yes",
+        ]
+    )
+    monkeypatch.setattr(plan_module, "ask", lambda *args: next(answers))
+    assert plan.review()
+    output = capsys.readouterr().out
+    assert "No closing quotation" in output
+    assert "Excluded 1 accounts" in output
+    assert "Moving 1 accounts" in output
+    assert not plan.includes_management_account
+    assert "the management account stays" in plan.table()
+
+    migrated_ids = plan.execute(workers=3)
+    assert set(migrated_ids) == {account.id for account in accounts[1:]}
+    assert simulator.parent_of(accounts[0].id) == migration.source_organization.root_id
+    assert simulator.parent_of(accounts[1].id) == sandbox["Id"]
+    for account in accounts[2:]:
+        assert simulator.parent_of(account.id) == migration.destination["Id"]
+    assert migration.source_organization.id in simulator.organizations
@@ -0,0 +1,102 @@
+import csv
+
+from botocore.exceptions import EndpointConnectionError
+
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.runtime.preflight import (
+    FAILED,
+    PASSED,
+    PreflightCheck,
+)
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+    SimulatorError,
+)
+
+
+def organizations(simulator: OrganizationsSimulator):
+    migration = SimulatedMigration(
+        simulator=simulator, accounts=6, organizational_units=2
+    )
+    return migration.source, migration.target
+
+
+def test_preflight_reports_accounts_without_working_role(tmp_path):
+    simulator = OrganizationsSimulator()
+    source, target = organizations(simulator)
+    accounts = list(source.child_accounts)
+    simulator.accounts[accounts[1]["Id"]].has_role = False
+    simulator.accounts[accounts[4]["Id"]].can_accept = False
+    preflight = PreflightCheck(source=source, target=target, workers=3)
+    assert not preflight.run()
+    assert [result.id for result in preflight.results] == [
+        account["Id"] for account in accounts
+    ]
+    assert [result.id for result in preflight.failures] == [
+        accounts[1]["Id"],
+        accounts[4]["Id"],
+    ]
+    assert preflight.failures[0].assume_role == FAILED
+    assert preflight.failures[1].assume_role == PASSED
+    assert preflight.failures[1].accept_handshake == FAILED
+    # nothing was changed in either organization
+    assert "InviteAccountToOrganization" not in simulator.calls
+    assert "RemoveAccountFromOrganization" not in simulator.calls
+
+    path = tmp_path / "preflight.csv"
+    preflight.save(str(path))
+    with open(path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 6
+    assert rows[1]["AssumeRole"] == FAILED
+    assert rows[4]["AcceptHandshake"] == FAILED
+
+
+def test_preflight_records_unexpected_errors(monkeypatch):
+    simulator = OrganizationsSimulator()
+    source, target = organizations(simulator)
+    broken = list(source.child_accounts)[2]["Id"]
+    simulate_principal_policy = simulator._simulate_principal_policy
+
+    def simulate(caller, PolicySourceArn, **kwargs):
+        if caller.id == broken:
+            raise SimulatorError("NoSuchEntity", "The role cannot be found", 404)
+        return simulate_principal_policy(caller, PolicySourceArn, **kwargs)
+
+    monkeypatch.setattr(simulator, "_simulate_principal_policy", simulate)
+    preflight = PreflightCheck(source=source, target=target, workers=3)
+    assert not preflight.run()
+    assert len(preflight.results) == 6
+    assert [result.id for result in preflight.failures] == [broken]
+    assert preflight.failures[0].accept_handshake == FAILED
+    assert preflight.failures[0].error == "The role cannot be found"
+
+
+def test_preflight_reports_unreachable_accounts(monkeypatch):
+    simulator = OrganizationsSimulator()
+    source, target = organizations(simulator)
+    unreachable = list(source.child_accounts)[3]["Id"]
+    account_scoped_aws = source.account_scoped_aws
+
+    def connect(account):
+        if account["Id"] == unreachable:
+            raise EndpointConnectionError(endpoint_url="https://sts.amazonaws.com")
+        return account_scoped_aws(account)
+
+    monkeypatch.setattr(source, "account_scoped_aws", connect)
+    preflight = PreflightCheck(source=source, target=target, workers=3)
+    assert not preflight.run()
+    assert len(preflight.results) == 6
+    assert [result.id for result in preflight.failures] == [unreachable]
+    assert preflight.failures[0].assume_role == FAILED
+    assert "https://sts.amazonaws.com" in preflight.failures[0].error
+
+
+def test_preflight_credentials_are_reused():
+    simulator = OrganizationsSimulator()
+    source, target = organizations(simulator)
+    assert PreflightCheck(source=source, target=target, workers=3).run()
+    assert simulator.calls["AssumeRole"] == 6
+    MigrationPipeline(source=source, target=target, is_quiet=True, workers=3).run()
+    assert simulator.calls["AssumeRole"] == 6
@@ -0,0 +1,58 @@
+import io
+import json
+
+from aws_account_migration_example.runtime.journal import (
+    ACCEPTED,
+    INVITED,
+    MOVED,
+    REMOVED,
+)
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.runtime.progress import MigrationProgress
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+
+
+def test_progress_counts_each_state_once():
+    progress = MigrationProgress(total=lambda: 4, stream=io.StringIO(), is_tty=False)
+    progress.record("1", INVITED)
+    progress.record("1", INVITED)
+    progress.record("1", REMOVED)
+    # resumed from an earlier run straight to accepted
+    progress.record("2", ACCEPTED)
+    progress.record("1", MOVED)
+    status = progress.status()
+    assert status[INVITED] == 2
+    assert status[REMOVED] == 2
+    assert status[ACCEPTED] == 2
+    assert status[MOVED] == 1
+    assert status["accounts_per_minute"] > 0
+    assert status["eta_seconds"] is not None
+    assert "1/4 moved" in progress.line(status)
+
+
+def test_progress_reports_migration_as_json_lines():
+    migration = SimulatedMigration(accounts=5, organizational_units=2)
+    aws = migration.aws(migration.source_organization)
+    stream = io.StringIO()
+    progress = MigrationProgress(
+        rate_limiter=migration.rate_limiter,
+        metrics=aws.metrics,
+        stream=stream,
+        is_tty=False,
+        interval=0.05,
+    )
+    source = migration.create_source(aws=aws, progress=progress)
+    progress.total = lambda: len(source.child_accounts) + 1
+    target = migration.create_target(progress=progress)
+    progress.start()
+    MigrationPipeline(source=source, target=target, is_quiet=True, workers=2).run()
+    progress.stop()
+    lines = [json.loads(line)["progress"] for line in stream.getvalue().splitlines()]
+    assert len(lines) > 1
+    final = lines[-1]
+    assert final["total"] == 6
+    # the management account leaves by deleting the organization
+    assert final[INVITED] == final[REMOVED] == final[ACCEPTED] == final[MOVED] == 6
+    assert final["eta_seconds"] == 0
+    assert final["rate_limiter_wait_seconds"] >= 0
+    assert final["api_seconds"] > 0
@@ -0,0 +1,76 @@
+import time
+
+from aws_account_migration_example.runtime.journal import (
+    ACCEPTED,
+    MOVED,
+    MigrationJournal,
+)
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
+
+
+def test_move_waits_for_accounts_to_join():
+    simulator = OrganizationsSimulator(join_delay=0.3)
+    migration = SimulatedMigration(
+        simulator=simulator, accounts=4, readiness_timeout=10
+    )
+    source, target = migration.source, migration.target
+    destination = migration.destination
+    invitations = target.invite(source, True)
+    accepted_ids = source.accept(invitations, True)
+    target.move_accounts(accepted_ids, True)
+    for account_id in accepted_ids:
+        assert simulator.parent_of(account_id) == destination["Id"]
+    # one sweep of the root per interval rather than one call per account
+    assert simulator.calls["ListAccountsForParent"] < 10
+
+
+def test_pipeline_waiters_share_sweeps():
+    simulator = OrganizationsSimulator(join_delay=0.3)
+    migration = SimulatedMigration(
+        simulator=simulator, accounts=6, readiness_timeout=10
+    )
+    source, target = migration.source, migration.target
+    destination = migration.destination
+    start = time.monotonic()
+    migrated_ids = MigrationPipeline(
+        source=source, target=target, is_quiet=True, workers=6
+    ).run()
+    elapsed = time.monotonic() - start
+    for account_id in migrated_ids[:-1]:
+        assert simulator.parent_of(account_id) == destination["Id"]
+    # waiting workers share one sweep per interval
+    assert target.readiness.sweeps <= elapsed / target.readiness_interval + 1
+
+
+def test_resumed_move_does_not_wait_for_moved_accounts(tmp_path):
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    migration = SimulatedMigration(accounts=4, journal=journal)
+    source, target = migration.source, migration.target
+    accepted_ids = source.accept(target.invite(source, True), True)
+    # the previous run moved an account but stopped before the journal recorded it
+    target.move_account(accepted_ids[0], True)
+    journal.record(accepted_ids[0], ACCEPTED)
+
+    resumed = migration.create_target(readiness_timeout=1)
+    resumed.move_accounts(accepted_ids, True)
+    for account_id in accepted_ids:
+        assert migration.simulator.parent_of(account_id) == migration.destination["Id"]
+        assert journal.has_reached(account_id, MOVED)
+    # only the account missing from the root is looked up
+    assert migration.simulator.calls["ListParents"] == 1
+
+
+def test_accounts_staying_in_the_root_are_not_waited_for():
+    simulator = OrganizationsSimulator(join_delay=5)
+    migration = SimulatedMigration(simulator=simulator, accounts=3)
+    source = migration.source
+    target = migration.create_target(organizational_unit=None, readiness_timeout=0.5)
+    accepted_ids = source.accept(target.invite(source, True), True)
+    target.move_accounts(accepted_ids[:-1], True)
+    target.move_account_when_ready(accepted_ids[-1], True)
+    assert simulator.calls.get("MoveAccount", 0) == 0
+    assert target.readiness.sweeps == 0
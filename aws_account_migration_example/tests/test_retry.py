@@ -0,0 +1,91 @@
+import logging
+
+from aws_account_migration_example.runtime.journal import REMOVED, MigrationJournal
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.runtime.retry import RetryQueue
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
+
+
+def organizations(simulator: OrganizationsSimulator, journal: MigrationJournal):
+    migration = SimulatedMigration(
+        simulator=simulator,
+        accounts=6,
+        organizational_units=2,
+        journal=journal,
+        retry_attempts=2,
+        retry_backoff=0.01,
+    )
+    return migration.source_organization, migration.source, migration.target
+
+
+def fail_once(simulator: OrganizationsSimulator, account_id: str):
+    accept_handshake = simulator._accept_handshake
+    failed = []
+
+    def flaky_accept_handshake(caller, **kwargs):
+        if caller.id == account_id and not failed:
+            failed.append(caller.id)
+            raise ConnectionResetError("Connection reset by peer")
+        return accept_handshake(caller, **kwargs)
+
+    simulator._accept_handshake = flaky_accept_handshake
+
+
+def test_retry_queue_backs_off_and_gives_up():
+    retries = RetryQueue(attempts=2, backoff=0.01)
+    attempts = []
+
+    def step(item):
+        attempts.append(item)
+        if item == "broken" or attempts.count(item) == 1:
+            raise RuntimeError(item)
+        return item
+
+    assert retries.attempt("1", "flaky", step) is None
+    assert retries.attempt("2", "broken", step) is None
+    assert retries.delay(1) == 0.01
+    assert retries.delay(3) == 0.04
+    assert retries.drain(step) == ["flaky"]
+    assert attempts.count("flaky") == 2
+    assert attempts.count("broken") == 3
+    assert list(retries.failures) == ["2"]
+
+
+def test_accept_resumes_failed_account_after_the_others(tmp_path):
+    simulator = OrganizationsSimulator()
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    source_organization, source, target = organizations(simulator, journal)
+    flaky = list(source.child_accounts)[0]["Id"]
+    fail_once(simulator, flaky)
+    invitations = target.invite(source, True, 4)
+    accepted_ids = source.accept(invitations, True)
+    assert len(accepted_ids) == 7
+    assert accepted_ids[-1] == source_organization.management_account_id
+    assert flaky in accepted_ids
+    assert source.failures == {}
+    # the retry did not try to remove the account from the source organization again
+    assert simulator.calls["RemoveAccountFromOrganization"] == 6
+
+
+def test_unfinished_accounts_keep_the_management_account(tmp_path, caplog):
+    simulator = OrganizationsSimulator()
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    source_organization, source, target = organizations(simulator, journal)
+    broken = list(source.child_accounts)[2]["Id"]
+    simulator.accounts[broken].can_accept = False
+    flaky = list(source.child_accounts)[4]["Id"]
+    fail_once(simulator, flaky)
+    migrated_ids = MigrationPipeline(
+        source=source, target=target, is_quiet=True, workers=3
+    ).run()
+    assert len(migrated_ids) == 5
+    assert flaky in migrated_ids
+    assert list(source.failures) == [broken]
+    assert journal.state(broken) == REMOVED
+    assert source_organization.id in simulator.organizations
+    with caplog.at_level(logging.ERROR):
+        source.report_failures()
+    assert "standalone" in caplog.text
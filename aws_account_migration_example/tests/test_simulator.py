@@ -0,0 +1,44 @@
+from aws_account_migration_example.runtime.rate_limiter import AdaptiveRateLimiter
+from aws_account_migration_example.tests.benchmarks.benchmark_migration import (
+    Benchmark,
+)
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
+
+
+def test_benchmark_migrates_every_account():
+    benchmark = Benchmark(accounts=4, organizational_units=2, quota_scale=10)
+    results = benchmark.run()
+    assert [result["phase"] for result in results] == [
+        "startup",
+        "invite",
+        "accept",
+        "move",
+    ]
+    simulator = benchmark.simulator
+    source = benchmark.source_organization
+    for account in simulator.accounts.values():
+        if account.id == benchmark.target_organization.management_account_id:
+            continue
+        assert account.organization_id == benchmark.target_organization.id
+        assert account.parent_id == benchmark.destination["Id"]
+    assert source.id not in simulator.organizations
+
+
+def test_throttled_calls_are_retried():
+    simulator = OrganizationsSimulator(quotas={"InviteAccountToOrganization": 2.0})
+    source = simulator.create_organization("source")
+    target = simulator.create_organization("target")
+    accounts = simulator.populate(source, 6)
+    limiter = AdaptiveRateLimiter(rates={"InviteAccountToOrganization": 20.0})
+    aws = simulator.aws(target.management_account_id, rate_limiter=limiter)
+    for account in accounts:
+        aws.organizations.invite_account_to_organization(
+            Target={"Id": account.id, "Type": "ACCOUNT"}
+        )
+    statistics = limiter.statistics()["InviteAccountToOrganization"]
+    assert simulator.throttled > 0
+    assert statistics["throttled"] == simulator.throttled
+    assert statistics["rate"] < 20.0
+    assert simulator.calls["InviteAccountToOrganization"] == len(accounts)
@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+from aws_account_migration_example.runtime.aws import MAX_PAGE_SIZE
+from aws_account_migration_example.runtime.model import (
+    SourceAwsOrganization,
+    TargetAwsOrganization,
+)
+from aws_account_migration_example.runtime.snapshot import SnapshotCache
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
+
+
+def test_repeat_runs_start_from_the_snapshot():
+    simulator = OrganizationsSimulator()
+    source_organization = simulator.create_organization("source")
+    target_organization = simulator.create_organization("target")
+    accounts = simulator.populate(source_organization, 4, 2)
+    descriptor, path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(descriptor)
+    snapshots = SnapshotCache(path)
+
+    def organizations():
+        source = SourceAwsOrganization(
+            profile_name="source",
+            aws=simulator.aws(source_organization.management_account_id),
+            snapshots=snapshots,
+        )
+        target = TargetAwsOrganization(
+            profile_name="target",
+            aws=simulator.aws(target_organization.management_account_id),
+            snapshots=snapshots,
+        )
+        return source, target
+
+    try:
+        source, target = organizations()
+        assert len(list(source.all_accounts())) == len(accounts) + 1
+        assert source.tree.parent_of(accounts[0].id) is not None
+        invitation = target.send_invitation({"Id": accounts[0].id}, True)
+        calls = simulator.total_calls()
+
+        source, target = organizations()
+        assert len(list(source.all_accounts())) == len(accounts) + 1
+        assert source.tree.parent_of(accounts[0].id) is not None
+        # the invitation sent by the previous run was added to the snapshot
+        assert target.find_invitation(accounts[0].id)["Id"] == invitation["Id"]
+        assert target.root_ou == target_organization.root_id
+        assert simulator.total_calls() == calls + 1
+
+        source.accept_invitation(invitation, True)
+        source, target = organizations()
+        account_ids = {account["Id"] for account in source.all_accounts()}
+        assert accounts[0].id not in account_ids
+        assert source.tree.parent_of(accounts[0].id) is None
+        assert target.find_invitation(accounts[0].id) is None
+
+        snapshots.invalidate(profile="source")
+        calls = simulator.total_calls()
+        source, target = organizations()
+        source.all_accounts()
+        assert simulator.calls["DescribeOrganization"] > 0
+        assert simulator.total_calls() > calls
+    finally:
+        snapshots.close()
+        os.remove(path)
+
+
+def test_snapshot_is_stored_while_the_accounts_stream(tmp_path):
+    simulator = OrganizationsSimulator()
+    organization = simulator.create_organization("source")
+    accounts = simulator.populate(organization, 3 * MAX_PAGE_SIZE, 0)
+    snapshots = SnapshotCache(str(tmp_path / "snapshots.sqlite"))
+
+    def source():
+        return SourceAwsOrganization(
+            profile_name="source",
+            aws=simulator.aws(organization.management_account_id),
+            snapshots=snapshots,
+        )
+
+    # the first account is returned after the first page, a listing read halfway is not a snapshot
+    next(iter(source().all_accounts()))
+    assert simulator.calls["ListAccounts"] == 1
+    assert len(list(source().all_accounts())) == len(accounts) + 1
+    assert simulator.calls["ListAccounts"] == 5
+    assert len(list(source().all_accounts())) == len(accounts) + 1
+    assert simulator.calls["ListAccounts"] == 5
+    snapshots.close()
@@ -0,0 +1,114 @@
+import csv
+
+from aws_account_migration_example.runtime.journal import MOVED, MigrationJournal
+from aws_account_migration_example.runtime.manifest import Manifest
+from aws_account_migration_example.runtime.pipeline import MigrationPipeline
+from aws_account_migration_example.runtime.verify import (
+    FIXED,
+    MISPLACED,
+    MISSING,
+    PlacementVerifier,
+    expected_placements,
+)
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+from aws_account_migration_example.tests.mocks.aws.simulator import (
+    OrganizationsSimulator,
+)
+
+
+def migrated(simulator: OrganizationsSimulator, journal: MigrationJournal):
+    migration = SimulatedMigration(
+        simulator=simulator, accounts=10, organizational_units=2, journal=journal
+    )
+    MigrationPipeline(
+        source=migration.source, target=migration.target, is_quiet=True, workers=4
+    ).run()
+    return (
+        migration.source,
+        migration.target,
+        migration.target_organization,
+        migration.destination,
+    )
+
+
+def test_placement_is_verified_per_parent_and_fixed(tmp_path):
+    simulator = OrganizationsSimulator()
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    source, target, target_organization, destination = migrated(simulator, journal)
+    expected = expected_placements([source], target, journal=journal)
+    assert len(expected) == 11
+    assert set(expected.values()) == {destination["Id"]}
+
+    other = simulator.create_organizational_unit_in(
+        target_organization, target_organization.root_id, "Other"
+    )
+    organizations = simulator.aws(target_organization.management_account_id)
+    misplaced = list(expected)[:2]
+    organizations.organizations.move_account(
+        AccountId=misplaced[0],
+        SourceParentId=destination["Id"],
+        DestinationParentId=target_organization.root_id,
+    )
+    organizations.organizations.move_account(
+        AccountId=misplaced[1],
+        SourceParentId=destination["Id"],
+        DestinationParentId=other["Id"],
+    )
+    expected["999999999999"] = destination["Id"]
+
+    calls = dict(simulator.calls)
+    verifier = PlacementVerifier(target=target, workers=4)
+    mismatches = verifier.verify(expected)
+    assert {
+        mismatch.account_id: (mismatch.actual_parent_id, mismatch.status)
+        for mismatch in mismatches
+    } == {
+        misplaced[0]: (target_organization.root_id, MISPLACED),
+        misplaced[1]: (other["Id"], MISPLACED),
+        "999999999999": (None, MISSING),
+    }
+    # the destination and the root are listed once, only the accounts found in neither are looked up
+    assert (
+        simulator.calls["ListAccountsForParent"] - calls.get("ListAccountsForParent", 0)
+        == 2
+    )
+    assert simulator.calls.get("ListParents", 0) - calls.get("ListParents", 0) == 2
+
+    moves = simulator.calls["MoveAccount"]
+    remaining = verifier.fix(is_quiet=True)
+    assert simulator.calls["MoveAccount"] - moves == 2
+    assert [mismatch.account_id for mismatch in remaining] == ["999999999999"]
+    assert [mismatch.status for mismatch in mismatches] == [FIXED, FIXED, MISSING]
+    assert simulator.parent_of(misplaced[0]) == destination["Id"]
+    assert simulator.parent_of(misplaced[1]) == destination["Id"]
+
+    verifier.save(str(tmp_path / "report.csv"))
+    with open(tmp_path / "report.csv", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["Status"] for row in rows] == [FIXED, FIXED, MISSING]
+
+    del expected["999999999999"]
+    assert PlacementVerifier(target=target).verify(expected) == []
+
+
+def test_manifest_destinations_are_expected(tmp_path):
+    simulator = OrganizationsSimulator()
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    source, target, target_organization, destination = migrated(simulator, journal)
+    account_ids = [entry["AccountId"] for entry in journal.reached(MOVED)]
+    manifest_path = tmp_path / "manifest.csv"
+    manifest_path.write_text(
+        "account_id,destination_ou,skip\n"
+        f"{account_ids[0]},{target_organization.root_id},\n"
+        f"{account_ids[1]},,\n"
+        f"{account_ids[2]},,true\n"
+    )
+    expected = expected_placements(
+        [source], target, Manifest(str(manifest_path)), journal
+    )
+    assert expected == {
+        account_ids[0]: target_organization.root_id,
+        account_ids[1]: destination["Id"],
+    }
+    mismatches = PlacementVerifier(target=target).verify(expected)
+    assert [mismatch.account_id for mismatch in mismatches] == [account_ids[0]]
@@ -0,0 +1,87 @@
+from aws_account_migration_example.runtime.waves import CircuitBreaker, WaveScheduler
+from aws_account_migration_example.tests.mocks.aws.migration import SimulatedMigration
+
+
+def organizations(accounts: int):
+    migration = SimulatedMigration(accounts=accounts, organizational_units=2)
+    return (
+        migration.simulator,
+        migration.source_organization,
+        migration.source,
+        migration.target,
+    )
+
+
+def test_circuit_breaker_opens_above_threshold():
+    breaker = CircuitBreaker(window=4, threshold=0.5, minimum=3)
+    breaker.record(True)
+    breaker.record(True)
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.error_rate == 0.5
+    assert not breaker.is_open
+    breaker.record(False)
+    assert breaker.error_rate == 0.75
+    assert breaker.is_open
+    breaker.record(True)
+    assert breaker.is_open
+
+
+def test_waves_grow_and_migrate_management_account_last():
+    simulator, source_organization, source, target = organizations(10)
+    scheduler = WaveScheduler(
+        source=source,
+        target=target,
+        is_quiet=True,
+        canary_size=2,
+        growth=2.0,
+        max_wave_size=4,
+        workers=[1, 2],
+    )
+    assert [len(wave) for wave in scheduler.waves(list(source.child_accounts))] == [
+        2,
+        4,
+        4,
+    ]
+    assert scheduler.run()
+    assert len(scheduler.migrated_ids) == 11
+    assert scheduler.migrated_ids[-1] == source_organization.management_account_id
+    assert source_organization.id not in simulator.organizations
+
+
+def test_failing_canary_stops_later_waves():
+    simulator, source_organization, source, target = organizations(10)
+    for account in simulator.accounts.values():
+        account.has_role = False
+    scheduler = WaveScheduler(
+        source=source, target=target, is_quiet=True, canary_size=2, workers=[2]
+    )
+    assert not scheduler.run()
+    assert len(scheduler.failures) == 2
+    assert source.failures == scheduler.failures
+    assert scheduler.migrated_ids == []
+    assert simulator.calls["InviteAccountToOrganization"] == 2
+    assert source_organization.id in simulator.organizations
+
+
+def test_error_rate_stops_later_waves():
+    simulator, source_organization, source, target = organizations(12)
+    accounts = list(source.child_accounts)
+    for account in accounts[2:]:
+        simulator.accounts[account["Id"]].has_role = False
+    scheduler = WaveScheduler(
+        source=source,
+        target=target,
+        is_quiet=True,
+        canary_size=2,
+        growth=2.0,
+        workers=[1],
+        error_window=4,
+        error_threshold=0.5,
+        error_minimum=3,
+    )
+    assert not scheduler.run()
+    assert len(scheduler.migrated_ids) == 2
+    assert len(scheduler.failures) == 3
+    assert len(scheduler.skipped_ids) == 1
+    assert simulator.calls["InviteAccountToOrganization"] == 5